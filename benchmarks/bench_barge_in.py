@@ -0,0 +1,167 @@
+"""
+전이중(끼어들기) 벤치마크 (장치 없이 시뮬레이션)
+
+1) 에코 제거: 키오스크 TTS(합성 신호)가 스피커 -> 방 -> 마이크로 되돌아오는 에코에
+   사용자 발화를 섞은 마이크 신호를 만들고, EchoCanceller 유무에 따라
+   VAD가 에코만으로 말 시작을 잘못 감지하는지와 실제 사용자 발화 감지 지연을 비교합니다.
+2) 취소 지연: 문장 스트림(LLM)을 재생하는 TTSPipeline에 재생 도중 cancel()을 보내
+   출력이 멈출 때까지 / speak()가 반환될 때까지 걸린 시간과 LLM 스트림이 닫혔는지 확인합니다.
+
+사용법 (저장소 루트에서):
+    python -m benchmarks.bench_barge_in [--echo-gain 0.6] [--delay-ms 40] [--user-at 4.0]
+"""
+import argparse
+import threading
+import time
+
+import numpy as np
+
+from voice.echo_canceller import EchoCanceller
+from voice.tts_pipeline import TTSPipeline
+from voice.vad_capture import Endpointer, EnergyVAD
+
+MIC_RATE = 16000
+TTS_RATE = 24000
+FRAME = MIC_RATE * 30 // 1000
+
+
+def speech_like(seconds: float, sample_rate: int, f0: float, amplitude: float) -> np.ndarray:
+    """음절 단위로 진폭이 변하는 배음 신호"""
+    ts = np.arange(int(seconds * sample_rate)) / sample_rate
+    pitch = f0 + 30 * np.sin(2 * np.pi * 0.7 * ts)
+    phase = 2 * np.pi * np.cumsum(pitch) / sample_rate
+    voice = sum(np.sin(k * phase) / k for k in range(1, 6))
+    return voice * (0.55 + 0.45 * np.sin(2 * np.pi * 4.0 * ts) ** 2) * amplitude
+
+
+def make_scene(seconds: float, echo_gain: float, delay_ms: float, user_at: float, seed: int = 0):
+    """(TTS 참조 신호 24kHz, 마이크 신호 16kHz)"""
+    rng = np.random.default_rng(seed)
+    reference = speech_like(seconds, TTS_RATE, 220, 8000).astype(np.int16)
+    n = int(seconds * MIC_RATE)
+    at_mic_rate = np.interp(np.arange(n) * TTS_RATE / MIC_RATE, np.arange(len(reference)), reference)
+    delay = int(MIC_RATE * delay_ms / 1000)
+    room = np.zeros(delay + 160)
+    room[delay], room[delay + 60], room[delay + 120] = echo_gain, echo_gain / 3, -echo_gain / 6
+    mic = np.convolve(at_mic_rate, room)[:n] + rng.normal(0, 60, n)
+    start = int(user_at * MIC_RATE)
+    user = speech_like(1.0, MIC_RATE, 120, 5000)
+    mic[start:start + len(user)] += user[:n - start]
+    return reference, np.clip(mic, -32768, 32767).astype(np.int16)
+
+
+def run_vad(reference, mic, canceller, passes: int):
+    """프레임 단위로 참조 신호와 마이크 신호를 흘리고 마지막 패스의 말 시작 시각 목록 반환"""
+    starts = []
+    for _ in range(passes):
+        endpointer = Endpointer(MIC_RATE, vad=EnergyVAD())
+        starts = []
+        for i in range(0, len(mic) - FRAME + 1, FRAME):
+            frame = mic[i:i + FRAME].tobytes()
+            if canceller is not None:
+                canceller.push_reference(reference[i * TTS_RATE // MIC_RATE:(i + FRAME) * TTS_RATE // MIC_RATE])
+                frame = canceller.process(frame)
+            triggered = endpointer.triggered
+            endpointer.feed(frame)
+            if not triggered and endpointer.triggered:
+                starts.append(i / MIC_RATE)
+    return starts
+
+
+class StoppableOutput:
+    """실시간 재생을 흉내 내는 출력 (AudioOutput의 begin/write/end/wait/stop 인터페이스)"""
+
+    def __init__(self, sample_rate: int = TTS_RATE):
+        self.sample_rate = sample_rate
+        self.first_audio_at = None
+        self.stopped_at = None
+        self._play_until = 0.0
+        self._stopped = threading.Event()
+
+    def begin(self):
+        self.first_audio_at = None
+        self._play_until = 0.0
+        self._stopped.clear()
+
+    def write(self, pcm):
+        now = time.perf_counter()
+        if self.first_audio_at is None:
+            self.first_audio_at = now
+        self._play_until = max(self._play_until, now) + len(pcm) / 2 / self.sample_rate
+
+    def end(self):
+        pass
+
+    def stop(self):
+        self.stopped_at = time.perf_counter()
+        self._stopped.set()
+
+    def wait(self, timeout=None):
+        self._stopped.wait(max(0.0, self._play_until - time.perf_counter()))
+        return True
+
+
+def measure_cancel(cancel_after_s: float) -> dict:
+    state = {"llm_closed": False, "synth_calls": 0}
+
+    def sentences():
+        try:
+            for i in range(8):
+                time.sleep(0.4)  # LLM이 문장 하나를 생성하는 시간
+                yield f"{i + 1}번째 문장입니다. 메뉴 설명이 이어집니다."
+        finally:
+            state["llm_closed"] = True
+
+    def synthesize(text):
+        state["synth_calls"] += 1
+        for _ in range(20):  # 문장당 2초 분량을 100ms 청크로 스트리밍
+            time.sleep(0.02)
+            yield bytes(TTS_RATE // 10 * 2)
+
+    output = StoppableOutput()
+    pipeline = TTSPipeline(synthesize, output)
+    result = {}
+
+    def barge_in():
+        time.sleep(cancel_after_s)
+        result["cancel_at"] = time.perf_counter()
+        pipeline.cancel()
+
+    threading.Thread(target=barge_in, daemon=True).start()
+    report = pipeline.speak(sentences())
+    returned_at = time.perf_counter()
+    pipeline.close()
+    return {
+        "cancelled": report["cancelled"],
+        "stop_ms": (output.stopped_at - result["cancel_at"]) * 1000,
+        "return_ms": (returned_at - result["cancel_at"]) * 1000,
+        "llm_closed": state["llm_closed"],
+        "synth_calls": state["synth_calls"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="전이중(끼어들기) 벤치마크")
+    parser.add_argument("--echo-gain", type=float, default=0.6, help="스피커 -> 마이크 에코 크기")
+    parser.add_argument("--delay-ms", type=float, default=40.0, help="에코 경로 지연")
+    parser.add_argument("--user-at", type=float, default=4.0, help="사용자가 끼어드는 시각 (초)")
+    args = parser.parse_args()
+
+    reference, mic = make_scene(6.0, args.echo_gain, args.delay_ms, args.user_at)
+    print(f"TTS 6초 재생 중 {args.user_at:.1f}초에 사용자 발화 (에코 크기 {args.echo_gain}, 지연 {args.delay_ms:.0f}ms)")
+    print(f"에코 제거 없음       : 말 시작 감지 {run_vad(reference, mic, None, 1)}")
+    canceller = EchoCanceller(MIC_RATE, TTS_RATE)
+    t0 = time.perf_counter()
+    first = run_vad(reference, mic, canceller, 1)
+    per_frame_ms = (time.perf_counter() - t0) / (len(mic) // FRAME) * 1000
+    print(f"에코 제거 (첫 재생)  : 말 시작 감지 {first}")
+    print(f"에코 제거 (수렴 후)  : 말 시작 감지 {run_vad(reference, mic, canceller, 1)}")
+    print(f"  {canceller.stats()}, 프레임(30ms)당 {per_frame_ms:.2f}ms")
+
+    report = measure_cancel(cancel_after_s=1.5)
+    print(f"\n재생 1.5초에 cancel(): 출력 중단 {report['stop_ms']:.1f}ms, speak() 반환 {report['return_ms']:.0f}ms, "
+          f"LLM 스트림 닫힘 {report['llm_closed']}, 합성 요청 {report['synth_calls']}/8문장")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+배치 나이/성별 추론 벤치마크 (CPU)
+
+얼굴 한 장당 지연시간을 다음 두 경로로 비교합니다.
+- 기존 경로: 얼굴마다 analyze_face_with_deepface_full() (DeepFace.analyze) 호출
+- 배치 경로: analyze_faces_batch()로 배치 크기 1/4/16 추론
+
+사용법 (저장소 루트에서):
+    python -m benchmarks.bench_batch_inference [--faces 얼굴이미지_폴더] [--repeat 5]
+"""
+import os
+
+# GPU가 있어도 CPU 기준으로 측정
+os.environ.setdefault("CUDA_VISIBLE_DEVICES", "")
+
+import argparse
+import time
+
+import cv2
+import numpy as np
+
+from utils.deepface_webcam import analyze_face_with_deepface_full, analyze_faces_batch, warmup
+
+
+def load_faces(folder, count):
+    """폴더의 얼굴 이미지를 불러오고, 없으면 임의의 얼굴 크기 이미지를 생성"""
+    faces = []
+    if folder:
+        for name in sorted(os.listdir(folder)):
+            img = cv2.imread(os.path.join(folder, name))
+            if img is not None:
+                faces.append(img)
+    if not faces:
+        rng = np.random.default_rng(0)
+        faces = [rng.integers(0, 255, (160, 160, 3), dtype=np.uint8) for _ in range(count)]
+    while len(faces) < count:
+        faces.extend(faces[: count - len(faces)])
+    return faces[:count]
+
+
+def bench(fn, repeat):
+    """fn을 repeat번 실행하여 가장 빠른 실행 시간을 반환"""
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="배치 나이/성별 추론 벤치마크")
+    parser.add_argument("--faces", help="얼굴 이미지 폴더 (없으면 합성 이미지 사용)")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    faces = load_faces(args.faces, 16)
+    print(f"[워밍업] {warmup()}")
+
+    sequential = bench(lambda: [analyze_face_with_deepface_full(f) for f in faces[:4]], args.repeat)
+    print(f"DeepFace.analyze 개별 호출: {sequential / 4 * 1000:.1f} ms/face")
+
+    for batch_size in (1, 4, 16):
+        chunk = faces[:batch_size]
+        elapsed = bench(lambda: analyze_faces_batch(chunk, max_batch=batch_size), args.repeat)
+        print(f"batch={batch_size:>2}: {elapsed / batch_size * 1000:.1f} ms/face "
+              f"({elapsed * 1000:.1f} ms/batch)")
+
+
+if __name__ == "__main__":
+    main()
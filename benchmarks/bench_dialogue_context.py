@@ -0,0 +1,93 @@
+"""
+대화 맥락 벤치마크 (턴이 늘어날 때 프롬프트 크기)
+
+대본 대화(주문/추가/취소/알레르기/"그거" 지칭)를 여러 번 이어 말하면서 턴마다 LLM 요청 토큰 수를 비교합니다.
+- stateless: 맥락 없이 현재 발화만 (이전 대화를 기억하지 못함)
+- full: 지난 대화를 전부 메시지로 덧붙임 (턴 수에 비례해 증가)
+- dialogue: DialogueState (상태 요약 + 토큰 예산 안의 최근 턴) -> 턴이 늘어도 일정
+마지막에 장바구니/제약 요약과 지칭 해석 결과를 출력합니다.
+
+사용법 (저장소 루트에서):
+    python -m benchmarks.bench_dialogue_context [--turns 40] [--budget 300] [--top-k 8]
+"""
+import argparse
+import json
+
+from benchmarks.bench_prompt_retrieval import message_tokens, scoped_messages
+from benchmarks.bench_prompt_size import MENU_PATH
+from voice.dialogue_state import DialogueState
+from voice.menu_index import MenuIndex
+from voice.menu_prompt import build_retrieved_menu_message, build_scoped_system_prompt
+
+# (사용자 발화, 어시스턴트 답변)
+SCRIPT = [
+    ("치킨버거 두 개랑 콜라 하나 주세요", "치킨버거 2개와 콜라 1개 담았습니다. 다른 메뉴도 필요하세요?"),
+    ("땅콩 알레르기가 있는데 괜찮아요?", "치킨버거와 콜라에는 땅콩이 들어가지 않습니다."),
+    ("그거 하나 더 주세요", "콜라 1개 더 담았습니다. 콜라 2개입니다."),
+    ("사이드는 뭐가 있어요?", "감자튀김과 치즈스틱이 있습니다. 감자튀김은 3,500원입니다."),
+    ("감자튀김 두 개 추가할게요", "감자튀김 2개 담았습니다."),
+    ("콜라 한 개 빼주세요", "콜라 1개 뺐습니다. 콜라 1개 남았습니다."),
+    ("만원 이하 디저트 추천해 주세요", "아이스크림이 2,000원으로 가볍게 드시기 좋습니다."),
+    ("그걸로 하나 주세요", "아이스크림 1개 담았습니다."),
+    ("지금까지 얼마예요?", "현재 합계를 알려드릴게요."),
+    ("치킨버거 한 개 취소해 주세요", "치킨버거 1개 취소했습니다."),
+]
+
+
+def dialogue_messages(menu: dict, index: MenuIndex, dialogue: DialogueState, user_text: str, k: int) -> list:
+    """VoiceChat._build_messages(user_text, dialogue)와 같은 구성"""
+    items = index.retrieve(user_text, k)
+    if dialogue.references_context(user_text):
+        names = {item.get('name') for item in items}
+        items = items + [item for item in dialogue.focus_items() if item.get('name') not in names]
+    return [
+        {"role": "system", "content": build_scoped_system_prompt(menu)},
+        {"role": "system", "content": build_retrieved_menu_message(items, len(index))},
+    ] + dialogue.context_messages() + [{"role": "user", "content": user_text}]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="대화 맥락 프롬프트 크기 벤치마크")
+    parser.add_argument("--turns", type=int, default=40)
+    parser.add_argument("--budget", type=int, default=300, help="DialogueState 최근 턴 토큰 예산")
+    parser.add_argument("--top-k", type=int, default=8)
+    args = parser.parse_args()
+
+    with open(MENU_PATH, "r", encoding="utf-8") as f:
+        menu = json.load(f)
+    index = MenuIndex(menu)
+    dialogue = DialogueState(index, history_budget=args.budget)
+    history = []
+    rows = []
+    print(f"{'턴':>4} {'stateless':>10} {'full':>8} {'dialogue':>9}  발화")
+    for turn in range(args.turns):
+        user_text, answer = SCRIPT[turn % len(SCRIPT)]
+        if turn % len(SCRIPT) == 0 and turn:
+            dialogue.cart.clear()  # 대본 한 바퀴 = 손님 한 명의 주문 (대화 기록은 계속 쌓임)
+        stateless = scoped_messages(menu, index, user_text, args.top_k)
+        full = stateless[:2] + history + stateless[2:]
+        scoped = dialogue_messages(menu, index, dialogue, user_text, args.top_k)
+        row = (message_tokens(stateless), message_tokens(full), message_tokens(scoped))
+        rows.append(row)
+        print(f"{turn + 1:>4} {row[0]:>10} {row[1]:>8} {row[2]:>9}  {user_text}")
+
+        dialogue.add_turn(user_text, answer)
+        history += [{"role": "user", "content": user_text}, {"role": "assistant", "content": answer}]
+
+    print()
+    for name, col in (("stateless", 0), ("full", 1), ("dialogue", 2)):
+        first, last = rows[0][col], rows[-1][col]
+        peak = max(r[col] for r in rows)
+        print(f"{name:<10} 첫 턴 {first:5d} / 마지막 턴 {last:5d} / 최대 {peak:5d} 토큰")
+    print(f"\n{dialogue.summary()}")
+    print(f"{dialogue.stats()}")
+
+    # 지칭 해석: 메뉴 이름 없이 "그거"로 주문
+    probe = DialogueState(index)
+    probe.add_turn("불고기버거는 얼마예요?", "불고기버거는 7,900원입니다.")
+    probe.add_turn("그거 두 개 주세요", "불고기버거 2개 담았습니다.")
+    print(f"\n'불고기버거는 얼마예요?' -> '그거 두 개 주세요' => 장바구니 {dict(probe.cart)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+얼굴 한 장 나이/성별 분석 벤치마크 (CPU)
+
+이미 검출한 얼굴 ROI에 대해 얼굴 한 장당 지연시간을 비교합니다.
+- 기존 경로: analyze_face_with_deepface_full() (DeepFace.analyze, 내부에서 얼굴 검출을 다시 수행)
+- 직접 경로: analyze_face_with_deepface() (FaceAnalyzer, 검출 생략 + 미리 할당한 입력 텐서)
+두 경로의 나이 차이와 성별 일치율도 함께 출력합니다.
+
+사용법 (저장소 루트에서):
+    python -m benchmarks.bench_face_analysis [--faces 얼굴이미지_폴더] [--count 8] [--repeat 5]
+"""
+import os
+
+# GPU가 있어도 CPU 기준으로 측정
+os.environ.setdefault("CUDA_VISIBLE_DEVICES", "")
+
+import argparse
+import statistics
+import time
+
+from benchmarks.bench_batch_inference import load_faces
+from utils.deepface_webcam import analyze_face_with_deepface, analyze_face_with_deepface_full, warmup
+from utils.face_analyzer import preprocess_face
+
+
+def per_face_ms(fn, faces, repeat):
+    """얼굴마다 fn을 호출해 얼굴당 지연시간(ms) 중앙값을 반환"""
+    samples = []
+    for _ in range(repeat):
+        for face in faces:
+            t0 = time.perf_counter()
+            fn(face)
+            samples.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(samples)
+
+
+def dominant(gender):
+    return max(gender, key=gender.get) if isinstance(gender, dict) else gender
+
+
+def main():
+    parser = argparse.ArgumentParser(description="얼굴 한 장 나이/성별 분석 벤치마크")
+    parser.add_argument("--faces", help="얼굴 이미지 폴더 (없으면 합성 이미지 사용)")
+    parser.add_argument("--count", type=int, default=8)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    faces = load_faces(args.faces, args.count)
+    print(f"[워밍업] {warmup()}")
+    analyze_face_with_deepface_full(faces[0])  # DeepFace 내부 검출기 로드
+
+    full_ms = per_face_ms(analyze_face_with_deepface_full, faces, args.repeat)
+    direct_ms = per_face_ms(analyze_face_with_deepface, faces, args.repeat)
+    preprocess_ms = per_face_ms(preprocess_face, faces, args.repeat)
+    print(f"DeepFace.analyze   : {full_ms:.1f} ms/face")
+    print(f"직접 경로          : {direct_ms:.1f} ms/face ({full_ms / direct_ms:.1f}x, 전처리 {preprocess_ms:.2f} ms)")
+
+    age_diffs, gender_match = [], 0
+    for face in faces:
+        full_age, full_gender, _ = analyze_face_with_deepface_full(face)
+        direct_age, direct_gender, _ = analyze_face_with_deepface(face)
+        age_diffs.append(abs(float(full_age) - float(direct_age)))
+        gender_match += dominant(full_gender) == dominant(direct_gender)
+    print(f"나이 차이 평균 {statistics.mean(age_diffs):.2f}세, 성별 일치 {gender_match}/{len(faces)}")
+
+
+if __name__ == "__main__":
+    main()
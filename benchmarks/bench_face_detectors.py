@@ -0,0 +1,73 @@
+"""
+얼굴 검출기 백엔드 벤치마크
+
+테스트 이미지 폴더(이미지마다 얼굴이 하나 이상 있다고 가정)에 대해
+백엔드별 초당 검출 횟수와 재현율(얼굴을 하나 이상 찾은 이미지 비율)을 출력합니다.
+--negatives 폴더를 주면 얼굴이 없는 이미지에서의 오검출 비율도 함께 출력합니다.
+
+사용법 (저장소 루트에서):
+    python -m benchmarks.bench_face_detectors 이미지_폴더 [--backends haar yunet] [--detect-width 640]
+"""
+import argparse
+import os
+import time
+
+import cv2
+
+from utils.face_detectors import FACE_DETECTORS, create_face_detector
+
+
+def load_images(folder):
+    """폴더 안의 이미지를 모두 불러오기"""
+    images = []
+    for name in sorted(os.listdir(folder)):
+        img = cv2.imread(os.path.join(folder, name))
+        if img is not None:
+            images.append(img)
+    return images
+
+
+def run_backend(detector, images, repeat):
+    """(초당 검출 횟수, 얼굴을 찾은 이미지 수) 반환"""
+    found = sum(1 for img in images if detector.detect(img))
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        for img in images:
+            detector.detect(img)
+    elapsed = time.perf_counter() - t0
+    return repeat * len(images) / elapsed, found
+
+
+def main():
+    parser = argparse.ArgumentParser(description="얼굴 검출기 벤치마크")
+    parser.add_argument("images", help="얼굴이 포함된 테스트 이미지 폴더")
+    parser.add_argument("--negatives", help="얼굴이 없는 이미지 폴더 (선택)")
+    parser.add_argument("--backends", nargs="+", default=list(FACE_DETECTORS))
+    parser.add_argument("--detect-width", type=int, default=640,
+                        help="검출 전 긴 변 기준 축소 크기 (0이면 원본 해상도)")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    images = load_images(args.images)
+    negatives = load_images(args.negatives) if args.negatives else []
+    if not images:
+        print(f"이미지를 찾을 수 없습니다: {args.images}")
+        return
+    print(f"테스트 이미지 {len(images)}장, 얼굴 없는 이미지 {len(negatives)}장")
+
+    for backend in args.backends:
+        try:
+            detector = create_face_detector(backend, detect_width=args.detect_width)
+        except Exception as e:
+            print(f"[{backend}] 건너뜀: {e}")
+            continue
+        fps, found = run_backend(detector, images, args.repeat)
+        line = f"[{backend}] {fps:.1f} detections/s, recall {found / len(images):.3f}"
+        if negatives:
+            false_hits = sum(1 for img in negatives if detector.detect(img))
+            line += f", 오검출 {false_hits / len(negatives):.3f}"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+메뉴 검색 벤치마크
+
+menu.json을 복제한 합성 메뉴(기본 10,000개 항목)에서
+기존 선형 부분 문자열 검색과 MenuIndex 검색의 질의당 지연시간을 비교합니다.
+
+사용법 (저장소 루트에서):
+    python -m benchmarks.bench_menu_search [--items 10000] [--repeat 20]
+"""
+import argparse
+import json
+import time
+
+from benchmarks.bench_prompt_size import MENU_PATH, synthetic_menu
+from voice.menu_index import MenuIndex
+
+QUERIES = [
+    "치킨버거",
+    "치킨버고",  # STT 오타
+    "ㅊㅋㅂㄱ",  # 초성
+    "버거",
+    "새우 없는 비건 1만원 이하",
+    "땅콩 들어간 메뉴 있어요?",
+    "우유 알레르기 있어요 음료 추천",
+    "5천원 이하 디저트",
+]
+
+
+def linear_search(items: list, query: str) -> list:
+    """기존 VoiceChat._search_menu_items 방식 (항목 x 필드 부분 문자열 검사)"""
+    results = []
+    query_lower = query.lower()
+    for item in items:
+        name = item.get('name', '').lower()
+        category = item.get('category', '').lower()
+        notes = item.get('notes', '').lower()
+        if query_lower in name or query_lower in category or query_lower in notes:
+            results.append(item)
+    return results
+
+
+def per_query_ms(fn, repeat: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - t0) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="메뉴 검색 벤치마크")
+    parser.add_argument("--items", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with open(MENU_PATH, "r", encoding="utf-8") as f:
+        menu = synthetic_menu(json.load(f), args.items)
+
+    t0 = time.perf_counter()
+    index = MenuIndex(menu)
+    print(f"인덱스 생성: {len(index)}개 항목, {(time.perf_counter() - t0) * 1000:.1f} ms")
+    print(f"{'query':<28} {'linear_ms':>10} {'hits':>6} {'index_ms':>10} {'hits':>6}")
+
+    for query in QUERIES:
+        linear_ms = per_query_ms(lambda: linear_search(menu["items"], query), args.repeat)
+        index_ms = per_query_ms(lambda: index.search(query), args.repeat)
+        print(f"{query:<28} {linear_ms:>10.2f} {len(linear_search(menu['items'], query)):>6} "
+              f"{index_ms:>10.2f} {len(index.search(query)):>6}")
+
+
+if __name__ == "__main__":
+    main()
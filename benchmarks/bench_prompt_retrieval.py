@@ -0,0 +1,109 @@
+"""
+검색 기반 프롬프트 벤치마크
+
+고정 질의 세트에 대해 전체 메뉴 프롬프트와 관련 메뉴 top-k 프롬프트의
+토큰 수(절감률)를 비교합니다. OPENAI_API_KEY가 설정되어 있으면
+gpt-4o-mini의 첫 토큰까지 걸린 시간(TTFT)도 두 방식으로 측정합니다.
+
+사용법 (저장소 루트에서):
+    python -m benchmarks.bench_prompt_retrieval [--items 16 1000] [--top-k 8] [--ttft]
+"""
+import argparse
+import json
+import os
+import time
+
+from dotenv import load_dotenv
+
+from benchmarks.bench_prompt_size import MENU_PATH, synthetic_menu
+from voice.menu_index import MenuIndex
+from voice.menu_prompt import (
+    build_retrieved_menu_message,
+    build_scoped_system_prompt,
+    build_system_prompt,
+    count_tokens,
+)
+
+QUERIES = [
+    "치킨버거 얼마예요?",
+    "새우 없는 비건 메뉴 추천해주세요",
+    "땅콩 알레르기가 있는데 버거 뭐 먹을 수 있어요?",
+    "1만원 이하 샐러드 있어요?",
+    "칼로리 제일 낮은 음료가 뭐예요?",
+    "아이랑 먹을 디저트 추천해줘",
+]
+
+
+def full_messages(menu: dict, user_text: str) -> list:
+    return [
+        {"role": "system", "content": build_system_prompt(menu)},
+        {"role": "user", "content": user_text},
+    ]
+
+
+def scoped_messages(menu: dict, index: MenuIndex, user_text: str, k: int) -> list:
+    items = index.retrieve(user_text, k)
+    return [
+        {"role": "system", "content": build_scoped_system_prompt(menu)},
+        {"role": "system", "content": build_retrieved_menu_message(items, len(index))},
+        {"role": "user", "content": user_text},
+    ]
+
+
+def message_tokens(messages: list) -> int:
+    return sum(count_tokens(m["content"]) for m in messages)
+
+
+def measure_ttft(client, messages: list) -> float:
+    """첫 응답 토큰까지 걸린 시간 (초)"""
+    t0 = time.perf_counter()
+    stream = client.chat.completions.create(
+        model="gpt-4o-mini", messages=messages, temperature=0, stream=True
+    )
+    ttft = None
+    for chunk in stream:
+        if ttft is None and chunk.choices and chunk.choices[0].delta.content:
+            ttft = time.perf_counter() - t0
+    return ttft if ttft is not None else time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="검색 기반 프롬프트 벤치마크")
+    parser.add_argument("--items", type=int, nargs="+", default=[16, 1000])
+    parser.add_argument("--top-k", type=int, default=8)
+    parser.add_argument("--ttft", action="store_true", help="OpenAI API로 TTFT 측정")
+    args = parser.parse_args()
+
+    load_dotenv()
+    client = None
+    if args.ttft and os.getenv("OPENAI_API_KEY"):
+        from openai import OpenAI
+        client = OpenAI()
+    elif args.ttft:
+        print("OPENAI_API_KEY가 없어 TTFT 측정은 건너뜁니다.")
+
+    with open(MENU_PATH, "r", encoding="utf-8") as f:
+        base = json.load(f)
+
+    for size in args.items:
+        menu = synthetic_menu(base, size)
+        index = MenuIndex(menu)
+        print(f"\n== 메뉴 {size}개, top-k {args.top_k} ==")
+        total_full = total_scoped = 0
+        for query in QUERIES:
+            full = full_messages(menu, query)
+            scoped = scoped_messages(menu, index, query, args.top_k)
+            full_tokens, scoped_tokens = message_tokens(full), message_tokens(scoped)
+            total_full += full_tokens
+            total_scoped += scoped_tokens
+            line = f"{query:<32} full {full_tokens:>7} / scoped {scoped_tokens:>5} tokens"
+            if client is not None:
+                line += (f" | TTFT full {measure_ttft(client, full) * 1000:.0f} ms"
+                         f" / scoped {measure_ttft(client, scoped) * 1000:.0f} ms")
+            print(line)
+        print(f"합계 full {total_full} / scoped {total_scoped} tokens "
+              f"({(1 - total_scoped / total_full) * 100:.1f}% 절감)")
+
+
+if __name__ == "__main__":
+    main()
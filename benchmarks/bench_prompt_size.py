@@ -0,0 +1,53 @@
+"""
+시스템 프롬프트 크기 리포트
+
+menu.json을 복제해 만든 합성 메뉴(항목 수별)로 시스템 프롬프트의
+문자 수/바이트 수/토큰 수와 생성 시간이 메뉴 크기에 따라 어떻게 늘어나는지 출력합니다.
+VoiceChat은 이 프롬프트를 생성자에서 한 번만 만들고 menu.json이 바뀔 때만 다시 만듭니다.
+
+사용법 (저장소 루트에서):
+    python -m benchmarks.bench_prompt_size [--sizes 16 100 1000 10000]
+"""
+import argparse
+import json
+import time
+from pathlib import Path
+
+from voice.menu_prompt import build_system_prompt, count_tokens
+
+MENU_PATH = Path(__file__).resolve().parent.parent / "menu.json"
+
+
+def synthetic_menu(base: dict, size: int) -> dict:
+    """기존 메뉴 항목을 복제해 size개 항목의 메뉴 생성"""
+    items = base.get("items", [])
+    synthetic = []
+    for i in range(size):
+        item = dict(items[i % len(items)])
+        item["id"] = f"item_{i:05d}"
+        if i >= len(items):
+            item["name"] = f"{item['name']} {i // len(items)}호"
+        synthetic.append(item)
+    return {**base, "items": synthetic}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="시스템 프롬프트 크기 리포트")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[16, 100, 1000, 10000])
+    args = parser.parse_args()
+
+    with open(MENU_PATH, "r", encoding="utf-8") as f:
+        base = json.load(f)
+
+    print(f"{'items':>7} {'chars':>9} {'bytes':>9} {'tokens':>9} {'build_ms':>9}")
+    for size in args.sizes:
+        menu = synthetic_menu(base, size)
+        t0 = time.perf_counter()
+        prompt = build_system_prompt(menu)
+        build_ms = (time.perf_counter() - t0) * 1000
+        print(f"{size:>7} {len(prompt):>9} {len(prompt.encode('utf-8')):>9} "
+              f"{count_tokens(prompt):>9} {build_ms:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
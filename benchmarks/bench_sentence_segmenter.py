@@ -0,0 +1,131 @@
+"""
+문장 분할기 벤치마크
+
+LLM 토큰 스트림에 대해 기존 분할 방식(버퍼 전체에서 . ! ? 줄바꿈 검사 후 통째로 전송)과
+SentenceSegmenter를 비교합니다.
+- 조각 수, 최소 길이 미만 조각 수, 숫자 중간(12.9, 5,900.)에서 잘린 횟수
+- 토큰당 처리 시간
+
+기본 스트림은 gpt-4o-mini 키오스크 답변 형태의 예시 토큰열이며,
+--record N 으로 실제 API 스트림을 JSONL로 녹화하고 --streams 로 다시 사용할 수 있습니다.
+
+사용법 (저장소 루트에서):
+    python -m benchmarks.bench_sentence_segmenter [--streams streams.jsonl] [--repeat 200]
+    python -m benchmarks.bench_sentence_segmenter --record 5 --out streams.jsonl
+"""
+import argparse
+import json
+import re
+import time
+
+from voice.sentence_segmenter import SentenceSegmenter
+
+SAMPLE_STREAMS = [
+    ["네", ".", " 치킨", "버거", "는", " 5", ",", "900", "원", "이고", ", 열량", "은", " 612", ".", "9", "kcal",
+     "입니다", ".", " 세트", "로", " 주문", "하시", "면", " 8", ",", "900", "원", "이에요", "!"],
+    ["땅", "콩", " 알레르기", "가", " 있으", "시군요", ".", " 땅", "콩", "이", " 들어가", "지", " 않은", " 버거",
+     "로는", " 치킨", "버거", ",", " 불고기", "버거", ",", " 새우", "버거", "가", " 있고", " 사이드", "로는", " 감자",
+     "튀김", "과", " 치즈", "스틱", "이", " 준비", "되어", " 있어요", ".", " 어떤", " 메뉴", "로", " 도와", "드릴",
+     "까요", "?"],
+    ["추천", " 메뉴", "는", " 다음", "과", " 같아요", ".\n", "1", ".", " 두부", " 샐러드", " (", "7", ",", "500",
+     "원", ")\n", "2", ".", " 과일", " 스무디", " (", "4", ",", "500", "원", ")\n", "모두", " 비건", "이에요", "."],
+    ["나트", "륨", "은", " 1", ".", "2", "g", " 정도", "예요", ".", " 당", "류", "는", " 3", ".", "5", "g", "이고",
+     " 단백질", "은", " 25", ".", "4", "g", "입니다", "."],
+]
+_SPLIT_NUMBER_RE = re.compile(r"\d[.,]$")
+
+
+def legacy_segments(tokens: list) -> list:
+    """기존 VoiceChat._process_streaming_response 분할 방식"""
+    buffer, segments = "", []
+    for chunk in tokens:
+        buffer += chunk
+        if any(char in buffer for char in ['.', '!', '?', '\n']):
+            if buffer.strip():
+                segments.append(buffer.strip())
+            buffer = ""
+    if buffer.strip():
+        segments.append(buffer.strip())
+    return segments
+
+
+def segmenter_segments(tokens: list) -> list:
+    segmenter = SentenceSegmenter()
+    segments = []
+    for chunk in tokens:
+        segments.extend(segmenter.feed(chunk))
+    segments.extend(segmenter.flush())
+    return segments
+
+
+def quality(segments: list, min_chars: int) -> dict:
+    return {
+        "chunks": len(segments),
+        "short": sum(len(s) < min_chars for s in segments),
+        "number_splits": sum(bool(_SPLIT_NUMBER_RE.search(s)) for s in segments),
+    }
+
+
+def per_token_us(fn, streams: list, repeat: int) -> float:
+    tokens = sum(len(s) for s in streams)
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        for stream in streams:
+            fn(stream)
+    return (time.perf_counter() - t0) / (repeat * tokens) * 1e6
+
+
+def record_streams(count: int, out_path: str) -> None:
+    """gpt-4o-mini 응답 토큰 스트림을 JSONL로 녹화"""
+    from dotenv import load_dotenv
+    from openai import OpenAI
+    load_dotenv()
+    client = OpenAI()
+    questions = ["치킨버거 가격이랑 칼로리 알려줘", "땅콩 알레르기 있는데 버거 추천해줘",
+                 "비건 메뉴 목록 보여줘", "제일 싼 음료랑 디저트 조합 추천해줘", "샐러드 영양 정보 알려줘"]
+    with open(out_path, "w", encoding="utf-8") as f:
+        for question in (questions * count)[:count]:
+            stream = client.chat.completions.create(
+                model="gpt-4o-mini", stream=True, temperature=0.7,
+                messages=[{"role": "system", "content": "당신은 햄버거 가게 키오스크입니다. 한국어로 짧게 답하세요."},
+                          {"role": "user", "content": question}],
+            )
+            tokens = [c.choices[0].delta.content for c in stream if c.choices and c.choices[0].delta.content]
+            f.write(json.dumps(tokens, ensure_ascii=False) + "\n")
+    print(f"{count}개 스트림 저장: {out_path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="문장 분할기 벤치마크")
+    parser.add_argument("--streams", help="토큰 스트림 JSONL (한 줄에 토큰 문자열 배열)")
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--record", type=int, default=0, help="OpenAI 응답 스트림 N개 녹화")
+    parser.add_argument("--out", default="token_streams.jsonl")
+    args = parser.parse_args()
+
+    if args.record:
+        record_streams(args.record, args.out)
+        return
+
+    streams = SAMPLE_STREAMS
+    if args.streams:
+        with open(args.streams, "r", encoding="utf-8") as f:
+            streams = [json.loads(line) for line in f if line.strip()]
+
+    min_chars = SentenceSegmenter().min_chars
+    legacy = {"chunks": 0, "short": 0, "number_splits": 0}
+    current = dict(legacy)
+    for stream in streams:
+        for totals, segments in ((legacy, legacy_segments(stream)), (current, segmenter_segments(stream))):
+            for key, value in quality(segments, min_chars).items():
+                totals[key] += value
+
+    print(f"스트림 {len(streams)}개, 토큰 {sum(len(s) for s in streams)}개")
+    print(f"{'':<10} {'chunks':>7} {'short':>6} {'num_split':>10} {'us/token':>9}")
+    for name, fn, totals in (("legacy", legacy_segments, legacy), ("segmenter", segmenter_segments, current)):
+        print(f"{name:<10} {totals['chunks']:>7} {totals['short']:>6} {totals['number_splits']:>10} "
+              f"{per_token_us(fn, streams, args.repeat):>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
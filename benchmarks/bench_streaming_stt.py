@@ -0,0 +1,115 @@
+"""
+스트리밍 STT + 추측 LLM 시작 벤치마크 (말 끝 -> 첫 오디오 지연)
+
+합성 WAV(발화 4개)를 실시간 속도로 흘려 보내고 발화마다 말 끝 감지부터 첫 오디오까지의 시간을 비교합니다.
+- serial: 발화 끝 -> 전체 오디오 일괄 STT(--batch-stt-ms) -> LLM 요청 -> 첫 문장 TTS
+- streaming: 말하는 동안 로컬 대체 STT 서버(대본 기반)로 오디오 전송, 중간 결과가 안정되면 LLM을 미리 시작
+  3번째 발화는 중간 결과와 최종 결과가 달라(오인식 수정) 추측 요청을 취소하고 다시 요청하는 경우
+LLM 첫 토큰(--llm-ttft-ms)과 TTS 첫 오디오(--tts-ms)는 시뮬레이션합니다.
+
+사용법 (저장소 루트에서):
+    python -m benchmarks.bench_streaming_stt [--batch-stt-ms 600] [--llm-ttft-ms 700] [--tts-ms 300]
+"""
+import argparse
+import statistics
+import tempfile
+import time
+
+from tests.helpers import synthetic_dialogue
+from voice.speculation import SpeculationController
+from voice.streaming_stt import LocalSTTServer, ScriptedRecognizer, StreamingTranscriber
+from voice.vad_capture import Endpointer, UtteranceListener, WavFileFrameSource
+
+# synthetic_dialogue()의 발화 4개 (1.2초, 2.4초, 0.9초, 3.1초)에 맞춘 대본
+SCRIPT = [
+    "치킨버거 하나요",
+    "매운 거 말고 추천해 주세요",
+    ("불고기버거 세트", "불고기버거 세트 두 개"),
+    "아이스 아메리카노도 같이 주문할게요",
+]
+
+
+def simulated_llm(ttft_s: float):
+    def stream(text: str):
+        time.sleep(ttft_s)
+        yield f"{text} 주문 도와드릴게요."
+        yield " 다른 메뉴도 필요하세요?"
+    return stream
+
+
+def first_audio_at(stream, tts_s: float) -> float:
+    """첫 청크(첫 문장)를 받은 뒤 TTS 첫 오디오까지 걸리는 시간을 더한 시각"""
+    next(iter(stream))
+    time.sleep(tts_s)
+    return time.perf_counter()
+
+
+def run_mode(wav_path: str, streaming: bool, args) -> list:
+    llm = simulated_llm(args.llm_ttft_ms / 1000)
+    speculation = SpeculationController(llm, stable_ms=args.stable_ms)
+    server = transcriber = None
+    if streaming:
+        server = LocalSTTServer(ScriptedRecognizer(SCRIPT, chars_per_second=10,
+                                                   final_delay_ms=args.final_ms)).start()
+        transcriber = StreamingTranscriber(server.address, on_partial=speculation.on_partial)
+    listener = UtteranceListener(WavFileFrameSource(wav_path, realtime=True), Endpointer(), observer=transcriber)
+    listener.start()
+
+    latencies = []
+    try:
+        while True:
+            item = listener.get(timeout=0.5)
+            if item is None:
+                if listener.exhausted:
+                    break
+                continue
+            _, speech_end_at = item
+            if streaming:
+                session = transcriber.session_for(speech_end_at)
+                text = session.result(timeout=5.0)
+                session.close()
+                speculative = speculation.resolve(text)
+                stream = speculative.stream() if speculative is not None else llm(text)
+                note = "추측 응답 사용" if speculative is not None else "추측 취소 -> 다시 요청"
+            else:
+                time.sleep(args.batch_stt_ms / 1000)
+                text = SCRIPT[len(latencies)]
+                text = text[1] if isinstance(text, tuple) else text
+                stream = llm(text)
+                note = "일괄 STT"
+            latency = first_audio_at(stream, args.tts_ms / 1000) - speech_end_at
+            latencies.append(latency)
+            print(f"  {len(latencies)}. {text:<22} 말 끝 -> 첫 오디오 {latency * 1000:6.0f}ms ({note})")
+    finally:
+        listener.stop()
+        if server is not None:
+            server.stop()
+    if streaming:
+        print(f"  추측 LLM: {speculation.stats()}")
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description="스트리밍 STT + 추측 LLM 시작 벤치마크")
+    parser.add_argument("--batch-stt-ms", type=float, default=600.0, help="일괄 STT 업로드+인식 시간")
+    parser.add_argument("--final-ms", type=float, default=150.0, help="스트리밍 STT 말 끝 -> 최종 결과 시간")
+    parser.add_argument("--llm-ttft-ms", type=float, default=700.0)
+    parser.add_argument("--tts-ms", type=float, default=300.0, help="첫 문장 -> 첫 오디오")
+    parser.add_argument("--stable-ms", type=float, default=250.0)
+    args = parser.parse_args()
+
+    with tempfile.NamedTemporaryFile(suffix=".wav") as tmp:
+        synthetic_dialogue(tmp.name)
+        results = {}
+        for mode in ("serial", "streaming"):
+            print(f"\n== {mode} ==")
+            results[mode] = run_mode(tmp.name, mode == "streaming", args)
+    print()
+    for mode, latencies in results.items():
+        if latencies:
+            print(f"{mode:<10} 말 끝 -> 첫 오디오 중앙값 {statistics.median(latencies) * 1000:.0f}ms "
+                  f"(발화 {len(latencies)}개)")
+
+
+if __name__ == "__main__":
+    main()
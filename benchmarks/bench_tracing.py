@@ -0,0 +1,103 @@
+"""
+구간 추적(tracing) 오버헤드 벤치마크
+
+utils.tracing.Tracer의 span 하나(중첩 with / 명시적 end), 이벤트 하나, 값 기록(observe) 하나에 드는 시간을
+JSONL 내보내기 유무로 측정하고, 한 턴에 기록하는 구간 수(약 20개) 기준으로 턴당 추가 시간을 계산합니다.
+마지막에 예시 턴 하나의 JSONL 기록과 Prometheus 텍스트 일부를 출력합니다.
+
+사용법 (저장소 루트에서):
+    python -m benchmarks.bench_tracing [--n 20000] [--spans-per-turn 20]
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+from utils.tracing import Tracer
+
+
+def per_call_us(fn, n: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return (time.perf_counter() - t0) / n * 1e6
+
+
+def measure(tracer: Tracer, n: int) -> dict:
+    def nested():
+        with tracer.span("outer"):
+            with tracer.span("inner", chars=12):
+                pass
+
+    def explicit():
+        tracer.span("tts.synth", chars=12).end(bytes=4800)
+
+    return {
+        "span(with, 2개)": per_call_us(nested, n // 2) / 2,
+        "span(end)": per_call_us(explicit, n),
+        "event": per_call_us(lambda: tracer.event("tts.request", "문장", level="debug", chars=12), n),
+        "observe": per_call_us(lambda: tracer.observe("llm_tokens_per_second", 42.0), n),
+    }
+
+
+def example_turn(tracer: Tracer) -> None:
+    """실제 턴과 같은 구조의 span (작업 스레드의 TTS 합성은 턴에 연결)"""
+    turn = tracer.begin_turn()
+    with tracer.span("listen"):
+        time.sleep(0.01)
+    with tracer.span("stt", speech_s=1.2):
+        with tracer.span("stt.upload", bytes=38400):
+            time.sleep(0.02)
+    llm = tracer.span("llm", cache=False)
+    time.sleep(0.03)
+    llm.set(ttft_ms=30.0)
+
+    def synth():
+        span = tracer.span("tts.synth", chars=18)
+        time.sleep(0.01)
+        span.end(first_chunk_ms=5.0, bytes=48000)
+
+    with tracer.span("playback"):
+        worker = threading.Thread(target=synth)
+        worker.start()
+        worker.join()
+    llm.end(tokens=24, tokens_per_s=60.0)
+    turn.set(route="llm")
+    tracer.end_turn()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="구간 추적 오버헤드 벤치마크")
+    parser.add_argument("--n", type=int, default=20000)
+    parser.add_argument("--spans-per-turn", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "trace.jsonl")
+        for label, tracer in (("메모리만", Tracer(echo_level="error")),
+                              ("JSONL 내보내기", Tracer(path, echo_level="error"))):
+            results = measure(tracer, args.n)
+            per_turn_ms = results["span(end)"] * args.spans_per_turn / 1000
+            print(f"{label:<14} " + ", ".join(f"{k} {v:.1f}us" for k, v in results.items())
+                  + f" -> 턴당 약 {per_turn_ms:.2f}ms (span {args.spans_per_turn}개)")
+            tracer.close()
+
+        tracer = Tracer(path, echo_level="error")
+        size = os.path.getsize(path)
+        example_turn(tracer)
+        tracer.close()
+        with open(path, "r", encoding="utf-8") as f:
+            f.seek(size)
+            print("\n예시 턴 JSONL:")
+            for line in f:
+                print(f"  {line.rstrip()}")
+    text = tracer.prometheus_text()
+    print("\nPrometheus 텍스트 (일부):")
+    for line in text.splitlines():
+        if "_sum" in line or "_count" in line:
+            print(f"  {line}")
+
+
+if __name__ == "__main__":
+    main()
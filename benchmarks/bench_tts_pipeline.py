@@ -0,0 +1,114 @@
+"""
+문장 단위 TTS 파이프라인 벤치마크
+
+여러 문장으로 된 답변을 재생할 때 전체 소요 시간(wall time)을 비교합니다.
+- serial: 기존 방식 (문장 합성 완료 -> 재생 -> 0.8초 대기 -> 다음 문장 합성)
+- pipeline: TTSPipeline (재생 중 다음 문장을 미리 합성, 문장 사이 gap_ms 무음)
+기본은 합성 지연/재생 시간을 시뮬레이션하며, --live를 주면 OpenAI TTS와 실제 출력 장치를 사용합니다.
+
+사용법 (저장소 루트에서):
+    python -m benchmarks.bench_tts_pipeline [--synth-ms 700] [--prefetch 2] [--gap-ms 120] [--live]
+"""
+import argparse
+import time
+
+from voice.tts_pipeline import TTSPipeline
+
+ANSWER = [
+    "땅콩 알레르기가 있으시군요.",
+    "땅콩이 들어가지 않은 버거로는 치킨버거와 불고기버거가 있어요.",
+    "치킨버거는 5,900원이고 칼로리는 620kcal입니다.",
+    "세트로 주문하시면 감자튀김과 음료가 함께 나와요.",
+    "어떤 메뉴로 도와드릴까요?",
+]
+SAMPLE_RATE = 24000
+CHARS_PER_SECOND = 7  # 한국어 TTS 발화 속도 근사
+
+
+class SimulatedOutput:
+    """실시간으로 재생되는 것처럼 시간만 흘려보내는 출력 (AudioOutput과 같은 인터페이스)"""
+
+    def __init__(self, sample_rate: int = SAMPLE_RATE):
+        self.sample_rate = sample_rate
+        self.first_audio_at = None
+        self._play_until = 0.0
+
+    def begin(self):
+        self.first_audio_at = None
+        self._play_until = 0.0
+
+    def write(self, pcm):
+        now = time.perf_counter()
+        if self.first_audio_at is None:
+            self.first_audio_at = now
+        self._play_until = max(self._play_until, now) + len(pcm) / 2 / self.sample_rate
+
+    def end(self):
+        pass
+
+    def wait(self, timeout=None):
+        time.sleep(max(0.0, self._play_until - time.perf_counter()))
+        return True
+
+    def play(self, pcm):
+        self.begin()
+        self.write(pcm)
+        self.wait()
+
+
+def simulated_synthesize(synth_s: float):
+    def synthesize(text: str):
+        time.sleep(synth_s)
+        yield bytes(int(len(text) / CHARS_PER_SECOND * SAMPLE_RATE) * 2)
+    return synthesize
+
+
+def live_synthesize(client):
+    """응답 캐시를 거치지 않는 OpenAI 스트리밍 TTS (두 방식 모두 실제 합성 지연 반영)"""
+    def synthesize(text: str):
+        with client.audio.speech.with_streaming_response.create(
+            model="gpt-4o-mini-tts", voice="nova", input=text, response_format="pcm", speed=1.0
+        ) as response:
+            yield from response.iter_bytes(chunk_size=4800)
+    return synthesize
+
+
+def serial_wall_time(synthesize, output, gap_s: float = 0.8) -> float:
+    """기존 _process_streaming_response 흐름"""
+    t0 = time.perf_counter()
+    for text in ANSWER:
+        time.sleep(gap_s)
+        output.play(b"".join(synthesize(text)))
+    return time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TTS 파이프라인 벤치마크")
+    parser.add_argument("--synth-ms", type=float, default=700.0, help="시뮬레이션 문장당 합성 지연")
+    parser.add_argument("--prefetch", type=int, default=2)
+    parser.add_argument("--gap-ms", type=float, default=120.0)
+    parser.add_argument("--live", action="store_true", help="OpenAI TTS + 실제 출력 장치 사용")
+    args = parser.parse_args()
+
+    if args.live:
+        from dotenv import load_dotenv
+        from openai import OpenAI
+
+        from voice.audio_output import AudioOutput
+        load_dotenv()
+        synthesize, output = live_synthesize(OpenAI()), AudioOutput(SAMPLE_RATE)
+    else:
+        synthesize, output = simulated_synthesize(args.synth_ms / 1000), SimulatedOutput()
+
+    serial = serial_wall_time(synthesize, output)
+    pipeline = TTSPipeline(synthesize, output, prefetch=args.prefetch, gap_ms=args.gap_ms)
+    report = pipeline.speak(ANSWER)
+    pipeline.close()
+
+    print(f"문장 {len(ANSWER)}개, 오디오 {report['audio_s']:.1f}초")
+    print(f"serial   wall {serial:.2f}초")
+    print(f"pipeline wall {report['wall_s']:.2f}초 (첫 오디오 {report['ttfa_s'] * 1000:.0f}ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+TTS 첫 오디오까지 걸린 시간(TTFA) 벤치마크
+
+기존 방식(전체 응답 수신 -> 피크 정규화 -> 0.2초 대기 후 sd.play)과
+스트리밍 방식(with_streaming_response 청크 -> 지터 버퍼 prebuffer 충족 시 재생)의
+TTFA를 같은 문장으로 비교합니다. OPENAI_API_KEY가 필요합니다.
+--play를 주면 스트리밍 방식은 실제 출력 장치로 재생하며 콜백 기준 TTFA를 측정합니다.
+
+사용법 (저장소 루트에서):
+    python -m benchmarks.bench_tts_ttfa [--repeat 3] [--prebuffer-ms 60] [--play]
+"""
+import argparse
+import os
+import statistics
+import time
+
+import numpy as np
+from dotenv import load_dotenv
+
+from voice.audio_output import AudioOutput
+
+SENTENCES = [
+    "치킨버거는 5,900원입니다.",
+    "새우가 들어가지 않은 비건 메뉴로는 두부 샐러드와 과일 스무디가 있어요.",
+    "안녕하세요! 메뉴 추천이나 주문을 도와드릴까요?",
+]
+SAMPLE_RATE = 24000
+TTS_OPTIONS = {"model": "gpt-4o-mini-tts", "voice": "nova", "response_format": "pcm", "speed": 1.0}
+
+
+def legacy_ttfa(client, text: str) -> float:
+    """기존 _create_tts_stream + _play_audio_stream 경로에서 재생 시작까지 걸린 시간"""
+    t0 = time.perf_counter()
+    response = client.audio.speech.create(input=text, **TTS_OPTIONS)
+    audio = np.frombuffer(response.content, dtype=np.int16)
+    max_val = np.max(np.abs(audio))
+    if max_val > 0:
+        audio = (audio.astype(np.float32) / max_val * 0.8 * 32767).astype(np.int16)
+    time.sleep(0.2)  # 기존 재생 전 고정 지연
+    return time.perf_counter() - t0
+
+
+def streaming_ttfa(client, text: str, prebuffer_ms: float, output=None) -> float:
+    """스트리밍 경로에서 지터 버퍼가 채워져 재생이 시작되기까지 걸린 시간"""
+    prebuffer_bytes = int(SAMPLE_RATE * prebuffer_ms / 1000) * 2
+    t0 = time.perf_counter()
+    ttfa = None
+    received = 0
+    if output is not None:
+        output.begin()
+    with client.audio.speech.with_streaming_response.create(input=text, **TTS_OPTIONS) as response:
+        for chunk in response.iter_bytes(chunk_size=4800):
+            received += len(chunk)
+            if output is not None:
+                output.write(chunk)
+            elif ttfa is None and received >= prebuffer_bytes:
+                ttfa = time.perf_counter() - t0
+    if output is not None:
+        output.end()
+        output.wait(timeout=received / 2 / SAMPLE_RATE + 2.0)
+        ttfa = output.first_audio_at - t0 if output.first_audio_at else None
+    return ttfa if ttfa is not None else time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TTS TTFA 벤치마크")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--prebuffer-ms", type=float, default=60.0)
+    parser.add_argument("--play", action="store_true", help="스트리밍 방식을 실제 장치로 재생")
+    args = parser.parse_args()
+
+    load_dotenv()
+    if not os.getenv("OPENAI_API_KEY"):
+        print("OPENAI_API_KEY가 필요합니다.")
+        return
+    from openai import OpenAI
+    client = OpenAI()
+    output = AudioOutput(SAMPLE_RATE, prebuffer_ms=args.prebuffer_ms) if args.play else None
+
+    legacy, streaming = [], []
+    print(f"{'sentence':<40} {'legacy_ms':>10} {'stream_ms':>10}")
+    for text in SENTENCES:
+        for _ in range(args.repeat):
+            before = legacy_ttfa(client, text)
+            after = streaming_ttfa(client, text, args.prebuffer_ms, output)
+            legacy.append(before)
+            streaming.append(after)
+            print(f"{text[:38]:<40} {before * 1000:>10.0f} {after * 1000:>10.0f}")
+    print(f"중앙값 legacy {statistics.median(legacy) * 1000:.0f} ms / "
+          f"streaming {statistics.median(streaming) * 1000:.0f} ms")
+    if output is not None:
+        print(f"지터 버퍼 언더런: {output.underruns}회")
+        output.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+VAD 발화 구간 검출 벤치마크 (WAV 파일 입력)
+
+WAV 파일을 마이크처럼 30ms 프레임으로 흘려 보내면서 Endpointer가 찾은 발화 구간과
+턴마다 입력 대기에 걸린 오디오 시간(말 시작 대기 + 발화 + hangover)을
+기존 고정 5초 녹음 + 1.5초 안정화 대기와 비교합니다.
+WAV는 16kHz 16-bit 이어야 하며, 지정하지 않으면 말소리 비슷한 합성 신호로 만든 예시 파일을 사용합니다.
+
+사용법 (저장소 루트에서):
+    python -m benchmarks.bench_vad_endpointing [--wav a.wav b.wav] [--hangover-ms 600]
+    python -m benchmarks.bench_vad_endpointing --write-sample sample.wav
+"""
+import argparse
+import tempfile
+
+from tests.helpers import SAMPLE_RATE, synthetic_dialogue
+from voice.vad_capture import Endpointer, WavFileFrameSource, capture_utterance
+
+FIXED_TURN_S = 5.0 + 1.5  # 기존: 고정 5초 녹음 + 턴 사이 안정화 대기
+
+
+def run_file(path: str, hangover_ms: int, truth=None) -> None:
+    source = WavFileFrameSource(path, SAMPLE_RATE)
+    endpointer = Endpointer(SAMPLE_RATE, hangover_ms=hangover_ms)
+    print(f"\n== {path} ({len(source.samples) / SAMPLE_RATE:.1f}초) ==")
+    print(f"{'#':>2} {'start_s':>8} {'end_s':>7} {'speech_s':>9} {'turn_s':>7} {'fixed_s':>8}")
+    turns, turn_total = 0, 0.0
+    with source:
+        while not source.exhausted:
+            listen_from = source.position_s
+            utterance = capture_utterance(source, endpointer)
+            if not utterance:
+                continue
+            frame_s = endpointer.frame_ms / 1000
+            start_s = listen_from + endpointer.start_frame * frame_s
+            end_s = listen_from + endpointer.end_frame * frame_s
+            turn_s = source.position_s - listen_from  # 말 끝 감지(hangover)까지 포함
+            turns += 1
+            turn_total += turn_s
+            line = (f"{turns:>2} {start_s:>8.2f} {end_s:>7.2f} {len(utterance) / 2 / SAMPLE_RATE:>9.2f} "
+                    f"{turn_s:>7.2f} {FIXED_TURN_S:>8.2f}")
+            if truth and turns <= len(truth):
+                line += f"  (실제 {truth[turns - 1][0]:.2f}~{truth[turns - 1][1]:.2f})"
+            print(line)
+    if turns:
+        print(f"발화 {turns}개, 턴당 입력 시간 평균 {turn_total / turns:.2f}초 (기존 {FIXED_TURN_S:.1f}초)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="VAD 발화 구간 검출 벤치마크")
+    parser.add_argument("--wav", nargs="+", help="16kHz 16-bit WAV 파일")
+    parser.add_argument("--hangover-ms", type=int, default=600)
+    parser.add_argument("--write-sample", help="합성 예시 WAV를 저장하고 종료")
+    args = parser.parse_args()
+
+    if args.write_sample:
+        synthetic_dialogue(args.write_sample)
+        print(f"저장: {args.write_sample}")
+        return
+
+    if args.wav:
+        for path in args.wav:
+            run_file(path, args.hangover_ms)
+        return
+
+    with tempfile.NamedTemporaryFile(suffix=".wav") as tmp:
+        truth = synthetic_dialogue(tmp.name)
+        run_file(tmp.name, args.hangover_ms, truth)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+추론 서버 부하 테스트
+
+로컬에서 띄운 server.py에 동시 요청을 보내 p50/p99 지연시간과 초당 처리량을 출력합니다.
+
+사용법 (저장소 루트에서, 서버 실행 후):
+    python -m benchmarks.load_test age 얼굴이미지.jpg [--concurrency 8] [--requests 200]
+    python -m benchmarks.load_test chat "치킨버거 얼마예요?" [--concurrency 2] [--requests 10]
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+
+def percentile(values, pct):
+    """정렬된 값에서 백분위수 계산 (nearest-rank)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="추론 서버 부하 테스트")
+    parser.add_argument("endpoint", choices=["age", "chat"])
+    parser.add_argument("payload", help="age: JPEG 파일 경로, chat: 사용자 발화 텍스트")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=100)
+    args = parser.parse_args()
+
+    if args.endpoint == "age":
+        with open(args.payload, "rb") as f:
+            image = f.read()
+
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_maxsize=args.concurrency)
+    session.mount("http://", adapter)
+
+    def one_request(_):
+        t0 = time.perf_counter()
+        if args.endpoint == "age":
+            r = session.post(f"{args.url}/age", files={"image": ("face.jpg", image, "image/jpeg")})
+            r.raise_for_status()
+        else:
+            # 첫 오디오 청크가 도착하는 시점과 전체 완료 시점을 모두 측정
+            first = None
+            with session.post(f"{args.url}/chat", json={"text": args.payload}, stream=True) as r:
+                r.raise_for_status()
+                for _chunk in r.iter_content(chunk_size=4096):
+                    if first is None:
+                        first = time.perf_counter() - t0
+            return time.perf_counter() - t0, first
+        return time.perf_counter() - t0, None
+
+    latencies, firsts, errors = [], [], 0
+    t_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        futures = [pool.submit(one_request, i) for i in range(args.requests)]
+        for future in futures:
+            try:
+                latency, first = future.result()
+                latencies.append(latency)
+                if first is not None:
+                    firsts.append(first)
+            except Exception as e:
+                errors += 1
+                print(f"[요청 실패] {e}")
+    wall = time.perf_counter() - t_start
+
+    print(f"요청 {len(latencies)}건 성공, {errors}건 실패, 동시성 {args.concurrency}")
+    print(f"p50 {percentile(latencies, 50) * 1000:.1f} ms, p99 {percentile(latencies, 99) * 1000:.1f} ms")
+    if firsts:
+        print(f"첫 오디오 p50 {percentile(firsts, 50) * 1000:.1f} ms, "
+              f"p99 {percentile(firsts, 99) * 1000:.1f} ms")
+    print(f"처리량 {len(latencies) / wall:.1f} requests/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,22 +1,47 @@
-from utils.deepface_webcam import get_predicted_age
+from utils.age_estimator import StreamingAgeEstimator, age_category
+from utils.age_service import AgeService
+from utils.deepface_webcam import close_camera_sessions, estimate_age, warmup
+from utils.model_registry import format_timings
 
 
-def get_age_from_webcam(camera_index: int = 0):
+def get_age_from_webcam(camera_index: int = 0, max_samples: int = 15):
     """
     로컬 웹캠에서 얼굴을 캡처하고 예측된 나이만 반환합니다.
+    웹캠은 공유 카메라 세션으로 한 번만 열어 두고 최신 프레임을 재사용합니다.
+    여러 프레임의 예측을 모아 60세 기준 판단이 안정되면 바로 종료합니다.
+    (max_samples: 최대 추론 횟수 -> 지연시간/정확도 조절)
     얼굴이 감지되지 않거나 분석 실패 시 None 반환.
     """
-    return get_predicted_age(camera_index=camera_index)
+    estimator = StreamingAgeEstimator(max_samples=max_samples)
+    return estimate_age(camera_index=camera_index, estimator=estimator).age
 
 
-def classify_age_from_webcam(camera_index: int = 0):
+def classify_age_from_webcam(camera_index: int = 0, max_samples: int = 15):
     """
     60세 이상/미만 분류 문자열을 반환합니다. (None 가능)
     """
-    age = get_age_from_webcam(camera_index=camera_index)
-    if age is None:
-        return None
-    return "60세 이상" if age >= 60 else "60세 미만"
+    age = get_age_from_webcam(camera_index=camera_index, max_samples=max_samples)
+    return age_category(age)
+
+
+_age_services = {}
+
+
+def get_age_service(camera_index: int = 0) -> AgeService:
+    """
+    백그라운드에서 나이를 분석하는 서비스를 반환합니다. (카메라별 1개)
+    service.submit() -> Future, await service.classify_age() 로 UI/음성 루프를 막지 않고 사용.
+    """
+    if camera_index not in _age_services:
+        _age_services[camera_index] = AgeService(camera_index=camera_index)
+    return _age_services[camera_index]
+
+
+async def classify_age_from_webcam_async(camera_index: int = 0):
+    """
+    classify_age_from_webcam의 비동기 버전 (이벤트 루프를 막지 않음)
+    """
+    return await get_age_service(camera_index).classify_age()
 
 
 def main():
@@ -26,6 +51,11 @@ def main():
     print("종료하려면 Ctrl+C를 누르세요.")
     print("=" * 40)
     
+    # 모델을 미리 로드하고 워밍업하여 첫 손님의 대기 시간을 줄임
+    print("모델을 준비하는 중...")
+    timings = warmup()
+    print(f"모델 준비 완료 ({format_timings(timings)})")
+    
     try:
         while True:
             print("\n나이 감지를 시작합니다...")
@@ -33,8 +63,7 @@ def main():
             
             if age is not None:
                 print(f"감지된 나이: {age}세")
-                category = "60세 이상" if age >= 60 else "60세 미만"
-                print(f"분류: {category}")
+                print(f"분류: {age_category(age)}")
             else:
                 print("얼굴을 감지할 수 없습니다. 다시 시도해주세요.")
             
@@ -50,6 +79,10 @@ def main():
                 
     except KeyboardInterrupt:
         print("\n프로그램을 종료합니다.")
+    finally:
+        for service in _age_services.values():
+            service.stop()
+        close_camera_sessions()
 
 
 if __name__ == "__main__":
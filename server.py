@@ -0,0 +1,200 @@
+"""
+키오스크 추론 서버
+
+여러 키오스크가 하나의 추론 서버를 호출할 수 있도록 HTTP API를 제공합니다.
+- POST /age  : JPEG 업로드 -> 나이/성별 분류 (여러 클라이언트의 요청을 배치로 묶어 추론)
+- POST /chat : 텍스트 -> LLM 응답 -> 24kHz 16-bit mono PCM 스트리밍
+- GET /metrics : 구간별 지연 히스토그램/이벤트 수 (Prometheus 텍스트 형식)
+모델은 서버 시작 시 한 번 로드/워밍업하여 프로세스 안에서 계속 유지합니다.
+
+실행 (저장소 루트에서):
+    python server.py [--host 0.0.0.0] [--port 8000]
+"""
+import argparse
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+
+import cv2
+import numpy as np
+from fastapi import FastAPI, File, HTTPException, UploadFile
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from pydantic import BaseModel
+
+from utils.age_estimator import age_category
+from utils.deepface_webcam import analyze_faces_batch, detect_main_face_bgr, warmup
+from utils.tracing import get_tracer
+from voice.sentence_segmenter import iter_sentences
+from voice.voice_chat import VoiceChat
+
+
+class MicroBatcher:
+    """
+    여러 클라이언트의 얼굴 분석 요청을 모아 한 번의 배치 추론으로 처리
+    (최대 max_batch개 또는 max_wait 초 동안 모인 요청)
+    """
+
+    def __init__(self, max_batch: int = 16, max_wait: float = 0.01):
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.batches = 0
+        self.items = 0
+        self._queue: asyncio.Queue = None
+        self._task = None
+        # 추론은 단일 스레드에서 직렬로 실행
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="age-batch")
+
+    def start(self) -> None:
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+        self._executor.shutdown(wait=False)
+
+    async def submit(self, face_bgr):
+        """얼굴 ROI 하나를 배치 큐에 넣고 (age, gender, result) 결과를 기다림"""
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((face_bgr, future))
+        return await future
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            faces = [face for face, _ in batch]
+            try:
+                results = await loop.run_in_executor(
+                    self._executor, analyze_faces_batch, faces, self.max_batch
+                )
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            self.batches += 1
+            self.items += len(batch)
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+
+
+class ChatRequest(BaseModel):
+    text: str
+
+
+batcher = MicroBatcher()
+detect_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="face-detect")
+voice_chat: VoiceChat = None
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global voice_chat
+    # 모델을 미리 로드해 첫 요청의 지연을 없앰
+    print(f"[서버] 모델 워밍업 완료: {warmup()}")
+    # 헤드리스: 오디오 장치 초기화와 인사말 TTS 미리 합성 없이 LLM/TTS 스트리밍만 사용
+    voice_chat = VoiceChat(headless=True)
+    batcher.start()
+    yield
+    await batcher.stop()
+    detect_executor.shutdown(wait=False)
+
+
+app = FastAPI(title="Kiosk inference server", lifespan=lifespan)
+
+
+@app.get("/health")
+async def health():
+    return {
+        "status": "ok",
+        "batches": batcher.batches,
+        "avg_batch_size": batcher.items / batcher.batches if batcher.batches else 0.0,
+    }
+
+
+@app.get("/metrics")
+async def metrics():
+    """녹음/STT/LLM/TTS/나이 추정 구간 지연 히스토그램 (Prometheus 수집용)"""
+    return PlainTextResponse(get_tracer().prometheus_text(), media_type="text/plain; version=0.0.4")
+
+
+@app.post("/age")
+async def classify_age(image: UploadFile = File(...)):
+    """JPEG 이미지에서 가장 큰 얼굴의 나이/성별 분류"""
+    # 이벤트 루프에서는 요청끼리 span이 섞이지 않도록 부모를 명시 (with 중첩 대신 end())
+    tracer = get_tracer()
+    t0 = time.perf_counter()
+    root = tracer.span("server.age")
+    data = await image.read()
+    frame = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+    if frame is None:
+        root.end(error="decode")
+        raise HTTPException(status_code=400, detail="이미지를 디코딩할 수 없습니다.")
+
+    loop = asyncio.get_running_loop()
+    span = tracer.span("age.detect", parent=root)
+    detection = await loop.run_in_executor(detect_executor, detect_main_face_bgr, frame)
+    span.end(face=detection is not None)
+    if detection is None:
+        root.end(face=False)
+        return {"face": False, "age": None, "gender": None, "category": None}
+
+    face_roi, bbox = detection
+    span = tracer.span("age.infer", parent=root)
+    age, gender, _res = await batcher.submit(face_roi)
+    span.end()
+    root.end(face=True)
+    return {
+        "face": True,
+        "age": round(age),
+        "gender": gender,
+        "category": age_category(age),
+        "bbox": [int(v) for v in bbox],
+        "elapsed_ms": (time.perf_counter() - t0) * 1000,
+    }
+
+
+@app.post("/chat")
+def chat(request: ChatRequest):
+    """텍스트 -> LLM 응답 -> PCM(24kHz, 16-bit, mono) 스트리밍"""
+    if not request.text.strip():
+        raise HTTPException(status_code=400, detail="text가 비어 있습니다.")
+
+    def pcm_stream():
+        for sentence in iter_sentences(voice_chat._stream_llm_response(request.text)):
+            # TTS 청크가 도착하는 대로 전달 (문장 전체 합성을 기다리지 않음)
+            for chunk in voice_chat._iter_tts_chunks(sentence):
+                yield bytes(chunk)
+
+    return StreamingResponse(
+        pcm_stream(),
+        media_type="audio/L16; rate=24000; channels=1",
+    )
+
+
+def main() -> None:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="키오스크 추론 서버")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args()
+    uvicorn.run(app, host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,19 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from voice.menu_index import MenuIndex
+
+MENU_PATH = Path(__file__).resolve().parent.parent / "menu.json"
+
+
+@pytest.fixture(scope="session")
+def menu():
+    with open(MENU_PATH, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+@pytest.fixture(scope="session")
+def index(menu):
+    return MenuIndex(menu)
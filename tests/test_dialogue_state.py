@@ -0,0 +1,42 @@
+"""DialogueState 수량/예산 파싱 테스트"""
+import pytest
+
+from voice.dialogue_state import DialogueState
+
+
+@pytest.mark.parametrize("text, cart", [
+    ("치킨버거 두 개랑 콜라 하나 주세요", {"치킨버거": 2, "콜라": 1}),
+    ("치킨버거 둘이요 주세요", {"치킨버거": 2}),
+    ("치킨버거 3 주세요", {"치킨버거": 3}),
+    ("치킨버거 열 개 주세요", {"치킨버거": 10}),
+    ("불고기버거 세 세트 주세요", {"불고기버거": 3}),
+    # 고유어가 다른 낱말 안에 있으면 수량이 아님
+    ("청양 통새우버거 열량 낮은 걸로 주세요", {"청양 통새우버거": 1}),
+    ("불고기버거 세트 주세요", {"불고기버거": 1}),
+    ("세트 주세요", {}),
+])
+def test_order_counts(index, text, cart):
+    dialogue = DialogueState(index)
+    dialogue.add_turn(text, "네")
+    assert dict(dialogue.cart) == cart
+
+
+@pytest.mark.parametrize("text, budget", [
+    ("만원 이하 디저트 추천해 주세요", None),  # 그 질문에만 적용되는 가격 조건
+    ("예산은 만원이에요", 10000),
+    ("만원까지만 쓸게요", 10000),
+])
+def test_budget_only_when_stated(index, text, budget):
+    dialogue = DialogueState(index)
+    dialogue.add_turn(text, "네")
+    assert dialogue.max_price == budget
+
+
+def test_context_key_separates_replies_to_different_answers(index):
+    first, second = DialogueState(index), DialogueState(index)
+    first.add_turn("치킨버거 하나 주세요", "치킨버거 1개 담았습니다. 세트로 바꿔 드릴까요?")
+    second.add_turn("치킨버거 하나 주세요", "치킨버거 1개 담았습니다. 매장에서 드시나요?")
+    # 상태(장바구니/언급 메뉴)가 같아도 "네"는 직전 질문에 따라 답이 다름
+    assert first.context_key("네") != second.context_key("네")
+    # 메뉴 이름이 있는 질문은 직전 답변과 상관없이 같은 키
+    assert first.context_key("치킨버거 얼마예요?") == second.context_key("치킨버거 얼마예요?")
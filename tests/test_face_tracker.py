@@ -0,0 +1,48 @@
+"""FaceTracker 템플릿 추적 테스트 (합성 프레임)"""
+import numpy as np
+
+from utils.face_tracker import FaceTracker
+
+
+def drifting_frames(n=40, size=(240, 320), box=64, seed=0):
+    """
+    무늬 있는 '얼굴' 패치가 조금씩 움직이면서 모양이 서서히 바뀌는 프레임
+    (고개 돌림/조명 변화 흉내) -> (프레임, 실제 bbox) 목록
+    """
+    rng = np.random.default_rng(seed)
+    start, end = rng.integers(0, 255, (box, box)).astype(np.float32), rng.integers(0, 255, (box, box)).astype(np.float32)
+    frames = []
+    for i in range(n):
+        t = i / (n - 1)
+        patch = (1 - t) * start + t * end
+        frame = np.full(size, 30, np.float32) + rng.normal(0, 4, size)
+        x, y = 100 + i, 80 + i // 2
+        frame[y:y + box, x:x + box] = patch
+        gray = np.clip(frame, 0, 255).astype(np.uint8)
+        frames.append((np.repeat(gray[:, :, None], 3, axis=2), (x, y, box, box)))
+    return frames
+
+
+def run(tracker, frames):
+    errors = []
+    for frame, (x, y, _, _) in frames:
+        bx, by, _, _ = tracker.detect(frame)[0]
+        errors.append(abs(bx - x) + abs(by - y))
+    return errors
+
+
+def test_template_refresh_follows_gradual_change():
+    frames = drifting_frames()
+    truth = {id(frame): bbox for frame, bbox in frames}
+
+    def detect(frame):
+        return [truth[id(frame)]]
+
+    refreshed = FaceTracker(detect, redetect_every=1000, template_width=64)
+    errors = run(refreshed, frames)
+    assert refreshed.misses == 1  # 처음 한 번만 전체 검출
+    assert max(errors) <= 2
+
+    frozen = FaceTracker(detect, redetect_every=1000, template_width=64, refresh_score=2.0)
+    run(frozen, frames)
+    assert frozen.track_losses > 0  # 검출 때 템플릿만 쓰면 모양이 바뀌면서 놓침
@@ -0,0 +1,32 @@
+"""FastPathResponder 템플릿 응답 테스트 (세션 제약 반영)"""
+from voice.dialogue_state import DialogueState
+from voice.fast_path import FastPathResponder
+
+
+def test_superlative_direction(index):
+    fast_path = FastPathResponder(index)
+    assert "콜라" in fast_path.answer("제일 싼 거 뭐예요?")
+    assert "13,900원" in fast_path.answer("제일 비싼 거 뭐예요?")
+
+
+def test_session_allergy_filters_fast_answer(index):
+    fast_path = FastPathResponder(index)
+    assert "아이스크림" in fast_path.answer("칼로리 제일 낮은 디저트")  # 아이스크림에는 밀이 들어감
+
+    dialogue = DialogueState(index)
+    dialogue.add_turn("밀 알레르기 있어요", "네, 밀이 들어가지 않은 메뉴로 안내해 드릴게요.")
+    answer = fast_path.answer("칼로리 제일 낮은 디저트", dialogue.allergies, dialogue.diet)
+    assert "아이스크림" not in answer
+    assert answer.startswith("밀 없는 메뉴 중")
+    assert "팥빙수" in answer
+
+
+def test_allergy_in_same_utterance_excludes(index):
+    answer = FastPathResponder(index).answer("밀 알레르기 있는데 칼로리 제일 낮은 디저트는?")
+    assert "팥빙수" in answer
+
+
+def test_contains_question_keeps_session_allergen(index):
+    # "밀 들어간 메뉴"는 피할 메뉴를 묻는 것이므로 세션 제약으로 밀을 빼지 않음
+    answer = FastPathResponder(index).answer("밀 들어간 메뉴 있어요?", {"밀"})
+    assert "치킨버거" in answer
@@ -0,0 +1,21 @@
+"""AudioCache 디스크 정리 테스트 (mmap으로 열린 항목)"""
+from voice.response_cache import AudioCache
+
+
+def test_evict_skips_entries_still_mapped(tmp_path):
+    AudioCache(tmp_path).put("aa01", b"\1" * 1000)
+
+    cache = AudioCache(tmp_path, max_disk_bytes=2500)  # 새 프로세스처럼 디스크에서 mmap으로 읽음
+    playing = cache.get("aa01")
+    assert isinstance(playing, memoryview)
+    first_path = cache._path("aa01")
+
+    cache.put("bb02", b"\2" * 1000)
+    cache.put("cc03", b"\3" * 1000)  # 용량 초과: 가장 오래된 aa01은 재생 중이라 건너뜀
+    assert first_path.exists()
+    assert bytes(playing[:2]) == b"\1\1"
+
+    del playing  # 재생 끝
+    cache.put("dd04", b"\4" * 1000)
+    assert not first_path.exists()
+    assert cache.stats()["disk_bytes"] <= 2500
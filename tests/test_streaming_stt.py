@@ -0,0 +1,105 @@
+"""LocalSTTServer + ScriptedRecognizer로 StreamingTranscriber/SpeculationController 테스트"""
+import socket
+import time
+
+import pytest
+
+from voice.speculation import SpeculationController
+from voice.streaming_stt import LocalSTTServer, ScriptedRecognizer, StreamingTranscriber
+
+SAMPLE_RATE = 16000
+FRAME = b"\x00\x00" * (SAMPLE_RATE * 30 // 1000)  # 30ms 무음 프레임 (대본 인식기는 길이만 봄)
+
+
+def speak(transcriber, seconds: float, speech_end_at, settle_s: float = 0.0):
+    """리스너 스레드처럼 speech_started -> speech_frame... -> speech_ended 호출"""
+    transcriber.speech_started(FRAME * 10)
+    for _ in range(int(seconds / 0.03)):
+        transcriber.speech_frame(FRAME)
+    time.sleep(settle_s)  # 중간 결과가 안정될 시간 (말 끝 hangover)
+    transcriber.speech_ended(FRAME * int(seconds / 0.03), speech_end_at)
+
+
+def fake_llm(text):
+    yield f"{text} 답변"
+
+
+@pytest.fixture
+def server():
+    script = [("불고기버거 세트", "불고기버거 세트 두 개"), "콜라 하나요"]
+    server = LocalSTTServer(ScriptedRecognizer(script, chars_per_second=20, final_delay_ms=0)).start()
+    yield server
+    server.stop()
+
+
+def test_session_for_matches_final_by_speech_end(server):
+    partials = []
+    transcriber = StreamingTranscriber(server.address, on_partial=partials.append)
+    transcriber.speech_started(FRAME * 10)
+    transcriber.speech_ended(None, None)  # 짧은 잡음: 세션 취소, 대본은 다음 발화에 다시 사용
+    time.sleep(0.2)  # 서버가 취소를 처리해 대본을 돌려놓을 때까지
+    speak(transcriber, 1.5, 1.0)
+    speak(transcriber, 1.5, 2.0)
+
+    second = transcriber.session_for(2.0)
+    first = transcriber.session_for(1.0)
+    assert first.result(timeout=2.0) == "불고기버거 세트 두 개"
+    assert second.result(timeout=2.0) == "콜라 하나요"
+    assert first.partial == "불고기버거 세트"
+    assert "불고기버거 세트" in partials and "콜라 하나요" in partials
+    assert transcriber.session_for(1.0) is None  # 한 번 꺼낸 세션은 다시 나오지 않음
+    first.close()
+    second.close()
+
+
+def test_unreachable_server_falls_back_to_batch():
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        address = probe.getsockname()  # 아무도 듣지 않는 포트
+    transcriber = StreamingTranscriber(address, connect_timeout=0.2)
+    speak(transcriber, 0.5, 1.0)
+    assert transcriber.session_for(1.0, timeout=2.0) is None
+    assert transcriber.failures == 1
+
+
+def test_stalled_server_does_not_block_listener_thread():
+    with socket.socket() as stalled:
+        stalled.bind(("127.0.0.1", 0))
+        stalled.listen(1)  # 연결은 받지만 읽지 않음 -> 송신 버퍼가 차면 전송이 멈춤
+        transcriber = StreamingTranscriber(stalled.getsockname(), max_queue=4)
+        started = time.perf_counter()
+        speak(transcriber, 600.0, 1.0)  # 약 19MB 오디오
+        assert time.perf_counter() - started < 5.0
+        assert transcriber.dropped > 0
+        assert transcriber.session_for(1.0, timeout=0.2) is None
+
+
+def test_speculation_counts_hits_misses_and_restarts(server):
+    speculation = SpeculationController(fake_llm, stable_ms=50, max_restarts=2)
+    transcriber = StreamingTranscriber(server.address, on_partial=speculation.on_partial)
+
+    # 중간 결과("불고기버거 세트")와 최종 결과가 다름 -> 미리 시작한 요청 취소
+    speak(transcriber, 1.5, 1.0, settle_s=0.3)
+    session = transcriber.session_for(1.0)
+    assert speculation.resolve(session.result(timeout=2.0)) is None
+    session.close()
+
+    # 중간 결과가 최종 결과와 같음 -> 미리 받은 응답 재사용
+    speak(transcriber, 1.5, 2.0, settle_s=0.3)
+    session = transcriber.session_for(2.0)
+    speculative = speculation.resolve(session.result(timeout=2.0))
+    session.close()
+    assert speculative is not None
+    assert list(speculative.stream()) == ["콜라 하나요 답변"]
+
+    # 안정된 중간 결과가 바뀔 때마다 다시 시작 (발화당 max_restarts회까지)
+    for text in ("아이스 아메리카노", "아이스 아메리카노 한 잔", "아이스 아메리카노 두 잔", "아이스 라떼 두 잔"):
+        speculation.on_partial(text)
+        time.sleep(0.15)
+    assert speculation.resolve("아이스 아메리카노 두 잔") is not None
+
+    stats = speculation.stats()
+    assert stats["hits"] == 2
+    assert stats["misses"] == 1
+    assert stats["restarts"] == 2
+    assert stats["started"] == 2 + 3
@@ -0,0 +1,29 @@
+"""STT 업로드 WAV 파일 객체 테스트"""
+import io
+import wave
+
+from voice.stt_upload import build_upload, encode_wav, payload_size
+
+
+def test_encode_wav_reads_as_wav_in_chunks():
+    pcm = bytes(range(256)) * 375  # 48000바이트 = 1.5초
+    payload = encode_wav(pcm)
+    assert payload_size(payload) == len(pcm) + 44
+    chunks = iter(lambda: payload.read(4096), b"")
+    with wave.open(io.BytesIO(b"".join(chunks))) as wav_file:
+        assert wav_file.getframerate() == 16000
+        assert wav_file.readframes(wav_file.getnframes()) == pcm
+
+
+def test_encode_wav_does_not_copy_pcm():
+    pcm = bytearray(3200)
+    payload = encode_wav(pcm)
+    pcm[0] = 7  # 만든 뒤 바꾼 값이 보이면 복사하지 않고 참조 중
+    payload.seek(44)
+    assert payload.read(1) == b"\x07"
+
+
+def test_build_upload_is_a_file_object():
+    filename, payload, mime = build_upload(b"\0\0" * 160)
+    assert (filename, mime) == ("speech.wav", "audio/wav")
+    assert isinstance(payload, io.IOBase) and payload.readable()
@@ -0,0 +1,35 @@
+"""Tracer span/이벤트 기록과 /metrics 내보내기 테스트"""
+import time
+import urllib.error
+import urllib.request
+
+import pytest
+
+from utils.tracing import Tracer, start_metrics_server
+
+
+def test_span_since_backdates_start():
+    tracer = Tracer(echo_level="error")
+    with tracer.span("listen") as listen:
+        tracer.span_since("record", time.perf_counter() - 0.5, parent=listen, speech_s=0.5).end()
+    record = next(r for r in tracer.recent if r["name"] == "record")
+    assert record["parent"] == listen.span_id
+    assert record["duration_ms"] >= 500
+
+
+def test_metrics_server_serves_prometheus_text():
+    tracer = Tracer(echo_level="error")
+    tracer.span("beep").end()
+    tracer.event("stt.stream_send_failed", "전송 실패", level="error")
+    server = start_metrics_server(0, host="127.0.0.1", tracer=tracer)
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}"
+        with urllib.request.urlopen(f"{url}/metrics", timeout=2.0) as response:
+            body = response.read().decode("utf-8")
+        assert 'kiosk_span_duration_seconds_count{span="beep"} 1' in body
+        assert 'kiosk_events_total{event="stt.stream_send_failed",level="error"} 1' in body
+        with pytest.raises(urllib.error.HTTPError):
+            urllib.request.urlopen(f"{url}/other", timeout=2.0)
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,72 @@
+"""WAV -> WavFileFrameSource -> Endpointer -> UtteranceListener 발화 분할 테스트"""
+import pytest
+
+from tests.helpers import DEFAULT_LAYOUT, SAMPLE_RATE, synthetic_dialogue
+from voice.vad_capture import Endpointer, UtteranceListener, WavFileFrameSource
+
+
+class BoundaryObserver:
+    """speech_ended 때마다 Endpointer가 잡은 발화 구간(초)을 기록"""
+
+    def __init__(self, endpointer: Endpointer):
+        self.endpointer = endpointer
+        self.started = 0
+        self.boundaries = []
+
+    def speech_started(self, audio: bytes) -> None:
+        self.started += 1
+
+    def speech_frame(self, frame: bytes) -> None:
+        pass
+
+    def speech_ended(self, utterance, speech_end_at) -> None:
+        if utterance:
+            frame_s = self.endpointer.frame_ms / 1000
+            self.boundaries.append((self.endpointer.start_frame * frame_s, self.endpointer.end_frame * frame_s))
+
+
+def listen(path, **endpointer_kwargs):
+    """파일 끝까지 들은 뒤 (발화 PCM 목록, observer, listener)"""
+    endpointer = Endpointer(SAMPLE_RATE, **endpointer_kwargs)
+    observer = BoundaryObserver(endpointer)
+    listener = UtteranceListener(WavFileFrameSource(path, SAMPLE_RATE), endpointer, observer=observer).start()
+    utterances = []
+    try:
+        while not listener.exhausted:
+            item = listener.get(timeout=1.0)
+            if item is not None:
+                utterances.append(item[0])
+    finally:
+        listener.stop()
+    return utterances, observer, listener
+
+
+def test_listener_splits_each_utterance(tmp_path):
+    path = tmp_path / "dialogue.wav"
+    truth = synthetic_dialogue(str(path))
+
+    utterances, observer, listener = listen(path)
+
+    assert len(utterances) == len(DEFAULT_LAYOUT)
+    assert listener.utterance_count == len(DEFAULT_LAYOUT)
+    assert observer.started == len(DEFAULT_LAYOUT)
+    for (start_s, end_s), (true_start, true_end), pcm in zip(observer.boundaries, truth, utterances):
+        # 시작은 프리롤(300ms)만큼 앞당겨지고, 끝은 실제 말 끝에 가까워야 함
+        assert true_start - 0.4 <= start_s <= true_start + 0.1
+        assert end_s == pytest.approx(true_end, abs=0.15)
+        # 뒤 hangover 무음은 잘라서 보냄
+        assert len(pcm) / 2 / SAMPLE_RATE < (true_end - true_start) + 0.6
+
+
+def test_short_burst_below_min_speech_is_rejected(tmp_path):
+    path = tmp_path / "burst.wav"
+    synthetic_dialogue(str(path), layout=[(0.8, 1.2), (1.0, 0.12), (1.0, 0.9)])
+
+    utterances, observer, listener = listen(path)
+    assert len(utterances) == 2
+    assert listener.utterance_count == 2
+    assert observer.started == 3  # 짧은 잡음도 말 시작으로는 잡히지만 발화로 내보내지 않음
+
+    # 최소 길이를 낮추면 같은 잡음이 발화로 나옴
+    utterances, _, _ = listen(path, min_speech_ms=60)
+    assert len(utterances) == 3
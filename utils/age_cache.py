@@ -0,0 +1,89 @@
+import threading
+import time
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+
+def face_dhash(face_bgr, hash_size=8):
+	"""
+	64-bit difference hash of a face ROI.
+	Compares neighbouring pixels of a (hash_size+1) x hash_size grayscale
+	thumbnail, so small shifts, exposure and scale changes keep the hash
+	within a few bits. The image itself cannot be recovered from it.
+	"""
+	gray = cv2.cvtColor(face_bgr, cv2.COLOR_BGR2GRAY)
+	small = cv2.resize(gray, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
+	bits = (small[:, 1:] > small[:, :-1]).ravel()
+	return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+class AgeResultCache:
+	"""
+	Short-lived in-memory cache of (age, confidence) predictions keyed by a
+	perceptual hash of the face ROI. A lookup matches the closest stored
+	hash within max_distance bits (Hamming). Entries expire after ttl
+	seconds and the least recently used entry is evicted beyond max_size.
+	Only hashes and results are kept, never the image.
+	ttl defaults to 30 seconds: long enough for the same customer to
+	answer "다시 시도하시겠습니까?" or step back into the frame (a retry
+	interaction takes roughly 10-20 seconds), and short enough to lapse
+	in the gap before the next customer reaches the kiosk. The match is
+	global (not tied to a tracked person), so max_distance stays tight
+	(3 bits) and callers pass min_confidence, so that a different face
+	in a similar pose does not inherit the previous age within the ttl.
+	"""
+
+	def __init__(self, ttl=30.0, max_size=64, max_distance=3):
+		self.ttl = ttl
+		self.max_size = max_size
+		self.max_distance = max_distance
+		self._entries = OrderedDict()  # hash -> (expires_at, value)
+		self._lock = threading.Lock()
+		self.hits = 0
+		self.misses = 0
+
+	def key(self, face_bgr):
+		return face_dhash(face_bgr)
+
+	def get(self, key, min_confidence=0.0):
+		"""
+		Return the cached (age, confidence) of the nearest matching face whose
+		confidence is at least min_confidence, or None.
+		"""
+		now = time.monotonic()
+		with self._lock:
+			self._expire(now)
+			best, best_dist = None, self.max_distance + 1
+			for stored, (_, value) in self._entries.items():
+				if value[1] < min_confidence:
+					continue
+				dist = bin(stored ^ key).count("1")
+				if dist < best_dist:
+					best, best_dist = stored, dist
+			if best is None:
+				self.misses += 1
+				return None
+			self._entries.move_to_end(best)
+			self.hits += 1
+			return self._entries[best][1]
+
+	def put(self, key, value):
+		with self._lock:
+			self._entries[key] = (time.monotonic() + self.ttl, value)
+			self._entries.move_to_end(key)
+			while len(self._entries) > self.max_size:
+				self._entries.popitem(last=False)
+
+	def clear(self):
+		with self._lock:
+			self._entries.clear()
+
+	def __len__(self):
+		return len(self._entries)
+
+	def _expire(self, now):
+		expired = [k for k, (expires_at, _) in self._entries.items() if expires_at <= now]
+		for k in expired:
+			del self._entries[k]
@@ -0,0 +1,202 @@
+import math
+import time
+
+
+def bbox_iou(a, b):
+	"""
+	Intersection over union of two (x, y, w, h) boxes.
+	"""
+	ax, ay, aw, ah = a
+	bx, by, bw, bh = b
+	ix = max(0, min(ax + aw, bx + bw) - max(ax, bx))
+	iy = max(0, min(ay + ah, by + bh) - max(ay, by))
+	inter = ix * iy
+	union = aw * ah + bw * bh - inter
+	return inter / union if union > 0 else 0.0
+
+
+def age_category(age, threshold=60):
+	"""
+	Return the "60세 이상"/"60세 미만" label for an age (None stays None).
+	"""
+	if age is None:
+		return None
+	return f"{threshold}세 이상" if age >= threshold else f"{threshold}세 미만"
+
+
+class AgeEstimate:
+	"""
+	Result of a multi-frame age estimation.
+	cached is True when the result came from the age cache (no inference ran).
+	"""
+
+	def __init__(self, age, decision, confidence, samples, frames, elapsed, stable, cached=False):
+		self.age = age
+		self.decision = decision  # True: threshold 이상, False: 미만, None: 얼굴 없음
+		self.confidence = confidence
+		self.samples = samples
+		self.frames = frames
+		self.elapsed = elapsed
+		self.stable = stable
+		self.cached = cached
+
+	def __repr__(self):
+		return (
+			f"AgeEstimate(age={self.age}, decision={self.decision}, "
+			f"confidence={self.confidence:.2f}, samples={self.samples}, "
+			f"frames={self.frames}, elapsed={self.elapsed:.2f}s, stable={self.stable}, "
+			f"cached={self.cached})"
+		)
+
+
+class StreamingAgeEstimator:
+	"""
+	Aggregate per-frame age predictions of the tracked main face and stop
+	as soon as the over/under-threshold decision is stable.
+
+	Ages are combined with a running median and an EMA. Confidence is the
+	normal-approximation probability that the mean age lies on the decided
+	side of the threshold, using the sample spread (floored by min_std so a
+	couple of agreeing frames are not over-trusted).
+
+	Latency/accuracy knobs: min_samples, max_samples, min_confidence, timeout.
+	no_face_timeout ends the run early when no face has been detected for
+	that long (empty kiosk), so polling callers are not held for the full
+	timeout; once a face is seen the full timeout applies.
+	"""
+
+	def __init__(
+		self,
+		threshold=60,
+		min_samples=3,
+		max_samples=15,
+		min_confidence=0.9,
+		ema_alpha=0.4,
+		min_std=4.0,
+		min_iou=0.3,
+		timeout=5.0,
+		no_face_timeout=0.5,
+	):
+		self.threshold = threshold
+		self.min_samples = min_samples
+		self.max_samples = max_samples
+		self.min_confidence = min_confidence
+		self.ema_alpha = ema_alpha
+		self.min_std = min_std
+		self.min_iou = min_iou
+		self.timeout = timeout
+		self.no_face_timeout = no_face_timeout
+		self.reset()
+
+	def reset(self):
+		self.ages = []
+		self.ema = None
+		self.bbox = None
+
+	def track(self, bboxes):
+		"""
+		Pick the face that continues the current track.
+		Starts a new track (and drops old samples) when the person changed.
+		"""
+		if not bboxes:
+			return None
+		if self.bbox is not None:
+			best = max(bboxes, key=lambda b: bbox_iou(self.bbox, b))
+			if bbox_iou(self.bbox, best) >= self.min_iou:
+				self.bbox = best
+				return best
+		# no overlap with the previous face: new customer, restart
+		best = max(bboxes, key=lambda b: b[2] * b[3])
+		if self.bbox is not None:
+			self.reset()
+		self.bbox = best
+		return best
+
+	def update(self, age):
+		age = float(age)
+		self.ages.append(age)
+		if self.ema is None:
+			self.ema = age
+		else:
+			self.ema = self.ema_alpha * age + (1 - self.ema_alpha) * self.ema
+
+	@property
+	def median(self):
+		if not self.ages:
+			return None
+		ordered = sorted(self.ages)
+		mid = len(ordered) // 2
+		if len(ordered) % 2:
+			return ordered[mid]
+		return (ordered[mid - 1] + ordered[mid]) / 2
+
+	@property
+	def decision(self):
+		median = self.median
+		if median is None:
+			return None
+		return median >= self.threshold
+
+	@property
+	def confidence(self):
+		n = len(self.ages)
+		if n == 0:
+			return 0.0
+		mean = sum(self.ages) / n
+		var = sum((a - mean) ** 2 for a in self.ages) / (n - 1) if n > 1 else 0.0
+		std = max(math.sqrt(var), self.min_std)
+		z = abs(self.median - self.threshold) / (std / math.sqrt(n))
+		return 0.5 * (1 + math.erf(z / math.sqrt(2)))
+
+	@property
+	def is_stable(self):
+		if len(self.ages) < self.min_samples:
+			return False
+		if (self.ema >= self.threshold) != self.decision:
+			return False
+		return self.confidence >= self.min_confidence
+
+	def run(self, frames, detect_fn, analyze_fn, cancel_event=None):
+		"""
+		Consume BGR frames until the decision is stable, max_samples
+		predictions were made, timeout expires, no face was detected for
+		no_face_timeout or cancel_event is set.
+		`detect_fn(frame)` returns a list of (x, y, w, h) boxes and
+		`analyze_fn(face_roi)` returns the predicted age (or None).
+		"""
+		self.reset()
+		start = time.monotonic()
+		last_face = start
+		n_frames = 0
+		for frame in frames:
+			if cancel_event is not None and cancel_event.is_set():
+				break
+			n_frames += 1
+			bbox = self.track(detect_fn(frame))
+			now = time.monotonic()
+			if bbox is None:
+				if now - last_face >= self.no_face_timeout:
+					break
+			else:
+				last_face = now
+				x, y, w, h = bbox
+				age = analyze_fn(frame[y : y + h, x : x + w])
+				if age is not None:
+					self.update(age)
+					if self.is_stable or len(self.ages) >= self.max_samples:
+						break
+			if time.monotonic() - start >= self.timeout:
+				break
+		return self.result(n_frames, time.monotonic() - start)
+
+	def result(self, n_frames=0, elapsed=0.0):
+		median = self.median
+		return AgeEstimate(
+			age=round(median) if median is not None else None,
+			decision=self.decision,
+			confidence=self.confidence,
+			samples=len(self.ages),
+			frames=n_frames,
+			elapsed=elapsed,
+			stable=self.is_stable,
+		)
@@ -0,0 +1,143 @@
+import asyncio
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.age_estimator import StreamingAgeEstimator, age_category
+from utils.deepface_webcam import estimate_age
+from utils.tracing import get_tracer
+
+
+class AgeService:
+	"""
+	Non-blocking wrapper around the webcam age estimation.
+
+	Estimations run on a single background worker (inference stays
+	serialized) with at most max_pending requests queued or running;
+	submit() raises queue.Full beyond that instead of piling up work.
+	start_continuous() keeps estimating in the background so a fresh
+	result is usually ready before anyone asks (e.g. while the voice
+	assistant is still greeting the customer).
+	"""
+
+	def __init__(self, camera_index=0, max_pending=2, estimator_options=None):
+		self.camera_index = camera_index
+		self.estimator_options = estimator_options or {}
+		self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="age-service")
+		self._slots = threading.BoundedSemaphore(max_pending)
+		self._cancel_events = {}
+		self._lock = threading.Lock()
+		self._latest = None  # (monotonic timestamp, AgeEstimate)
+		self._stop = threading.Event()
+		self._continuous_thread = None
+
+	def submit(self):
+		"""
+		Queue one estimation and return a concurrent.futures.Future that
+		resolves to an AgeEstimate. Raises queue.Full when the queue is full.
+		"""
+		if not self._slots.acquire(blocking=False):
+			raise queue.Full("나이 분석 요청이 너무 많습니다.")
+		cancel_event = threading.Event()
+		try:
+			future = self._executor.submit(self._estimate, cancel_event)
+		except Exception:
+			self._slots.release()
+			raise
+		with self._lock:
+			self._cancel_events[future] = cancel_event
+		future.add_done_callback(self._on_done)
+		return future
+
+	def cancel(self, future):
+		"""
+		Cancel a submitted request, stopping it at the next frame if it is
+		already running.
+		"""
+		with self._lock:
+			cancel_event = self._cancel_events.get(future)
+		if cancel_event is not None:
+			cancel_event.set()
+		future.cancel()
+
+	def latest(self, max_age=2.0):
+		"""
+		Most recent estimate if it is newer than max_age seconds, else None.
+		"""
+		entry = self._latest
+		if entry is None or time.monotonic() - entry[0] > max_age:
+			return None
+		return entry[1]
+
+	async def estimate(self, max_age=2.0):
+		"""
+		Await an AgeEstimate without blocking the event loop.
+		Reuses a fresh continuous-mode result when available.
+		"""
+		latest = self.latest(max_age)
+		if latest is not None and latest.stable:
+			return latest
+		future = self.submit()
+		try:
+			return await asyncio.wrap_future(future)
+		except asyncio.CancelledError:
+			self.cancel(future)
+			raise
+
+	async def classify_age(self, max_age=2.0):
+		"""
+		Await the "60세 이상"/"60세 미만" label (None if no face was found).
+		"""
+		result = await self.estimate(max_age)
+		return age_category(result.age)
+
+	def start_continuous(self, interval=0.5):
+		"""
+		Keep estimating in the background, one request at a time.
+		"""
+		if self._continuous_thread is not None and self._continuous_thread.is_alive():
+			return
+		self._stop.clear()
+		self._continuous_thread = threading.Thread(
+			target=self._continuous_loop, args=(interval,), name="age-continuous", daemon=True
+		)
+		self._continuous_thread.start()
+
+	def stop(self):
+		"""
+		Stop continuous mode, cancel pending requests and shut the worker down.
+		"""
+		self._stop.set()
+		with self._lock:
+			futures = list(self._cancel_events)
+		for future in futures:
+			self.cancel(future)
+		if self._continuous_thread is not None:
+			self._continuous_thread.join(timeout=5.0)
+			self._continuous_thread = None
+		self._executor.shutdown(wait=False)
+
+	def _estimate(self, cancel_event):
+		estimator = StreamingAgeEstimator(**self.estimator_options)
+		result = estimate_age(
+			camera_index=self.camera_index, estimator=estimator, cancel_event=cancel_event
+		)
+		if not cancel_event.is_set() and result.age is not None:
+			self._latest = (time.monotonic(), result)
+		return result
+
+	def _on_done(self, future):
+		with self._lock:
+			self._cancel_events.pop(future, None)
+		self._slots.release()
+
+	def _continuous_loop(self, interval):
+		while not self._stop.is_set():
+			try:
+				self.submit().result()
+			except queue.Full:
+				pass
+			except Exception as e:
+				get_tracer().event("age.analyze_failed", f"[나이 분석 실패] {e}", level="error", error=str(e))
+			self._stop.wait(interval)
@@ -0,0 +1,271 @@
+import os
+import threading
+import time
+from collections import deque
+
+import cv2
+import numpy as np
+
+
+class VideoCaptureSource:
+	"""
+	Frame source backed by cv2.VideoCapture.
+	`target` may be a webcam index, a video file path or a stream URL.
+	"""
+
+	def __init__(self, target=0, width=None, height=None):
+		self.target = target
+		self.width = width
+		self.height = height
+		self._cap = None
+
+	def open(self):
+		self._cap = cv2.VideoCapture(self.target)
+		if not self._cap.isOpened():
+			self._cap.release()
+			self._cap = None
+			raise RuntimeError("웹캠을 열 수 없습니다.")
+		if self.width:
+			self._cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.width)
+		if self.height:
+			self._cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.height)
+		# keep the driver-side queue short so we always see recent frames
+		self._cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+
+	def read(self):
+		if self._cap is None:
+			return None
+		ret, frame = self._cap.read()
+		return frame if ret else None
+
+	def release(self):
+		if self._cap is not None:
+			self._cap.release()
+			self._cap = None
+
+
+class FileFrameSource:
+	"""
+	Frame source that replays still images from a file or a folder.
+	Useful for running the pipeline without a camera attached.
+	"""
+
+	IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
+
+	def __init__(self, path, fps=15.0, loop=True):
+		self.path = path
+		self.fps = fps
+		self.loop = loop
+		self._frames = []
+		self._pos = 0
+
+	def open(self):
+		if os.path.isdir(self.path):
+			names = sorted(
+				n for n in os.listdir(self.path)
+				if n.lower().endswith(self.IMAGE_EXTENSIONS)
+			)
+			paths = [os.path.join(self.path, n) for n in names]
+		else:
+			paths = [self.path]
+		self._frames = [f for f in (cv2.imread(p) for p in paths) if f is not None]
+		if not self._frames:
+			raise RuntimeError(f"이미지를 불러올 수 없습니다: {self.path}")
+		self._pos = 0
+
+	def read(self):
+		if self._pos >= len(self._frames):
+			if not self.loop:
+				return None
+			self._pos = 0
+		frame = self._frames[self._pos]
+		self._pos += 1
+		if self.fps:
+			time.sleep(1.0 / self.fps)
+		return frame.copy()
+
+	def release(self):
+		self._frames = []
+
+
+class SyntheticFrameSource:
+	"""
+	Frame source that produces generated frames.
+	`frame_fn(index)` may return a BGR ndarray; by default a flat grey frame
+	is produced. Returning None simulates a read failure.
+	"""
+
+	def __init__(self, width=640, height=480, fps=30.0, frame_fn=None):
+		self.width = width
+		self.height = height
+		self.fps = fps
+		self.frame_fn = frame_fn
+		self._index = 0
+
+	def open(self):
+		self._index = 0
+
+	def read(self):
+		if self.fps:
+			time.sleep(1.0 / self.fps)
+		index = self._index
+		self._index += 1
+		if self.frame_fn is not None:
+			return self.frame_fn(index)
+		return np.full((self.height, self.width, 3), 127, dtype=np.uint8)
+
+	def release(self):
+		pass
+
+
+class CameraSession:
+	"""
+	Long-lived camera session.
+	A background thread keeps grabbing frames from `source` and stores the
+	most recent ones in a small ring buffer, so callers can fetch the latest
+	frame without paying device open/negotiation cost per prediction.
+	The source is re-opened with exponential backoff when reads keep failing.
+	"""
+
+	def __init__(
+		self,
+		source,
+		buffer_size=4,
+		warmup_frames=5,
+		max_read_failures=10,
+		reconnect_delay=0.5,
+		max_reconnect_delay=5.0,
+	):
+		self.source = source
+		self.warmup_frames = warmup_frames
+		self.max_read_failures = max_read_failures
+		self.reconnect_delay = reconnect_delay
+		self.max_reconnect_delay = max_reconnect_delay
+
+		self._frames = deque(maxlen=buffer_size)  # (seq, timestamp, frame)
+		self._cond = threading.Condition()
+		self._seq = 0
+		self._stop = threading.Event()
+		self._thread = None
+
+		self.frames_grabbed = 0
+		self.read_failures = 0
+		self.reconnects = 0
+		self.last_error = None
+
+	def start(self):
+		if self._thread is not None and self._thread.is_alive():
+			return self
+		self._stop.clear()
+		self._thread = threading.Thread(
+			target=self._run, name="camera-session", daemon=True
+		)
+		self._thread.start()
+		return self
+
+	def stop(self, timeout=2.0):
+		self._stop.set()
+		with self._cond:
+			self._cond.notify_all()
+		if self._thread is not None:
+			self._thread.join(timeout)
+			self._thread = None
+
+	@property
+	def is_running(self):
+		return self._thread is not None and self._thread.is_alive()
+
+	def __enter__(self):
+		return self.start()
+
+	def __exit__(self, *exc):
+		self.stop()
+
+	def latest(self, max_age=None):
+		"""
+		Return (seq, timestamp, frame) of the newest frame without blocking,
+		or None if no frame (or no frame newer than max_age seconds) exists.
+		"""
+		with self._cond:
+			if not self._frames:
+				return None
+			entry = self._frames[-1]
+		if max_age is not None and time.monotonic() - entry[1] > max_age:
+			return None
+		return entry
+
+	def read(self, after_seq=0, timeout=2.0):
+		"""
+		Block until a frame with seq > after_seq is available (or timeout).
+		Returns (seq, timestamp, frame) or None.
+		"""
+		deadline = time.monotonic() + timeout
+		with self._cond:
+			while not self._stop.is_set():
+				if self._frames and self._frames[-1][0] > after_seq:
+					return self._frames[-1]
+				remaining = deadline - time.monotonic()
+				if remaining <= 0:
+					return None
+				self._cond.wait(remaining)
+		return None
+
+	def frames(self, timeout=2.0):
+		"""
+		Iterate over fresh frames as they arrive; stops on timeout or stop().
+		"""
+		seq = 0
+		while not self._stop.is_set():
+			entry = self.read(after_seq=seq, timeout=timeout)
+			if entry is None:
+				return
+			seq = entry[0]
+			yield entry[2]
+
+	def _open_source(self):
+		delay = self.reconnect_delay
+		while not self._stop.is_set():
+			try:
+				self.source.open()
+				for _ in range(self.warmup_frames):
+					# discard underexposed frames while auto exposure settles
+					self.source.read()
+				return True
+			except Exception as e:
+				self.last_error = e
+				self.source.release()
+				self._stop.wait(delay)
+				delay = min(delay * 2, self.max_reconnect_delay)
+		return False
+
+	def _run(self):
+		if not self._open_source():
+			return
+		failures = 0
+		try:
+			while not self._stop.is_set():
+				try:
+					frame = self.source.read()
+				except Exception as e:
+					self.last_error = e
+					frame = None
+
+				if frame is None:
+					failures += 1
+					self.read_failures += 1
+					if failures >= self.max_read_failures:
+						self.source.release()
+						self.reconnects += 1
+						failures = 0
+						if not self._open_source():
+							return
+					continue
+
+				failures = 0
+				with self._cond:
+					self._seq += 1
+					self._frames.append((self._seq, time.monotonic(), frame))
+					self.frames_grabbed += 1
+					self._cond.notify_all()
+		finally:
+			self.source.release()
@@ -1,10 +1,68 @@
+import atexit
+import threading
+import time
+
 import cv2
 from deepface import DeepFace
 
+from utils.age_cache import AgeResultCache
+from utils.age_estimator import AgeEstimate, StreamingAgeEstimator
+from utils.face_analyzer import get_face_analyzer
+from utils.camera_session import CameraSession, VideoCaptureSource
+from utils.face_tracker import FaceTracker
+from utils.model_registry import get_registry
+from utils.tracing import get_tracer
+
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+_age_cache = AgeResultCache()
+
+
+def get_camera_session(camera_index=0):
+	"""
+	Return the shared, already-running CameraSession for camera_index.
+	The device is opened once and kept open across predictions.
+	"""
+	with _sessions_lock:
+		session = _sessions.get(camera_index)
+		if session is None:
+			session = CameraSession(VideoCaptureSource(camera_index))
+			_sessions[camera_index] = session
+		return session.start()
+
+
+def close_camera_sessions():
+	"""
+	Stop every shared camera session and release the devices.
+	"""
+	with _sessions_lock:
+		sessions = list(_sessions.values())
+		_sessions.clear()
+	for session in sessions:
+		session.stop()
+
+
+atexit.register(close_camera_sessions)
+
+
+def read_latest_frame(session, timeout=2.0):
+	"""
+	Return the newest frame of a session without blocking.
+	Only waits (up to timeout) right after start, before the first frame exists.
+	"""
+	entry = session.latest()
+	if entry is None:
+		entry = session.read(timeout=timeout)
+	if entry is None:
+		raise RuntimeError("웹캠 프레임을 캡처하지 못했습니다.")
+	return entry[2]
+
 
 def capture_frame(camera_index=0):
 	"""
 	Capture a single frame from the local webcam.
+	Opens and releases the device on every call; prefer get_camera_session().
 	"""
 	cap = cv2.VideoCapture(camera_index)
 	if not cap.isOpened():
@@ -16,15 +74,19 @@ def capture_frame(camera_index=0):
 	return frame
 
 
+def detect_faces_bgr(frame_bgr):
+	"""
+	Detect faces with the registry's detector backend (Haar by default,
+	downscaled detection) and return every bbox as (x, y, w, h).
+	"""
+	return get_registry().get_face_detector().detect(frame_bgr)
+
+
 def detect_main_face_bgr(frame_bgr):
 	"""
-	Detect faces using Haar cascade and return the largest face ROI and bbox.
+	Detect faces and return the largest face ROI and bbox.
 	"""
-	gray = cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2GRAY)
-	face_cascade = cv2.CascadeClassifier(
-		cv2.data.haarcascades + "haarcascade_frontalface_default.xml"
-	)
-	faces = face_cascade.detectMultiScale(gray, scaleFactor=1.3, minNeighbors=5)
+	faces = detect_faces_bgr(frame_bgr)
 	if len(faces) == 0:
 		return None
 	# pick the largest face
@@ -32,9 +94,10 @@ def detect_main_face_bgr(frame_bgr):
 	return frame_bgr[y : y + h, x : x + w], (x, y, w, h)
 
 
-def analyze_face_with_deepface(face_bgr):
+def analyze_face_with_deepface_full(face_bgr):
 	"""
-	Run DeepFace age/gender analysis on a face ROI (BGR ndarray).
+	Run DeepFace.analyze on a face ROI (BGR ndarray). DeepFace runs its own
+	detector over the crop again; kept as the reference path for benchmarks.
 	"""
 	face_rgb = cv2.cvtColor(face_bgr, cv2.COLOR_BGR2RGB)
 	result = DeepFace.analyze(
@@ -49,21 +112,132 @@ def analyze_face_with_deepface(face_bgr):
 	return age, gender, res0
 
 
-def get_predicted_age(camera_index=0, output_face_path=None):
+def analyze_face_with_deepface(face_bgr):
+	"""
+	Run age/gender analysis on a face ROI (BGR ndarray) we already detected.
+	Skips DeepFace's second detection pass (see FaceAnalyzer).
+	"""
+	_age, _gender, res = get_face_analyzer().analyze(face_bgr)
+	return res["age"], res["gender"], res
+
+
+def analyze_faces_batch(faces_bgr, max_batch=16):
+	"""
+	Run age/gender analysis on several face ROIs (BGR ndarrays) with one
+	network pass per chunk of max_batch faces, instead of one
+	DeepFace.analyze call per face.
+	Returns a list of (age, dominant_gender, result_dict), in input order.
+	"""
+	return get_face_analyzer().analyze_batch(faces_bgr, max_batch=max_batch)
+
+
+def get_age_cache():
+	"""
+	Return the shared age result cache (keyed by face perceptual hash).
+	"""
+	return _age_cache
+
+
+def warmup():
+	"""
+	Load the detector and age/gender models and run one dummy inference.
+	Returns the load/warmup timings in seconds.
+	"""
+	return get_registry().warmup(analyze_face_with_deepface)
+
+
+def get_predicted_age(camera_index=0, output_face_path=None, session=None):
 	"""
 	Capture from local webcam and return only the predicted age.
+	Frames come from the shared camera session (or the given session).
 	If output_face_path is provided, save detected face ROI.
 	Returns age (int/float) or None if not found.
+	A recent near-identical face returns its cached age without inference.
+	Each stage (capture / detect / infer) is recorded as a span under one
+	"age.predict" span of the shared tracer.
 	"""
-	frame = capture_frame(camera_index)
-	detection = detect_main_face_bgr(frame)
-	if detection is None:
-		return None
-	face_roi, _ = detection
-	if output_face_path:
-		cv2.imwrite(output_face_path, face_roi)
-	age, _gender, _allres = analyze_face_with_deepface(face_roi)
-	return age
+	tracer = get_tracer()
+	with tracer.span("age.predict") as root:
+		if session is None:
+			session = get_camera_session(camera_index)
+		with tracer.span("age.capture"):
+			frame = read_latest_frame(session)
+		with tracer.span("age.detect") as span:
+			detection = detect_main_face_bgr(frame)
+			span.set(face=detection is not None)
+		if detection is None:
+			root.set(face=False)
+			return None
+		face_roi, _ = detection
+		if output_face_path:
+			cv2.imwrite(output_face_path, face_roi)
+		with tracer.span("age.infer") as span:
+			key = _age_cache.key(face_roi)
+			cached = _age_cache.get(key)
+			span.set(cache=cached is not None)
+			if cached is not None:
+				return cached[0]
+			age, _gender, _allres = analyze_face_with_deepface(face_roi)
+		if age is not None:
+			_age_cache.put(key, (age, 0.0))
+		return age
+
+
+def estimate_age(
+	camera_index=0, session=None, estimator=None, tracker=None, use_cache=True, cancel_event=None
+):
+	"""
+	Multi-frame age estimation on the shared camera session.
+	Tracks the main face across frames and stops as soon as the
+	60+/under-60 decision is stable. Returns an AgeEstimate.
+	Full face detection only runs when `tracker` (a FaceTracker) loses
+	the face or its re-detection interval expires.
+	If the current face matches a recent stable estimate in the age cache,
+	that estimate is returned without running the networks (cached=True).
+	A new estimate is cached under the face it was finally computed from,
+	since the estimator restarts when the person in front changes.
+	Setting cancel_event stops the estimation at the next frame.
+	"""
+	if session is None:
+		session = get_camera_session(camera_index)
+	if estimator is None:
+		estimator = StreamingAgeEstimator()
+	if tracker is None:
+		tracker = FaceTracker(detect_faces_bgr)
+
+	start = time.monotonic()
+	if use_cache:
+		frame = read_latest_frame(session)
+		faces = tracker.detect(frame)
+		if faces:
+			x, y, w, h = max(faces, key=lambda f: f[2] * f[3])
+			cached = _age_cache.get(
+				_age_cache.key(frame[y : y + h, x : x + w]), min_confidence=estimator.min_confidence
+			)
+			if cached is not None:
+				age, confidence = cached
+				return AgeEstimate(
+					age=age,
+					decision=age >= estimator.threshold,
+					confidence=confidence,
+					samples=0,
+					frames=1,
+					elapsed=time.monotonic() - start,
+					stable=True,
+					cached=True,
+				)
+
+	last_face = []
+
+	def analyze_age(face_roi):
+		last_face[:] = [face_roi]
+		age, _gender, _allres = analyze_face_with_deepface(face_roi)
+		return age
+
+	result = estimator.run(session.frames(), tracker.detect, analyze_age, cancel_event)
+	if use_cache and result.stable and last_face:
+		_age_cache.put(_age_cache.key(last_face[0]), (result.age, result.confidence))
+	return result
 
 
 def main(camera_index=0):
@@ -0,0 +1,120 @@
+import threading
+
+import cv2
+import numpy as np
+
+from utils.model_registry import get_registry
+
+
+FACE_INPUT_SIZE = (224, 224)
+GENDER_LABELS = ("Woman", "Man")
+_AGE_BINS = np.arange(101, dtype=np.float32)
+
+
+def _keras_model(client):
+	# DeepFace >= 0.0.80 wraps the Keras model in a client object
+	return getattr(client, "model", client)
+
+
+def preprocess_face(face_bgr, out=None, scratch=None):
+	"""
+	Letterbox-resize a face ROI to the age/gender network input, convert
+	BGR->RGB and scale to [0, 1] in one pass.
+	Resizes before the colour conversion, so the conversion touches 224x224
+	pixels instead of the whole ROI. Writes into `out` (224x224x3 float32)
+	and resizes into `scratch` (flat uint8 buffer of 224*224*3) when given.
+	"""
+	th, tw = FACE_INPUT_SIZE
+	factor = min(th / face_bgr.shape[0], tw / face_bgr.shape[1])
+	h = max(1, int(face_bgr.shape[0] * factor))
+	w = max(1, int(face_bgr.shape[1] * factor))
+	if scratch is None:
+		scratch = np.empty(th * tw * 3, dtype=np.uint8)
+	resized = cv2.resize(face_bgr, (w, h), dst=scratch[: h * w * 3].reshape(h, w, 3))
+	if out is None:
+		out = np.empty((th, tw, 3), dtype=np.float32)
+	top = (th - h) // 2
+	left = (tw - w) // 2
+	out[:top] = 0
+	out[top + h :] = 0
+	out[top : top + h, :left] = 0
+	out[top : top + h, left + w :] = 0
+	np.multiply(resized[:, :, ::-1], 1.0 / 255.0, out=out[top : top + h, left : left + w], casting="unsafe")
+	return out
+
+
+class FaceAnalyzer:
+	"""
+	Age/gender analysis on face ROIs we have already detected.
+	DeepFace.analyze() runs its own detector over the crop again and
+	converts/resizes it on every call; this trusts our bbox, preprocesses
+	once into a preallocated per-thread input tensor and feeds the age and
+	gender models directly.
+	"""
+
+	def __init__(self, registry=None, max_batch=16):
+		self.registry = registry or get_registry()
+		self.max_batch = max_batch
+		self._local = threading.local()
+
+	def _buffers(self):
+		buffers = getattr(self._local, "buffers", None)
+		if buffers is None:
+			th, tw = FACE_INPUT_SIZE
+			buffers = (
+				np.zeros((self.max_batch, th, tw, 3), dtype=np.float32),
+				np.empty(th * tw * 3, dtype=np.uint8),
+			)
+			self._local.buffers = buffers
+		return buffers
+
+	def _models(self):
+		registry = self.registry.load()
+		return _keras_model(registry.age_model), _keras_model(registry.gender_model)
+
+	def analyze_batch(self, faces_bgr, max_batch=None):
+		"""
+		Analyze several face ROIs (BGR ndarrays) with one network pass per
+		chunk of max_batch faces (at most the preallocated self.max_batch).
+		Returns a list of (age, dominant_gender, result_dict), in input order.
+		"""
+		if len(faces_bgr) == 0:
+			return []
+		age_net, gender_net = self._models()
+		batch, scratch = self._buffers()
+		step = min(max_batch or self.max_batch, self.max_batch)
+
+		results = []
+		for start in range(0, len(faces_bgr), step):
+			chunk = faces_bgr[start : start + step]
+			inputs = batch[: len(chunk)]
+			for i, face in enumerate(chunk):
+				preprocess_face(face, out=inputs[i], scratch=scratch)
+			age_probs = np.asarray(age_net.predict_on_batch(inputs))
+			gender_probs = np.asarray(gender_net.predict_on_batch(inputs))
+			ages = age_probs @ _AGE_BINS
+			for age, g in zip(ages, gender_probs):
+				gender = GENDER_LABELS[int(np.argmax(g))]
+				res = {
+					"age": float(age),
+					"gender": {label: float(100 * p) for label, p in zip(GENDER_LABELS, g)},
+					"dominant_gender": gender,
+				}
+				results.append((float(age), gender, res))
+		return results
+
+	def analyze(self, face_bgr):
+		"""
+		Analyze a single face ROI. Returns (age, dominant_gender, result_dict).
+		"""
+		return self.analyze_batch([face_bgr])[0]
+
+
+_analyzer = FaceAnalyzer()
+
+
+def get_face_analyzer():
+	"""
+	Return the process-wide direct face analyzer.
+	"""
+	return _analyzer
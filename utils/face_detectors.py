@@ -0,0 +1,155 @@
+import os
+import threading
+
+import cv2
+
+
+DEFAULT_YUNET_MODEL = os.path.join(
+	os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+	"models",
+	"face_detection_yunet_2023mar.onnx",
+)
+
+
+class FaceDetector:
+	"""
+	Base class for interchangeable face detector backends.
+
+	detect() downscales the frame so its long side is at most detect_width,
+	runs the backend on the small image and rescales the boxes back to the
+	original resolution. Faces outside the kiosk-distance prior
+	(min_face_ratio..max_face_ratio of the frame's short side) are dropped.
+	Subclasses implement _detect(image, min_size, max_size).
+	OpenCV cascade/DNN objects are not safe to call from several threads
+	at once (the age-service worker and the server's detect executor share
+	one detector), so _detect runs under a per-detector lock.
+	"""
+
+	name = "base"
+
+	def __init__(self, detect_width=640, min_face_ratio=0.08, max_face_ratio=0.9):
+		self.detect_width = detect_width
+		self.min_face_ratio = min_face_ratio
+		self.max_face_ratio = max_face_ratio
+		self._lock = threading.Lock()
+
+	def detect(self, frame_bgr):
+		"""
+		Return every face bbox as (x, y, w, h) in frame_bgr coordinates.
+		"""
+		h, w = frame_bgr.shape[:2]
+		scale = 1.0
+		if self.detect_width and max(h, w) > self.detect_width:
+			scale = self.detect_width / max(h, w)
+			small = cv2.resize(
+				frame_bgr, (int(w * scale), int(h * scale)), interpolation=cv2.INTER_AREA
+			)
+		else:
+			small = frame_bgr
+
+		short_side = min(small.shape[:2])
+		min_size = max(1, int(short_side * self.min_face_ratio))
+		max_size = max(min_size, int(short_side * self.max_face_ratio))
+
+		with self._lock:
+			raw = self._detect(small, min_size, max_size)
+		boxes = []
+		for x, y, bw, bh in raw:
+			if not (min_size <= max(bw, bh) <= max_size):
+				continue
+			boxes.append((
+				int(round(x / scale)),
+				int(round(y / scale)),
+				int(round(bw / scale)),
+				int(round(bh / scale)),
+			))
+		return boxes
+
+	def _detect(self, image_bgr, min_size, max_size):
+		raise NotImplementedError
+
+
+class HaarFaceDetector(FaceDetector):
+	"""
+	OpenCV Haar cascade backend (frontal faces only, no extra model file).
+	"""
+
+	name = "haar"
+
+	def __init__(self, scale_factor=1.1, min_neighbors=5, **kwargs):
+		super().__init__(**kwargs)
+		self.scale_factor = scale_factor
+		self.min_neighbors = min_neighbors
+		self.cascade = cv2.CascadeClassifier(
+			cv2.data.haarcascades + "haarcascade_frontalface_default.xml"
+		)
+		if self.cascade.empty():
+			raise RuntimeError("얼굴 검출 모델을 불러오지 못했습니다.")
+
+	def _detect(self, image_bgr, min_size, max_size):
+		gray = cv2.cvtColor(image_bgr, cv2.COLOR_BGR2GRAY)
+		faces = self.cascade.detectMultiScale(
+			gray,
+			scaleFactor=self.scale_factor,
+			minNeighbors=self.min_neighbors,
+			minSize=(min_size, min_size),
+			maxSize=(max_size, max_size),
+		)
+		return [tuple(int(v) for v in f) for f in faces]
+
+
+class YuNetFaceDetector(FaceDetector):
+	"""
+	OpenCV DNN backend using the YuNet ONNX model (cv2.FaceDetectorYN).
+	Handles off-angle faces much better than Haar. The model file is taken
+	from model_path, $YUNET_MODEL_PATH or models/ in the repository.
+	"""
+
+	name = "yunet"
+
+	def __init__(self, model_path=None, score_threshold=0.7, nms_threshold=0.3, top_k=50, **kwargs):
+		super().__init__(**kwargs)
+		model_path = model_path or os.getenv("YUNET_MODEL_PATH") or DEFAULT_YUNET_MODEL
+		if not os.path.exists(model_path):
+			raise RuntimeError(
+				f"YuNet 모델 파일을 찾을 수 없습니다: {model_path}\n"
+				"https://github.com/opencv/opencv_zoo/tree/main/models/face_detection_yunet 에서 "
+				"face_detection_yunet_2023mar.onnx 파일을 내려받으세요."
+			)
+		self.model_path = model_path
+		self.net = cv2.FaceDetectorYN.create(
+			model_path, "", (320, 320), score_threshold, nms_threshold, top_k
+		)
+		self._input_size = (320, 320)
+
+	def _detect(self, image_bgr, min_size, max_size):
+		h, w = image_bgr.shape[:2]
+		if self._input_size != (w, h):
+			self.net.setInputSize((w, h))
+			self._input_size = (w, h)
+		_, faces = self.net.detect(image_bgr)
+		if faces is None:
+			return []
+		boxes = []
+		for f in faces:
+			x, y, bw, bh = (int(v) for v in f[:4])
+			x, y = max(0, x), max(0, y)
+			boxes.append((x, y, min(bw, w - x), min(bh, h - y)))
+		return boxes
+
+
+FACE_DETECTORS = {
+	HaarFaceDetector.name: HaarFaceDetector,
+	YuNetFaceDetector.name: YuNetFaceDetector,
+}
+
+
+def create_face_detector(backend="haar", **kwargs):
+	"""
+	Instantiate a face detector backend by name ("haar" or "yunet").
+	"""
+	try:
+		cls = FACE_DETECTORS[backend]
+	except KeyError:
+		raise ValueError(f"지원하지 않는 얼굴 검출기입니다: {backend}") from None
+	return cls(**kwargs)
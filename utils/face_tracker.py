@@ -0,0 +1,118 @@
+import time
+
+import cv2
+
+
+class FaceTracker:
+	"""
+	Face-tracking ROI cache for continuous sessions.
+
+	Full detection (`detect_fn(frame) -> [(x, y, w, h), ...]`) only runs on
+	the first frame, on track loss, or every `redetect_every` frames. In
+	between, the last face is followed with normalized template matching
+	inside a padded search window around the previous bbox, on a grayscale
+	image downscaled so the template is about template_width pixels wide.
+	On a confident match (score >= refresh_score) the template is re-cropped
+	from the matched box, so slow head turns and lighting changes do not
+	wear the score down; weaker matches keep the old template to avoid
+	drifting onto the background.
+
+	Counters: hits (tracked without detection), misses (full detections),
+	track_losses (template score below min_score) and detect_time_s.
+	"""
+
+	def __init__(self, detect_fn, redetect_every=10, pad=0.5, min_score=0.6, template_width=48, refresh_score=0.8):
+		self.detect_fn = detect_fn
+		self.redetect_every = redetect_every
+		self.pad = pad
+		self.min_score = min_score
+		self.refresh_score = refresh_score
+		self.template_width = template_width
+		self.hits = 0
+		self.misses = 0
+		self.track_losses = 0
+		self.detect_time_s = 0.0
+		self.reset()
+
+	def reset(self):
+		self.bbox = None
+		self._template = None
+		self._scale = 1.0
+		self._since_detect = 0
+
+	@property
+	def hit_rate(self):
+		total = self.hits + self.misses
+		return self.hits / total if total else 0.0
+
+	def stats(self):
+		return {
+			"hits": self.hits,
+			"misses": self.misses,
+			"track_losses": self.track_losses,
+			"hit_rate": self.hit_rate,
+			"detect_time_s": self.detect_time_s,
+		}
+
+	def detect(self, frame_bgr):
+		"""
+		Return face boxes for this frame: the tracked main face on a cache
+		hit, otherwise the result of a full detection.
+		"""
+		if self.bbox is not None and self._since_detect < self.redetect_every:
+			bbox, score = self._track(frame_bgr)
+			if bbox is not None:
+				self.hits += 1
+				self._since_detect += 1
+				self.bbox = bbox
+				if score >= self.refresh_score:
+					self._set_template(frame_bgr, bbox)
+				return [bbox]
+			self.track_losses += 1
+		return self._full_detect(frame_bgr)
+
+	def _full_detect(self, frame_bgr):
+		self.misses += 1
+		t0 = time.perf_counter()
+		faces = self.detect_fn(frame_bgr)
+		self.detect_time_s += time.perf_counter() - t0
+		self._since_detect = 0
+		if not faces:
+			self.reset()
+			return []
+		self.bbox = max(faces, key=lambda f: f[2] * f[3])
+		self._set_template(frame_bgr, self.bbox)
+		return faces
+
+	def _gray_small(self, image_bgr):
+		gray = cv2.cvtColor(image_bgr, cv2.COLOR_BGR2GRAY)
+		if self._scale == 1.0:
+			return gray
+		h, w = gray.shape
+		return cv2.resize(
+			gray, (max(1, int(w * self._scale)), max(1, int(h * self._scale))),
+			interpolation=cv2.INTER_AREA,
+		)
+
+	def _set_template(self, frame_bgr, bbox):
+		x, y, w, h = bbox
+		self._scale = min(1.0, self.template_width / max(w, 1))
+		self._template = self._gray_small(frame_bgr[y : y + h, x : x + w])
+
+	def _track(self, frame_bgr):
+		x, y, w, h = self.bbox
+		fh, fw = frame_bgr.shape[:2]
+		px, py = int(w * self.pad), int(h * self.pad)
+		x0, y0 = max(0, x - px), max(0, y - py)
+		x1, y1 = min(fw, x + w + px), min(fh, y + h + py)
+		search = self._gray_small(frame_bgr[y0:y1, x0:x1])
+		th, tw = self._template.shape
+		if search.shape[0] < th or search.shape[1] < tw:
+			return None, 0.0
+		scores = cv2.matchTemplate(search, self._template, cv2.TM_CCOEFF_NORMED)
+		_, score, _, loc = cv2.minMaxLoc(scores)
+		if score < self.min_score:
+			return None, score
+		nx = min(max(0, x0 + int(round(loc[0] / self._scale))), fw - w)
+		ny = min(max(0, y0 + int(round(loc[1] / self._scale))), fh - h)
+		return (nx, ny, w, h), score
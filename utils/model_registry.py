@@ -0,0 +1,123 @@
+import os
+import threading
+import time
+
+import numpy as np
+from deepface import DeepFace
+
+from utils.face_detectors import create_face_detector
+
+
+def _build_deepface_model(name):
+	"""
+	Build (or fetch from DeepFace's own cache) a facial attribute model.
+	Newer DeepFace releases require the task argument, older ones reject it.
+	"""
+	try:
+		return DeepFace.build_model(model_name=name, task="facial_attribute")
+	except TypeError:
+		return DeepFace.build_model(name)
+
+
+class ModelRegistry:
+	"""
+	Process-wide holder for the face detector and the DeepFace age/gender
+	models, so they are loaded once instead of on every prediction.
+	`timings` records load and warmup durations in seconds.
+	detector_backend/detector_options are passed to create_face_detector().
+	"""
+
+	def __init__(self, detector_backend="haar", detector_options=None):
+		self._lock = threading.Lock()
+		self.detector_backend = detector_backend
+		self.detector_options = detector_options or {}
+		self.face_detector = None
+		self.age_model = None
+		self.gender_model = None
+		self.timings = {}
+		self.is_warm = False
+
+	@property
+	def is_loaded(self):
+		return self.face_detector is not None and self.age_model is not None
+
+	def _load_detector_locked(self):
+		if self.face_detector is None:
+			t0 = time.perf_counter()
+			self.face_detector = create_face_detector(self.detector_backend, **self.detector_options)
+			self.timings["load_detector_s"] = time.perf_counter() - t0
+		return self.face_detector
+
+	def load_detector(self):
+		"""
+		Load only the face detector (detection-only callers do not pay
+		for the age/gender networks).
+		"""
+		with self._lock:
+			return self._load_detector_locked()
+
+	def load(self):
+		"""
+		Load the face detector and the age/gender models if not loaded yet.
+		"""
+		with self._lock:
+			if self.is_loaded:
+				return self
+			t0 = time.perf_counter()
+			self._load_detector_locked()
+			t1 = time.perf_counter()
+			age_model = _build_deepface_model("Age")
+			t2 = time.perf_counter()
+			gender_model = _build_deepface_model("Gender")
+			t3 = time.perf_counter()
+
+			self.age_model = age_model
+			self.gender_model = gender_model
+			self.timings["load_age_s"] = t2 - t1
+			self.timings["load_gender_s"] = t3 - t2
+			self.timings["load_total_s"] = t3 - t0
+		return self
+
+	def warmup(self, analyze_fn):
+		"""
+		Load everything and run one inference on a dummy face so the first
+		real request does not pay graph construction / kernel selection cost.
+		`analyze_fn(face_bgr)` is the function used for real requests.
+		"""
+		self.load()
+		dummy = np.full((224, 224, 3), 128, dtype=np.uint8)
+		t0 = time.perf_counter()
+		analyze_fn(dummy)
+		self.timings["warmup_s"] = time.perf_counter() - t0
+		self.is_warm = True
+		return dict(self.timings)
+
+	def get_face_detector(self):
+		if self.face_detector is None:
+			self.load_detector()
+		return self.face_detector
+
+	def set_face_detector(self, detector):
+		"""
+		Swap the detector backend at runtime (e.g. haar -> yunet).
+		"""
+		with self._lock:
+			self.face_detector = detector
+			self.detector_backend = detector.name
+
+
+_registry = ModelRegistry(os.getenv("FACE_DETECTOR_BACKEND", "haar"))
+
+
+def get_registry():
+	"""
+	Return the process-wide model registry.
+	"""
+	return _registry
+
+
+def format_timings(timings):
+	"""
+	Render registry timings as a single human readable line.
+	"""
+	return ", ".join(f"{k}={v * 1000:.0f}ms" for k, v in timings.items())
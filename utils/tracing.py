@@ -0,0 +1,302 @@
+import itertools
+import json
+import os
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Histogram bucket upper bounds in seconds (covers 1ms frame work up to multi-second turns)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+_LEVELS = {"debug": 10, "info": 20, "warning": 30, "error": 40}
+
+_ids = itertools.count(1)
+
+
+class Span:
+	"""
+	One timed operation, created by Tracer.span(). Used as a context
+	manager it nests on the current thread; otherwise call end() (for work
+	that spans generator yields or threads). Attributes set with set() are
+	exported with the span.
+	"""
+
+	__slots__ = ("tracer", "name", "span_id", "trace_id", "parent_id", "attrs", "start", "wall", "duration")
+
+	def __init__(self, tracer, name, parent, attrs):
+		self.tracer = tracer
+		self.name = name
+		self.span_id = next(_ids)
+		self.trace_id = parent.trace_id if parent is not None else self.span_id
+		self.parent_id = parent.span_id if parent is not None else None
+		self.attrs = attrs
+		self.wall = time.time()
+		self.start = time.perf_counter()
+		self.duration = None
+
+	def set(self, **attrs):
+		self.attrs.update(attrs)
+		return self
+
+	def elapsed(self):
+		return time.perf_counter() - self.start
+
+	def end(self, **attrs):
+		"""Finish the span (idempotent) and hand it to the tracer."""
+		if self.duration is not None:
+			return
+		self.duration = time.perf_counter() - self.start
+		self.attrs.update(attrs)
+		self.tracer._finish(self)
+
+	def __enter__(self):
+		self.tracer._stack().append(self)
+		return self
+
+	def __exit__(self, exc_type, exc, tb):
+		if exc_type is not None:
+			self.attrs["error"] = exc_type.__name__
+		self.tracer._pop(self)
+		self.end()
+		return False
+
+
+class _Histogram:
+	__slots__ = ("buckets", "counts", "count", "sum")
+
+	def __init__(self, buckets):
+		self.buckets = buckets
+		self.counts = [0] * len(buckets)
+		self.count = 0
+		self.sum = 0.0
+
+	def observe(self, value):
+		self.count += 1
+		self.sum += value
+		for i, bound in enumerate(self.buckets):
+			if value <= bound:
+				self.counts[i] += 1
+				break
+
+
+class Tracer:
+	"""
+	Span tracer and metrics registry for the kiosk pipeline.
+	- Spans nest per thread; spans opened on worker threads without a
+	  parent attach to the active turn (begin_turn()) so one trace_id
+	  covers recording, STT, LLM, TTS and playback of a turn.
+	- Finished spans and events are appended to a JSONL file (if
+	  jsonl_path is set) and kept in a small in-memory ring.
+	- Span durations feed per-name histograms; observe() records other
+	  values (tokens/s, time-to-first-audio). prometheus_text() renders
+	  both in the Prometheus text exposition format.
+	- event() replaces ad-hoc prints: the record is structured, and the
+	  human readable message is still echoed to stdout at or above
+	  echo_level.
+	Recording a span costs a lock, a few dict updates and one buffered
+	line write, so it is safe on per-sentence / per-request paths (not
+	per audio frame).
+	"""
+
+	def __init__(self, jsonl_path=None, echo_level="info", namespace="kiosk", keep=512, buckets=DEFAULT_BUCKETS):
+		self.namespace = namespace
+		self.echo_level = _LEVELS.get(echo_level, 20)
+		self.buckets = tuple(buckets)
+		self.recent = deque(maxlen=keep)
+		self._local = threading.local()
+		self._lock = threading.Lock()
+		self._histograms = {}  # (metric, label) -> _Histogram
+		self._events = {}  # (event name, level) -> count
+		self._turn = None
+		self._file = open(jsonl_path, "a", encoding="utf-8", buffering=1) if jsonl_path else None
+
+	# ---- spans ----
+	def _stack(self):
+		stack = getattr(self._local, "stack", None)
+		if stack is None:
+			stack = self._local.stack = []
+		return stack
+
+	def current(self):
+		"""Innermost open span on this thread, else the active turn."""
+		stack = self._stack()
+		return stack[-1] if stack else self._turn
+
+	def span(self, name, parent=None, **attrs):
+		"""Start a span under parent (default: the current span of this thread)."""
+		return Span(self, name, parent or self.current(), attrs)
+
+	def span_since(self, name, started_at, parent=None, **attrs):
+		"""
+		Span that began at perf_counter() time started_at, for work noticed
+		after the fact (e.g. speech captured on the VAD listener thread).
+		"""
+		span = self.span(name, parent, **attrs)
+		span.wall -= span.start - started_at
+		span.start = started_at
+		return span
+
+	def _pop(self, span):
+		stack = self._stack()
+		if span in stack:
+			stack.remove(span)
+
+	def begin_turn(self, **attrs):
+		"""Open the root span of one conversation turn (ended with end_turn())."""
+		self.end_turn()
+		self._turn = Span(self, "turn", None, attrs)
+		return self._turn
+
+	def end_turn(self, **attrs):
+		turn, self._turn = self._turn, None
+		if turn is not None:
+			turn.end(**attrs)
+
+	def _finish(self, span):
+		record = {
+			"type": "span",
+			"name": span.name,
+			"trace": span.trace_id,
+			"span": span.span_id,
+			"parent": span.parent_id,
+			"ts": round(span.wall, 6),
+			"duration_ms": round(span.duration * 1000, 3),
+		}
+		if span.attrs:
+			record["attrs"] = span.attrs
+		with self._lock:
+			self._histogram("span_duration_seconds", span.name).observe(span.duration)
+			self._write(record)
+
+	# ---- metrics and events ----
+	def _histogram(self, metric, label):
+		hist = self._histograms.get((metric, label))
+		if hist is None:
+			hist = self._histograms[(metric, label)] = _Histogram(self.buckets)
+		return hist
+
+	def observe(self, metric, value, label="", buckets=None):
+		"""Record one sample of a non-span metric (e.g. llm_tokens_per_second)."""
+		with self._lock:
+			hist = self._histograms.get((metric, label))
+			if hist is None:
+				hist = self._histograms[(metric, label)] = _Histogram(tuple(buckets or self.buckets))
+			hist.observe(value)
+
+	def event(self, name, message=None, level="info", **attrs):
+		"""Structured log event; message is echoed to stdout at or above echo_level."""
+		parent = self.current()
+		record = {"type": "event", "name": name, "level": level, "ts": round(time.time(), 6)}
+		if parent is not None:
+			record["trace"] = parent.trace_id
+			record["span"] = parent.span_id
+		if message is not None:
+			record["message"] = message
+		if attrs:
+			record["attrs"] = attrs
+		with self._lock:
+			key = (name, level)
+			self._events[key] = self._events.get(key, 0) + 1
+			self._write(record)
+		if message is not None and _LEVELS.get(level, 20) >= self.echo_level:
+			print(message)
+
+	def _write(self, record):
+		self.recent.append(record)
+		if self._file is not None:
+			self._file.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+
+	def summary(self):
+		"""{metric/label: {count, avg}} for a quick human readable report (seconds for spans)."""
+		with self._lock:
+			return {
+				f"{metric}/{label}" if label else metric: {
+					"count": hist.count,
+					"avg": hist.sum / hist.count if hist.count else 0.0,
+				}
+				for (metric, label), hist in sorted(self._histograms.items())
+			}
+
+	def prometheus_text(self):
+		"""All histograms and event counters in the Prometheus text format."""
+		ns = self.namespace
+		lines = []
+		with self._lock:
+			by_metric = {}
+			for (metric, label), hist in sorted(self._histograms.items()):
+				by_metric.setdefault(metric, []).append((label, hist))
+			for metric, series in by_metric.items():
+				name = f"{ns}_{metric}"
+				label_key = "span" if metric == "span_duration_seconds" else "label"
+				lines.append(f"# TYPE {name} histogram")
+				for label, hist in series:
+					labels = f'{label_key}="{_escape(label)}",' if label else ""
+					cumulative = 0
+					for bound, count in zip(hist.buckets, hist.counts):
+						cumulative += count
+						lines.append(f'{name}_bucket{{{labels}le="{bound}"}} {cumulative}')
+					lines.append(f'{name}_bucket{{{labels}le="+Inf"}} {hist.count}')
+					suffix = f"{{{labels.rstrip(',')}}}" if labels else ""
+					lines.append(f"{name}_sum{suffix} {hist.sum:.6f}")
+					lines.append(f"{name}_count{suffix} {hist.count}")
+			if self._events:
+				lines.append(f"# TYPE {ns}_events_total counter")
+				for (event, level), count in sorted(self._events.items()):
+					lines.append(f'{ns}_events_total{{event="{_escape(event)}",level="{level}"}} {count}')
+		return "\n".join(lines) + "\n"
+
+	def close(self):
+		if self._file is not None:
+			self._file.close()
+			self._file = None
+
+
+def _escape(value):
+	return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+_tracer = None
+_tracer_lock = threading.Lock()
+
+
+def get_tracer():
+	"""
+	Process-wide tracer shared by the voice loop, the age pipeline and the
+	server. TRACE_JSONL sets the export file, TRACE_ECHO_LEVEL the stdout
+	echo level (debug/info/warning/error).
+	"""
+	global _tracer
+	with _tracer_lock:
+		if _tracer is None:
+			_tracer = Tracer(os.getenv("TRACE_JSONL") or None, os.getenv("TRACE_ECHO_LEVEL", "info"))
+		return _tracer
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+	def do_GET(self):
+		if self.path.split("?", 1)[0] != "/metrics":
+			self.send_error(404)
+			return
+		body = self.server.tracer.prometheus_text().encode("utf-8")
+		self.send_response(200)
+		self.send_header("Content-Type", "text/plain; version=0.0.4")
+		self.send_header("Content-Length", str(len(body)))
+		self.end_headers()
+		self.wfile.write(body)
+
+	def log_message(self, format, *args):
+		pass  # scrapes every few seconds would flood the kiosk console
+
+
+def start_metrics_server(port, host="0.0.0.0", tracer=None):
+	"""
+	Serve GET /metrics (Prometheus text of the tracer) from a daemon thread,
+	for processes without the FastAPI server (VoiceChat starts it when
+	TRACE_METRICS_PORT is set). Returns the HTTPServer; call shutdown() to
+	stop it.
+	"""
+	server = ThreadingHTTPServer((host, port), _MetricsHandler)
+	server.daemon_threads = True
+	server.tracer = tracer or get_tracer()
+	threading.Thread(target=server.serve_forever, name="metrics", daemon=True).start()
+	return server
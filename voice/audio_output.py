@@ -0,0 +1,201 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from typing import Callable, Optional
+
+import numpy as np
+
+
+class StreamingLimiter:
+    """
+    청크 단위 리미터 (전체 버퍼 피크 정규화 대체)
+    - 청크 피크 * 게인이 ceiling을 넘으면 해당 청크부터 바로 게인을 낮춤 (attack)
+    - 이후 release_ms 동안 선형으로 makeup_gain까지 복귀 (청크 내부는 게인 램프로 부드럽게)
+    전체 오디오를 받기 전에도 클리핑 없이 바로 재생 가능
+    """
+
+    def __init__(self, ceiling: float = 0.8, makeup_gain: float = 1.0,
+                 release_ms: float = 200.0, sample_rate: int = 24000):
+        self.ceiling = ceiling * 32767
+        self.makeup_gain = makeup_gain
+        self.release_per_sample = makeup_gain / max(1.0, release_ms * sample_rate / 1000)
+        self.gain = makeup_gain
+
+    def reset(self) -> None:
+        self.gain = self.makeup_gain
+
+    def process(self, samples: np.ndarray) -> np.ndarray:
+        """int16 샘플 -> 게인 적용된 int16 샘플"""
+        if len(samples) == 0:
+            return samples
+        x = samples.astype(np.float32)
+        peak = float(np.abs(x).max())
+        target = self.makeup_gain
+        if peak * target > self.ceiling:
+            target = self.ceiling / peak
+
+        if target <= self.gain:
+            x *= target
+            self.gain = target
+        else:
+            new_gain = min(target, self.gain + self.release_per_sample * len(x))
+            x *= np.linspace(self.gain, new_gain, len(x), dtype=np.float32)
+            self.gain = new_gain
+        np.clip(x, -32768, 32767, out=x)
+        return x.astype(np.int16)
+
+
+class AudioOutput:
+    """
+    상시 열어 두는 sounddevice OutputStream + 지터 버퍼 (모노 int16 PCM)
+    - write(): TTS 청크를 받는 즉시 리미터를 거쳐 버퍼에 추가
+    - 재생 콜백은 prebuffer_ms만큼 쌓이면 재생을 시작하고, 버퍼가 비면(언더런) 다시 prebuffer를 채움
+    - begin() ~ end() 한 발화 단위로 첫 오디오 출력 시각(first_audio_at)과 재생 완료를 추적
+    - stop(): 끼어들기 시 남은 오디오를 버리고 즉시 무음 (다음 콜백 블록부터)
+    - reference_sink: 콜백마다 실제로 내보낸 샘플(무음 포함)을 전달 (에코 제거 참조 신호)
+    """
+
+    def __init__(self, sample_rate: int = 24000, blocksize: int = 480, prebuffer_ms: float = 60.0,
+                 limiter: Optional[StreamingLimiter] = None,
+                 reference_sink: Optional[Callable[[np.ndarray], None]] = None):
+        self.sample_rate = sample_rate
+        self.blocksize = blocksize
+        self.prebuffer = int(sample_rate * prebuffer_ms / 1000)
+        self.limiter = limiter or StreamingLimiter(sample_rate=sample_rate)
+        self.reference_sink = reference_sink
+        self._stream = None
+        self._lock = threading.Lock()
+        self._chunks: deque = deque()
+        self._offset = 0
+        self._buffered = 0
+        self._carry = b""
+        self._active = False
+        self._priming = True
+        self._ending = False
+        self._drained = threading.Event()
+        self._drained.set()
+        self.first_audio_at: Optional[float] = None
+        self.underruns = 0
+
+    # ---- 스트림 ----
+    def start(self) -> None:
+        """출력 스트림 열기 (이미 열려 있으면 그대로 사용)"""
+        if self._stream is not None:
+            return
+        import sounddevice as sd
+        self._stream = sd.OutputStream(samplerate=self.sample_rate, channels=1, dtype='int16',
+                                       blocksize=self.blocksize, callback=self._callback)
+        self._stream.start()
+
+    def close(self) -> None:
+        if self._stream is not None:
+            self._stream.stop()
+            self._stream.close()
+            self._stream = None
+
+    # ---- 발화 단위 ----
+    def begin(self) -> None:
+        """새 발화 시작 (첫 오디오 시각 초기화, 지터 버퍼 다시 채우기)"""
+        self.start()
+        with self._lock:
+            self._chunks.clear()  # stop() 이후 늦게 들어온 청크 버림
+            self._offset = 0
+            self._buffered = 0
+            self._active = True
+            self._priming = True
+            self._ending = False
+            self._carry = b""
+            self.first_audio_at = None
+            self._drained.clear()
+
+    def write(self, pcm) -> None:
+        """PCM 바이트(또는 memoryview) 추가"""
+        data = bytes(self._carry) + bytes(pcm) if self._carry else pcm
+        if len(data) % 2:
+            self._carry, data = data[-1:], data[:-1]
+        else:
+            self._carry = b""
+        samples = np.frombuffer(data, dtype=np.int16)
+        if len(samples) == 0:
+            return
+        samples = self.limiter.process(samples)
+        with self._lock:
+            self._chunks.append(samples)
+            self._buffered += len(samples)
+
+    def end(self) -> None:
+        """더 이상 쓸 데이터가 없음 (prebuffer 미만이어도 남은 오디오 재생)"""
+        with self._lock:
+            self._ending = True
+            self._priming = False
+            if self._buffered == 0:
+                self._finish()
+
+    def stop(self) -> None:
+        """재생 중단 (버퍼에 남은 오디오를 버리고 발화 종료 처리)"""
+        with self._lock:
+            self._chunks.clear()
+            self._offset = 0
+            self._buffered = 0
+            self._carry = b""
+            if self._active:
+                self._finish()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """end() 이후 버퍼가 모두 재생될 때까지 대기"""
+        return self._drained.wait(timeout)
+
+    def play(self, pcm) -> bool:
+        """한 번에 받은 PCM 재생 (완료까지, 최대 오디오 길이 + 2초 대기)"""
+        self.begin()
+        self.write(pcm)
+        self.end()
+        audio_s = len(pcm) / 2 / self.sample_rate
+        return self.wait(timeout=audio_s + 2.0)
+
+    @property
+    def is_active(self) -> bool:
+        return self._active
+
+    def _finish(self) -> None:
+        self._active = False
+        self._ending = False
+        self._drained.set()
+
+    def _callback(self, outdata, frames, time_info, status) -> None:
+        out = outdata[:, 0]
+        self._fill(out, frames)
+        if self.reference_sink is not None:
+            self.reference_sink(out)
+
+    def _fill(self, out, frames) -> None:
+        with self._lock:
+            if not self._active or (self._priming and self._buffered < self.prebuffer):
+                out.fill(0)
+                return
+            self._priming = False
+
+            filled = 0
+            while filled < frames and self._chunks:
+                chunk = self._chunks[0]
+                take = min(frames - filled, len(chunk) - self._offset)
+                out[filled:filled + take] = chunk[self._offset:self._offset + take]
+                filled += take
+                self._offset += take
+                if self._offset >= len(chunk):
+                    self._chunks.popleft()
+                    self._offset = 0
+            self._buffered -= filled
+
+            if filled and self.first_audio_at is None:
+                self.first_audio_at = time.perf_counter()
+            if filled < frames:
+                out[filled:] = 0
+                if self._ending:
+                    self._finish()
+                else:
+                    # 네트워크 지연으로 버퍼가 비면 다시 prebuffer만큼 모은 뒤 재생
+                    self.underruns += 1
+                    self._priming = True
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import Optional
+
+import numpy as np
+
+
+class AudioRingBuffer:
+    """
+    미리 할당한 int16 링 버퍼 (오디오 콜백 -> 소비 스레드, 단일 생산자/단일 소비자)
+    - write(): PortAudio 콜백에서 indata 뷰를 그대로 복사해 넣음 (bytes 변환/리스트 추가 없음)
+    - 소비자가 늦어 아직 읽지 않은 오디오를 덮어쓰면 overruns/dropped_samples 증가 (가장 오래된 오디오부터 버림)
+    - read(): 요청한 샘플 수가 쌓일 때까지 대기 후 반환
+    """
+
+    def __init__(self, capacity_s: float = 10.0, sample_rate: int = 16000):
+        self.sample_rate = sample_rate
+        self.capacity = int(capacity_s * sample_rate)
+        self._buffer = np.zeros(self.capacity, dtype=np.int16)
+        self._written = 0  # 누적 기록 샘플 수
+        self._read = 0  # 누적 읽은 샘플 수
+        self._lock = threading.Lock()
+        self._data_ready = threading.Event()
+        self.overruns = 0
+        self.dropped_samples = 0
+
+    def write(self, samples: np.ndarray) -> None:
+        n = len(samples)
+        if n > self.capacity:
+            samples = samples[-self.capacity:]
+            n = self.capacity
+        with self._lock:
+            pos = self._written % self.capacity
+            first = min(n, self.capacity - pos)
+            self._buffer[pos:pos + first] = samples[:first]
+            if first < n:
+                self._buffer[:n - first] = samples[first:]
+            self._written += n
+            unread = self._written - self._read
+            if unread > self.capacity:
+                self.overruns += 1
+                self.dropped_samples += unread - self.capacity
+                self._read = self._written - self.capacity
+        self._data_ready.set()
+
+    def available(self) -> int:
+        with self._lock:
+            return self._written - self._read
+
+    def clear(self) -> None:
+        """읽지 않은 오디오 버리기 (재생 중 들어온 소리 등)"""
+        with self._lock:
+            self._read = self._written
+            self._data_ready.clear()
+
+    def read(self, n: int, timeout: Optional[float] = None) -> Optional[np.ndarray]:
+        """n 샘플 읽기 (timeout 안에 모이지 않으면 None)"""
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        while True:
+            with self._lock:
+                if self._written - self._read >= n:
+                    pos = self._read % self.capacity
+                    first = min(n, self.capacity - pos)
+                    out = np.empty(n, dtype=np.int16)
+                    out[:first] = self._buffer[pos:pos + first]
+                    if first < n:
+                        out[first:] = self._buffer[:n - first]
+                    self._read += n
+                    return out
+                self._data_ready.clear()
+            remaining = deadline - time.monotonic() if deadline is not None else None
+            if remaining is not None and remaining <= 0:
+                return None
+            self._data_ready.wait(remaining)
@@ -0,0 +1,230 @@
+from __future__ import annotations
+
+import hashlib
+import re
+from collections import OrderedDict, deque
+from typing import Callable, Optional
+
+from .menu_index import MenuIndex, normalize
+from .menu_prompt import count_tokens
+
+# 수량 표현 (공백 제거 후): 숫자(+단위), 고유어 + 단위, 또는 고유어 단독 어절 ("하나", "둘이요")
+# 한/두/세/네는 단위가 있어야 수량으로 봄, 고유어도 단위가 없으면 어절 전체일 때만 ("열량", "세트"는 수량 아님)
+_COUNT_WORDS = {"하나": 1, "둘": 2, "셋": 3, "넷": 4, "다섯": 5, "여섯": 6, "일곱": 7, "여덟": 8, "아홉": 9, "열": 10}
+_COUNT_PREFIXES = {"한": 1, "두": 2, "세": 3, "네": 4}
+_COUNT_UNITS = r"(?:개|잔|세트|그릇|봉지)"
+_COUNT_RE = re.compile(
+    r"(\d+)" + _COUNT_UNITS + "?"
+    r"|(" + "|".join(sorted(_COUNT_WORDS, key=len, reverse=True)) + r")(" + _COUNT_UNITS + ")?"
+    r"|(" + "|".join(_COUNT_PREFIXES) + r")" + _COUNT_UNITS
+)
+# 단위 없는 고유어 뒤에 붙어도 되는 어절 끝
+_COUNT_ENDINGS = ("", "요", "이요", "만", "만요", "씩", "더", "랑", "이랑", "하고")
+# 손님이 말한 예산 ("예산 만원", "만원까지만") -> 이후 턴에도 유지, 그 외 가격 조건("만원 이하 디저트")은 그 질문에만 적용
+_BUDGET_WORDS = ("예산", "까지만", "넘지않게", "안넘게")
+_ADD_WORDS = ("주세요", "줘", "주문", "담아", "할게", "추가", "더요", "로요")
+_REMOVE_WORDS = ("빼", "취소", "삭제", "지워")
+_REFERENCE_WORDS = ("그거", "그걸", "그것", "이거", "이걸", "저거", "저걸", "같은거", "그메뉴", "방금", "아까")
+_NOT_ORDER_WORDS = ("추천", "얼마", "뭐", "있어요", "있나요", "어때")
+
+
+def _token_ends(text: str) -> dict:
+    """정규화된 문자열에서 어절 시작 위치 -> 어절 끝 위치"""
+    ends, pos = {}, 0
+    for token in text.split():
+        length = len(normalize(token))
+        if length:
+            ends[pos] = pos + length
+            pos += length
+    return ends
+
+
+def _count_in(normalized: str, start: int, end: int, token_ends: dict) -> Optional[int]:
+    """정규화된 문장의 [start, end) 구간에서 첫 수량 표현"""
+    for m in _COUNT_RE.finditer(normalized, start, end):
+        if m.group(1):
+            return int(m.group(1))
+        if m.group(4):
+            return _COUNT_PREFIXES[m.group(4)]
+        token_end = token_ends.get(m.start())
+        if m.group(3) or (token_end is not None and normalized[m.end():token_end] in _COUNT_ENDINGS):
+            return _COUNT_WORDS[m.group(2)]
+    return None
+
+
+class DialogueState:
+    """
+    세션 대화 상태 (한 손님의 주문 대화)
+    - 장바구니(메뉴 이름 -> 수량), 최근 언급된 메뉴, 손님 제약(알레르기/식단/예산)은 구조화해서 유지
+    - 최근 대화 턴은 history_budget 토큰 안에서만 그대로 보내고, 넘치면 오래된 턴부터
+      사용자 요청 한 줄 요지로 접어 요약에 남김 -> 턴이 늘어도 프롬프트 크기가 일정
+    - "그거 두 개 주세요"처럼 메뉴 이름이 없으면 직전에 언급된 메뉴를 가리키는 것으로 해석
+    add_turn()은 답변이 끝난 뒤 호출 (이번 발화의 LLM 요청은 직전 턴까지의 상태로 구성)
+    """
+
+    def __init__(self, menu_index: MenuIndex, history_budget: int = 300, max_mentions: int = 5,
+                 max_notes: int = 4, max_turn_chars: int = 300,
+                 token_counter: Callable[[str], int] = count_tokens):
+        self.menu_index = menu_index
+        self.history_budget = history_budget
+        self.max_turn_chars = max_turn_chars
+        self.token_counter = token_counter
+        self._max_mentions = max_mentions
+        self._max_notes = max_notes
+        self.reset()
+
+    def reset(self) -> None:
+        """새 손님 (대화/장바구니/제약 초기화)"""
+        self.cart: "OrderedDict[str, int]" = OrderedDict()
+        self.mentioned: deque = deque(maxlen=self._max_mentions)
+        self.allergies: set = set()
+        self.diet: set = set()
+        self.max_price: Optional[int] = None
+        self.notes: deque = deque(maxlen=self._max_notes)
+        self._turns: deque = deque()  # (사용자, 어시스턴트, 토큰 수)
+        self._history_tokens = 0
+        self.turn_count = 0
+        self.compacted_turns = 0
+
+    # ---- 상태 갱신 ----
+    def add_turn(self, user_text: str, assistant_text: str) -> None:
+        """한 턴이 끝남: 사용자 발화로 장바구니/제약 갱신, 언급 메뉴 기록, 대화 기록 추가 후 예산 초과분 요약"""
+        self._apply_user(user_text)
+        for _, i in self.menu_index.find_mentions(assistant_text):
+            self._mention(self.menu_index.items[i]['name'])
+
+        user_text = user_text.strip()[:self.max_turn_chars]
+        assistant_text = assistant_text.strip()[:self.max_turn_chars]
+        tokens = self.token_counter(user_text) + self.token_counter(assistant_text)
+        self._turns.append((user_text, assistant_text, tokens))
+        self._history_tokens += tokens
+        self.turn_count += 1
+        # 마지막 턴은 예산을 넘어도 유지 (직전 맥락이 가장 중요)
+        while self._history_tokens > self.history_budget and len(self._turns) > 1:
+            old_user, _, old_tokens = self._turns.popleft()
+            self._history_tokens -= old_tokens
+            self.notes.append(old_user[:40])
+            self.compacted_turns += 1
+
+    def _mention(self, name: str) -> None:
+        if name in self.mentioned:
+            self.mentioned.remove(name)
+        self.mentioned.append(name)
+
+    def _apply_user(self, text: str) -> None:
+        query = self.menu_index.parse_query(text)
+        normalized = normalize(text)
+        # 제약: "땅콩 알레르기 있어요"/"새우 못 먹어요"/"새우 빼고" -> 이후 턴에도 유지
+        self.allergies |= query.exclude_allergens
+        if any(w in normalized for w in ("알레르기", "알러지", "못먹")):
+            self.allergies |= query.require_allergens
+        self.diet |= query.diet
+        if query.max_price is not None and any(w in normalized for w in _BUDGET_WORDS):
+            self.max_price = query.max_price
+
+        mentions = self.menu_index.find_mentions(text)
+        removing = any(w in normalized for w in _REMOVE_WORDS)
+        ordering = any(w in normalized for w in _ADD_WORDS) and not any(w in normalized for w in _NOT_ORDER_WORDS)
+        if removing or ordering:
+            # (수량을 찾을 구간 시작, 메뉴 이름): 메뉴 이름 뒤부터 다음 메뉴 이름 전까지
+            targets = [(start + len(normalize(self.menu_index.items[i]['name'])), self.menu_index.items[i]['name'])
+                       for start, i in mentions]
+            if not targets and self.references_context(text) and self.mentioned:
+                targets = [(0, self.mentioned[-1])]  # "그거" -> 직전에 언급된 메뉴
+            bounds = [start for start, _ in mentions[1:]] + [len(normalized)]
+            token_ends = _token_ends(text)
+            for (start, name), end in zip(targets, bounds):
+                count = _count_in(normalized, start, end, token_ends)
+                if removing:
+                    remaining = self.cart.get(name, 0) - (count or self.cart.get(name, 0))
+                    if remaining > 0:
+                        self.cart[name] = remaining
+                    else:
+                        self.cart.pop(name, None)
+                else:
+                    self.cart[name] = self.cart.get(name, 0) + (count or 1)
+
+        for _, i in mentions:
+            self._mention(self.menu_index.items[i]['name'])
+
+    def references_context(self, text: str) -> bool:
+        """이전 대화를 가리키는 표현이 있는지 ("그거", "아까" 등 -> 답변 캐시를 쓰면 안 됨)"""
+        normalized = normalize(text)
+        return any(w in normalized for w in _REFERENCE_WORDS)
+
+    # ---- 프롬프트 ----
+    def _price_of(self, name: str) -> int:
+        for item in self.menu_index.items:
+            if item.get('name') == name:
+                return item.get('price', 0)
+        return 0
+
+    def _state_lines(self) -> list:
+        lines = []
+        if self.cart:
+            parts = [f"{name} x{count}" for name, count in self.cart.items()]
+            total = sum(self._price_of(name) * count for name, count in self.cart.items())
+            lines.append(f"장바구니: {', '.join(parts)} (합계 {total:,}원)")
+        if self.mentioned:
+            lines.append(f"최근 언급된 메뉴: {', '.join(self.mentioned)}")
+        constraints = []
+        if self.allergies:
+            constraints.append(f"알레르기 {', '.join(sorted(self.allergies))}")
+        if self.diet:
+            constraints.append(f"식단 {', '.join(sorted(self.diet))}")
+        if self.max_price is not None:
+            constraints.append(f"예산 {self.max_price:,}원 이하")
+        if constraints:
+            lines.append(f"손님 제약: {' / '.join(constraints)}")
+        return lines
+
+    def summary(self) -> Optional[str]:
+        """구조화된 대화 상태 요약 (시스템 메시지), 아직 아무 상태도 없으면 None"""
+        lines = self._state_lines()
+        if self.notes:
+            lines.append(f"이전 대화 요지: {'; '.join(self.notes)}")
+        if not lines:
+            return None
+        return "[대화 상태] 이전 대화에서 파악한 내용입니다. 손님 제약은 계속 지켜주세요.\n" + "\n".join(lines)
+
+    def history_messages(self) -> list:
+        """예산 안의 최근 대화 턴 (user/assistant 메시지)"""
+        messages = []
+        for user_text, assistant_text, _ in self._turns:
+            messages.append({"role": "user", "content": user_text})
+            if assistant_text:
+                messages.append({"role": "assistant", "content": assistant_text})
+        return messages
+
+    def context_messages(self) -> list:
+        """LLM 요청에 넣을 대화 맥락 (상태 요약 + 최근 턴)"""
+        summary = self.summary()
+        messages = [{"role": "system", "content": summary}] if summary else []
+        return messages + self.history_messages()
+
+    def focus_items(self, limit: int = 2) -> list:
+        """지칭 대상 후보 메뉴 (최근 언급 순 limit개) -> "그거 칼로리는요?"처럼 이름이 없을 때 메뉴 목록에 추가"""
+        by_name = {item.get('name'): item for item in self.menu_index.items}
+        return [by_name[name] for name in reversed(self.mentioned) if name in by_name][:limit]
+
+    def context_key(self, user_text: Optional[str] = None) -> str:
+        """
+        답변 캐시 키에 붙일 상태 지문 (장바구니/언급 메뉴/제약, 상태가 없으면 빈 문자열)
+        user_text에 메뉴 이름이 없으면("네", "두 개요", "좋아요") 직전 답변에 대한 대꾸이므로
+        직전 어시스턴트 답변도 지문에 포함 -> 다른 질문에 한 "네"가 저장된 답변을 재생하지 않음
+        """
+        lines = self._state_lines()
+        if user_text is not None and self._turns and not self.menu_index.find_mentions(user_text):
+            lines.append(f"직전 답변: {self._turns[-1][1]}")
+        if not lines:
+            return ""
+        return hashlib.sha1("\n".join(lines).encode("utf-8")).hexdigest()[:12]
+
+    def stats(self) -> dict:
+        return {
+            "turns": self.turn_count,
+            "compacted_turns": self.compacted_turns,
+            "history_turns": len(self._turns),
+            "history_tokens": self._history_tokens,
+            "cart": dict(self.cart),
+        }
@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import time
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from .audio_ring import AudioRingBuffer
+
+
+class EchoCanceller:
+    """
+    재생 참조 신호 기반 에코 제거 (키오스크 스피커 소리가 마이크로 다시 들어오는 것 제거)
+    - push_reference(): AudioOutput 재생 콜백이 실제로 내보낸 샘플(무음 포함)을 기록
+    - process(): 마이크 프레임과 같은 길이의 참조 신호를 꺼내 NLMS 적응 필터로 추정한 에코를 뺌
+    - 더블토크(사용자가 재생 중에 말함): 잔차가 평소 잔여 에코보다 dtd_ratio배 이상 커지면 적응을 멈추고 그대로 통과
+    - 재생 중 더블토크가 아닌 구간은 잔여 에코를 suppress_db만큼 감쇠 (VAD가 에코로 발화를 시작하지 않도록)
+      필터가 수렴하기 전에는 suppress_db의 두 배로 감쇠 (그동안은 끼어들기가 어려움)
+    마이크와 참조 신호는 둘 다 실시간으로 쌓이므로 같은 길이씩 꺼내면 시간이 맞고, 장치 지연은 필터 길이(filter_ms)로 흡수
+    """
+
+    def __init__(self, sample_rate: int = 16000, reference_rate: int = 24000, filter_ms: float = 128.0,
+                 block_ms: float = 10.0, step: float = 0.5, suppress_db: float = -20.0,
+                 dtd_ratio: float = 4.0, buffer_s: float = 2.0):
+        self.sample_rate = sample_rate
+        self.reference_rate = reference_rate
+        self.taps = int(sample_rate * filter_ms / 1000)
+        self.block = max(1, int(sample_rate * block_ms / 1000))
+        self.step = step
+        self.suppress_gain = 10 ** (suppress_db / 20)
+        self.dtd_ratio = dtd_ratio
+        self.reference = AudioRingBuffer(buffer_s, reference_rate)
+        self._reference_at = 0.0
+        self.reset()
+        # 통계
+        self.frames = 0
+        self.echo_frames = 0
+        self.doubletalk_blocks = 0
+        self.reference_misses = 0
+
+    def reset(self) -> None:
+        """필터/참조 신호 초기화 (출력 장치가 바뀌었을 때 등)"""
+        self.weights = np.zeros(self.taps, dtype=np.float32)
+        self._history = np.zeros(self.taps - 1, dtype=np.float32)
+        self._mic_energy = 0.0
+        self._error_energy = 0.0
+        self._residual = 0.0
+        self._doubletalk_run = 0
+        self.reference.clear()
+
+    # ---- 참조 신호 (재생 콜백 스레드) ----
+    def push_reference(self, samples: np.ndarray) -> None:
+        self.reference.write(samples)
+        self._reference_at = time.monotonic()
+
+    def clear(self) -> None:
+        """읽지 않은 참조 신호 버리기 (마이크 링 버퍼를 비울 때 함께 호출해 시간을 맞춤)"""
+        self.reference.clear()
+
+    @property
+    def erle_db(self) -> float:
+        """에코 감소량 (재생 중 마이크 에너지 / 에코 제거 후 에너지)"""
+        if self._error_energy <= 0 or self._mic_energy <= 0:
+            return 0.0
+        return float(10 * np.log10(self._mic_energy / self._error_energy))
+
+    def _next_reference(self, n: int) -> np.ndarray:
+        """마이크 n 샘플과 같은 구간의 참조 신호 (마이크 샘플레이트로 변환)"""
+        needed = n * self.reference_rate // self.sample_rate
+        # 출력 스트림이 돌고 있으면 콜백 한 번(수십 ms) 정도는 기다림
+        live = time.monotonic() - self._reference_at < 0.2
+        raw = self.reference.read(needed, timeout=0.05 if live else 0)
+        if raw is None:
+            if live:
+                self.reference_misses += 1
+            return np.zeros(n, dtype=np.float32)
+        ref = raw.astype(np.float32)
+        if needed == n:
+            return ref
+        # 간단한 저역 통과 후 선형 보간 (24kHz -> 16kHz)
+        ref[1:-1] = 0.25 * ref[:-2] + 0.5 * ref[1:-1] + 0.25 * ref[2:]
+        positions = np.arange(n, dtype=np.float32) * (needed / n)
+        return np.interp(positions, np.arange(needed, dtype=np.float32), ref).astype(np.float32)
+
+    def process(self, frame: bytes) -> bytes:
+        """마이크 PCM 프레임 -> 에코를 제거한 PCM 프레임"""
+        mic = np.frombuffer(frame, dtype=np.int16)
+        n = len(mic)
+        ref = self._next_reference(n)
+        history = np.concatenate((self._history, ref))
+        self._history = history[n:]
+        self.frames += 1
+        if not history.any():
+            return frame  # 재생 중이 아니면 그대로 통과
+
+        self.echo_frames += 1
+        mic = mic.astype(np.float32)
+        out = np.empty(n, dtype=np.float32)
+        windows = sliding_window_view(history, self.taps)  # windows[i] = 샘플 i까지의 참조 신호 (마지막이 현재)
+        for start in range(0, n, self.block):
+            stop = min(n, start + self.block)
+            x = windows[start:stop]
+            echo = x @ self.weights
+            error = mic[start:stop] - echo
+            mic_energy = float(np.dot(mic[start:stop], mic[start:stop]))
+            error_energy = float(np.dot(error, error))
+            ref_energy = float(np.dot(x[-1], x[-1]))
+
+            converged = self.erle_db > 6.0
+            doubletalk = converged and error_energy > self.dtd_ratio * self._residual + 1.0
+            if doubletalk:
+                self.doubletalk_blocks += 1
+                self._doubletalk_run += 1
+                if self._doubletalk_run * self.block > 2 * self.sample_rate:
+                    # 2초 넘게 더블토크면 에코 경로가 바뀐 것으로 보고 다시 적응
+                    self._mic_energy = self._error_energy = 0.0
+                    self._doubletalk_run = 0
+                out[start:stop] = error
+                continue
+            self._doubletalk_run = 0
+            if ref_energy > self.taps:  # 참조 신호가 거의 무음이면 적응하지 않음
+                self.weights += (self.step / (stop - start)) * (x.T @ error) / (ref_energy + 1.0)
+                self._mic_energy = 0.95 * self._mic_energy + 0.05 * mic_energy
+                self._error_energy = 0.95 * self._error_energy + 0.05 * error_energy
+                self._residual = 0.9 * self._residual + 0.1 * error_energy
+                # 필터가 수렴하기 전(첫 재생 초반)에는 더 강하게 감쇠 -> 그동안은 반이중처럼 동작
+                error *= self.suppress_gain if converged else self.suppress_gain ** 2
+            out[start:stop] = error
+
+        np.clip(out, -32768, 32767, out=out)
+        return out.astype(np.int16).tobytes()
+
+    def stats(self) -> dict:
+        return {
+            "erle_db": round(self.erle_db, 1),
+            "echo_frames": self.echo_frames,
+            "doubletalk_blocks": self.doubletalk_blocks,
+            "reference_misses": self.reference_misses,
+        }
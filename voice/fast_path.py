@@ -0,0 +1,238 @@
+from __future__ import annotations
+
+import time
+from typing import Optional
+
+from utils.tracing import get_tracer
+
+from .menu_index import MenuIndex, MenuQuery, normalize
+
+# 영양 정보 질문 표현 -> (nutrition 키, 단위, 읽는 이름)
+NUTRITION_FIELDS = {
+    "칼로리": ("calorie_kcal", "kcal", "칼로리"),
+    "열량": ("calorie_kcal", "kcal", "칼로리"),
+    "단백질": ("protein_g", "g", "단백질"),
+    "나트륨": ("sodium_mg", "mg", "나트륨"),
+    "염분": ("sodium_mg", "mg", "나트륨"),
+    "당류": ("sugar_g", "g", "당류"),
+    "포화지방": ("saturated_fat_g", "g", "포화지방"),
+    "탄수화물": ("carb_g", "g", "탄수화물"),
+}
+_PRICE_WORDS = ("얼마", "가격")
+_SUPERLATIVE_WORDS = ("제일", "가장")
+_LOW_WORDS = ("낮은", "적은", "적게", "가벼운", "싼", "저렴")
+_HIGH_WORDS = ("높은", "많은", "많이", "비싼", "든든")
+# 주문/추천/대화형 요청은 LLM이 처리
+_ALLERGY_WORDS = ("알레르기", "알러지", "못먹")
+_LLM_ONLY_WORDS = ("추천", "주문", "주세요", "담아", "할게", "할께", "취소", "바꿔", "빼줘", "어울", "맛있")
+
+# 의도 판단에 쓰이고 메뉴 이름이 아닌 표현
+_INTENT_WORDS = {
+    "얼마", "얼마예요", "얼마에요", "얼마야", "얼마인가요", "가격", "가격은", "제일", "가장", "메뉴", "있어요", "있나요",
+    "있어", "있을까요", "뭐예요", "뭐에요", "뭐야", "뭔가요", "뭐", "어떤", "거", "건", "게", "어느", "알려줘", "알려주세요",
+    "들어가요", "들어가나요", "들어있어요", "들어있나요", "들어간", "들어가", "들었어요", "포함", "포함돼", "되어", "돼요",
+    "어떻게", "몇", "kcal", "칼로리", "열량", "정도", "인가요", "예요", "에요", "요", "있는데", "있고", "그럼",
+} | set(NUTRITION_FIELDS) | set(_LOW_WORDS) | set(_HIGH_WORDS)
+
+
+def _has_batchim(word: str) -> bool:
+    """마지막 글자에 받침이 있는지 (조사 선택용)"""
+    if not word:
+        return False
+    code = ord(word[-1]) - 0xAC00
+    return 0 <= code < 11172 and code % 28 != 0
+
+
+def josa(word: str, with_batchim: str, without_batchim: str) -> str:
+    """받침 유무에 맞는 조사 붙이기 (josa('치킨버거', '은', '는') -> '치킨버거는')"""
+    return word + (with_batchim if _has_batchim(word) else without_batchim)
+
+
+def _format_amount(value: float) -> str:
+    return f"{value:g}"
+
+
+def _is_intent_word(keyword: str) -> bool:
+    return keyword in _INTENT_WORDS or any(keyword.startswith(w) for w in _PRICE_WORDS + _SUPERLATIVE_WORDS)
+
+
+class FastPathResponder:
+    """
+    자주 나오는 단순 질문을 LLM 없이 menu.json 필드로 즉시 답변
+    - 가격: "치킨버거 얼마예요?"
+    - 영양: "치킨버거 칼로리", "칼로리 제일 낮은 음료"
+    - 알레르기: "땅콩 들어간 메뉴 있어요?", "치킨버거에 땅콩 들어가요?", "새우 없는 메뉴"
+    확신할 수 없는 질문(메뉴 이름이 애매하거나 해석되지 않는 단어가 남는 경우)은 None을 반환해 LLM으로 넘김
+    적중률과 턴당 절약 시간(LLM 첫 토큰 시간 - 즉시 응답 시간)을 기록
+    """
+
+    def __init__(self, menu_index: MenuIndex, max_list: int = 5, min_item_score: float = 0.85):
+        self.menu_index = menu_index
+        self.max_list = max_list
+        self.min_item_score = min_item_score
+        self.hits = 0
+        self.misses = 0
+        self.fast_time_s = 0.0
+        self.llm_turns = 0
+        self.llm_ttft_s = 0.0
+
+    # ---- 통계 ----
+    def record_llm_turn(self, ttft_s: float) -> None:
+        """LLM으로 처리한 턴의 첫 토큰까지 걸린 시간 기록 (절약 시간 추정용)"""
+        self.llm_turns += 1
+        self.llm_ttft_s += ttft_s
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        avg_fast = self.fast_time_s / self.hits if self.hits else 0.0
+        avg_llm = self.llm_ttft_s / self.llm_turns if self.llm_turns else 0.0
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "avg_fast_ms": avg_fast * 1000,
+            "avg_llm_ttft_ms": avg_llm * 1000,
+            "saved_ms_per_hit": max(0.0, avg_llm - avg_fast) * 1000 if self.llm_turns else None,
+        }
+
+    # ---- 응답 ----
+    def answer(self, user_text: str, exclude_allergens=(), diet=()) -> Optional[str]:
+        """
+        템플릿으로 답할 수 있으면 답변 문자열, 아니면 None
+        exclude_allergens/diet: 이전 턴에 손님이 말한 제약 (DialogueState) -> 후보 메뉴에서 항상 제외
+        """
+        t0 = time.perf_counter()
+        try:
+            response = self._answer(user_text, exclude_allergens, diet)
+        except Exception as e:
+            get_tracer().event("fast_path.failed", f"[빠른 응답 실패] {e}", level="error", error=str(e))
+            response = None
+        if response is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self.fast_time_s += time.perf_counter() - t0
+        return response
+
+    def can_answer(self, user_text: str, exclude_allergens=(), diet=()) -> bool:
+        """통계에 기록하지 않고 빠른 응답 가능 여부만 확인 (추측 LLM 요청을 건너뛸지 판단용)"""
+        try:
+            return self._answer(user_text, exclude_allergens, diet) is not None
+        except Exception:
+            return False
+
+    def _answer(self, user_text: str, exclude_allergens=(), diet=()) -> Optional[str]:
+        if not len(self.menu_index):
+            return None
+        text = normalize(user_text)
+        if any(w in text.replace("알려주세요", "") for w in _LLM_ONLY_WORDS):
+            return None
+
+        query = self.menu_index.parse_query(user_text)
+        if any(w in text for w in _ALLERGY_WORDS):
+            # "밀 알레르기 있는데 ..."는 밀이 든 메뉴를 찾는 것이 아니라 빼는 것
+            query.exclude_allergens |= query.require_allergens
+            query.require_allergens = set()
+        # 세션 제약: 성분이 든 메뉴를 묻는 질문("땅콩 들어간 메뉴")의 그 성분은 빼지 않음
+        session_excluded = set(exclude_allergens) - query.require_allergens - query.exclude_allergens
+        query.exclude_allergens |= session_excluded
+        query.diet |= set(diet)
+        keywords = [k for k in query.keywords if not _is_intent_word(k)]
+        # 메뉴와 전혀 맞지 않는 단어가 남으면 해석이 불확실하므로 LLM으로
+        for keyword in keywords:
+            if not self.menu_index.match_keyword(keyword).any():
+                return None
+
+        nutrient = next((NUTRITION_FIELDS[w] for w in NUTRITION_FIELDS if w in text), None)
+        superlative = any(w in text for w in _SUPERLATIVE_WORDS)
+        asks_price = any(w in text for w in _PRICE_WORDS)
+
+        if superlative:
+            answer = self._answer_superlative(text, query, keywords, nutrient)
+            if answer and session_excluded:
+                answer = f"{', '.join(sorted(session_excluded))} 없는 메뉴 중 {answer}"
+            return answer
+        if query.require_allergens or query.exclude_allergens:
+            return self._answer_allergen(query, keywords)
+        if nutrient or asks_price:
+            item = self._single_item(keywords)
+            if item is None:
+                return None
+            if nutrient:
+                return self._answer_nutrient(item, nutrient)
+            return f"{josa(item['name'], '은', '는')} {item.get('price', 0):,}원입니다."
+        return None
+
+    def _single_item(self, keywords: list) -> Optional[dict]:
+        """검색어가 가리키는 메뉴가 하나로 분명할 때만 반환"""
+        if not keywords:
+            return None
+        query = MenuQuery()
+        query.keywords = keywords
+        ranked = self.menu_index.rank(query, self.menu_index.all_mask)
+        if not ranked or ranked[0][1] < self.min_item_score * len(keywords):
+            return None
+        if len(ranked) > 1 and ranked[1][1] >= ranked[0][1]:
+            return None
+        return self.menu_index.items[ranked[0][0]]
+
+    def _candidates(self, query: MenuQuery, keywords: list) -> list:
+        """조건과 검색어(카테고리/메뉴명)를 만족하는 항목"""
+        scoped = MenuQuery()
+        scoped.keywords = keywords
+        mask = self.menu_index.filter_mask(query)
+        return [self.menu_index.items[i] for i, _ in self.menu_index.rank(scoped, mask)]
+
+    def _answer_nutrient(self, item: dict, nutrient: tuple) -> Optional[str]:
+        key, unit, label = nutrient
+        value = (item.get('nutrition') or {}).get(key)
+        if value is None:
+            return f"{item['name']}의 {label} 정보는 준비되어 있지 않아요."
+        return f"{item['name']}의 {josa(label, '은', '는')} {_format_amount(value)}{unit}입니다."
+
+    def _answer_superlative(self, text: str, query: MenuQuery, keywords: list, nutrient) -> Optional[str]:
+        high = any(w in text for w in _HIGH_WORDS)
+        # "비싼" 안의 "싼"은 낮은 쪽으로 세지 않음
+        low = any(w in text.replace("비싼", "") for w in _LOW_WORDS)
+        if low == high:
+            return None
+        candidates = self._candidates(query, keywords)
+        if nutrient:
+            key, unit, label = nutrient
+            values = [(item['nutrition'][key], item) for item in candidates
+                      if (item.get('nutrition') or {}).get(key) is not None]
+        elif "싼" in text or "저렴" in text or "비싼" in text:
+            key, unit, label = "price", "원", "가격"
+            values = [(item.get('price', 0), item) for item in candidates]
+        else:
+            return None
+        if not values:
+            return None
+        value, item = (min if low else max)(values, key=lambda v: v[0])
+        amount = f"{value:,}" if key == "price" else _format_amount(value)
+        direction = "낮은" if low else "높은"
+        return f"{josa(label, '이', '가')} 가장 {direction} 메뉴는 {item['name']}({amount}{unit})입니다."
+
+    def _answer_allergen(self, query: MenuQuery, keywords: list) -> Optional[str]:
+        allergens = sorted(query.require_allergens or query.exclude_allergens)
+        allergen_text = ", ".join(allergens)
+        contains = bool(query.require_allergens)
+
+        # 특정 메뉴에 성분이 들어가는지 묻는 경우
+        item = self._single_item(keywords) if keywords else None
+        if item is not None and contains:
+            present = [a for a in allergens if a in item.get('allergens', [])]
+            if present:
+                return f"네, {item['name']}에는 {josa(', '.join(present), '이', '가')} 들어 있어요."
+            return f"아니요, {item['name']}에는 {josa(allergen_text, '이', '가')} 들어 있지 않아요."
+
+        candidates = self._candidates(query, keywords)
+        condition = f"{josa(allergen_text, '이', '가')} {'들어간' if contains else '없는'}"
+        if keywords:
+            condition += " " + " ".join(keywords)
+        if not candidates:
+            return f"{condition} 메뉴는 없어요."
+        names = [item['name'] for item in candidates[: self.max_list]]
+        if len(candidates) > self.max_list:
+            return f"{condition} 메뉴는 {', '.join(names)} 등 {len(candidates)}가지가 있어요."
+        return f"{condition} 메뉴는 {', '.join(names)}입니다."
@@ -0,0 +1,418 @@
+from __future__ import annotations
+
+import re
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from typing import Iterable, Optional
+
+import numpy as np
+
+# 한글 자모 분해용 테이블 (호환 자모)
+_CHOSEONG = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+_JUNGSEONG = "ㅏㅐㅑㅒㅓㅔㅕㅖㅗㅘㅙㅚㅛㅜㅝㅞㅟㅠㅡㅢㅣ"
+_JONGSEONG = ["", "ㄱ", "ㄲ", "ㄳ", "ㄴ", "ㄵ", "ㄶ", "ㄷ", "ㄹ", "ㄺ", "ㄻ", "ㄼ", "ㄽ", "ㄾ",
+              "ㄿ", "ㅀ", "ㅁ", "ㅂ", "ㅄ", "ㅅ", "ㅆ", "ㅇ", "ㅈ", "ㅊ", "ㅋ", "ㅌ", "ㅍ", "ㅎ"]
+
+# 사용자 표현 -> allergen_vocab 표기
+ALLERGEN_ALIASES = {
+    "계란": "달걀",
+    "소고기": "쇠고기",
+    "돼지": "돼지고기",
+    "닭": "닭고기",
+    "밀가루": "밀",
+    "글루텐": "밀",
+    "콩": "대두",
+    "굴": "조개류(굴)",
+    "가리비": "조개류(가리비)",
+    "우유": "우유",
+}
+
+# 사용자 표현 -> diet_tags 키
+DIET_KEYWORDS = {
+    "비건": ["vegan"],
+    "채식": ["vegetarian"],
+    "베지테리언": ["vegetarian"],
+    "할랄": ["no_pork", "no_alcohol"],
+    "무알콜": ["no_alcohol"],
+    "논알콜": ["no_alcohol"],
+}
+
+# 알레르기 성분 뒤에 오면 '제외' 조건이 되는 표현
+_NEGATIONS = ("없는", "없이", "빼고", "빼서", "제외", "안들어간", "안 들어간", "알레르기", "알러지", "못먹", "못 먹")
+
+_PRICE_MAX_WORDS = ("이하", "미만", "까지", "아래", "안쪽", "내로", "밑")
+_PRICE_MIN_WORDS = ("이상", "초과", "넘는", "위")
+_PRICE_RE = re.compile(
+    r"(\d+(?:\.\d+)?)\s*만\s*(?:(\d+)\s*천)?\s*원?|(만)\s*원|(\d+)\s*천\s*원?|(\d[\d,]*)\s*원"
+)
+# 알레르기 성분 바로 뒤에 붙을 수 있는 조사
+_PARTICLES = ("", "은", "는", "이", "가", "을", "를", "도", "만", "이랑", "랑", "과", "와", "이나", "나", "으로", "로", "에", "에는", "의")
+
+# 검색어에서 무시할 표현 (조사/서술어 등)
+_STOPWORDS = {
+    "메뉴", "있어요", "있나요", "있어", "뭐", "뭐가", "뭐예요", "추천", "추천해", "추천해줘", "추천해주세요",
+    "주세요", "줘", "좀", "알려줘", "알려주세요", "얼마", "얼마예요", "얼마에요", "얼마야", "가격", "은", "는",
+    "이", "가", "을", "를", "요", "중에", "중", "들어간", "들어있는", "있는", "거", "것", "음식", "먹을",
+    "수", "인", "된", "없는", "빼고", "제외", "알레르기",
+}
+_TOKEN_RE = re.compile(r"[0-9a-z가-힣ㄱ-ㅎ]+")
+
+
+def decompose_jamo(text: str) -> str:
+    """한글 음절을 초성/중성/종성 자모로 분해 (STT 오타에 강한 비교용)"""
+    out = []
+    for ch in text:
+        code = ord(ch) - 0xAC00
+        if 0 <= code < 11172:
+            out.append(_CHOSEONG[code // 588])
+            out.append(_JUNGSEONG[(code % 588) // 28])
+            out.append(_JONGSEONG[code % 28])
+        else:
+            out.append(ch)
+    return "".join(out)
+
+
+def choseong(text: str) -> str:
+    """한글 음절의 초성만 추출 ('치킨버거' -> 'ㅊㅋㅂㄱ')"""
+    out = []
+    for ch in text:
+        code = ord(ch) - 0xAC00
+        if 0 <= code < 11172:
+            out.append(_CHOSEONG[code // 588])
+        elif not ch.isspace():
+            out.append(ch)
+    return "".join(out)
+
+
+def normalize(text: str) -> str:
+    """소문자화 + 공백/기호 제거"""
+    return "".join(_TOKEN_RE.findall(text.lower()))
+
+
+def ngrams(text: str, n: int = 2) -> set:
+    """문자 n-gram 집합 (짧은 문자열은 그대로 1개)"""
+    if len(text) <= n:
+        return {text} if text else set()
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+
+def mask_to_bool(mask: int, size: int) -> np.ndarray:
+    """정수 비트셋 -> 길이 size의 bool 배열"""
+    raw = np.frombuffer(mask.to_bytes((size + 7) // 8, "little"), dtype=np.uint8)
+    return np.unpackbits(raw, bitorder="little")[:size].astype(bool)
+
+
+def parse_price(text: str) -> Optional[int]:
+    """'1만원', '1만5천원', '만원', '5천원', '8,900원' 형태의 금액 파싱"""
+    m = _PRICE_RE.search(text)
+    if not m:
+        return None
+    man, cheon, bare_man, only_cheon, won = m.groups()
+    if won is not None:
+        return int(won.replace(",", ""))
+    if only_cheon is not None:
+        return int(only_cheon) * 1000
+    if bare_man is not None:
+        return 10000
+    value = int(float(man) * 10000)
+    if cheon:
+        value += int(cheon) * 1000
+    return value
+
+
+def strip_particle(token: str) -> str:
+    """검색어 끝의 조사 제거 ('음료가' -> '음료', '샐러드를' -> '샐러드')"""
+    for particle in sorted(_PARTICLES, key=len, reverse=True):
+        if particle and token.endswith(particle) and len(token) - len(particle) >= 2:
+            return token[:-len(particle)]
+    return token
+
+
+def _mentions(token: str, term: str) -> bool:
+    """token이 term 자체이거나 term + 조사/부정 표현인지 ('새우는', '새우없는' O, '새우버거' X)"""
+    if not token.startswith(term):
+        return False
+    rest = token[len(term):]
+    return rest in _PARTICLES or rest.startswith(_NEGATIONS) or rest.startswith("들어")
+
+
+class MenuQuery:
+    """자연어 질의에서 추출한 검색 조건"""
+
+    def __init__(self):
+        self.keywords: list = []
+        self.exclude_allergens: set = set()
+        self.require_allergens: set = set()
+        self.diet: set = set()
+        self.max_price: Optional[int] = None
+        self.min_price: Optional[int] = None
+
+    @property
+    def has_constraints(self) -> bool:
+        return bool(self.exclude_allergens or self.require_allergens or self.diet
+                    or self.max_price is not None or self.min_price is not None)
+
+    def __repr__(self) -> str:
+        return (f"MenuQuery(keywords={self.keywords}, exclude={sorted(self.exclude_allergens)}, "
+                f"require={sorted(self.require_allergens)}, diet={sorted(self.diet)}, "
+                f"price=[{self.min_price}, {self.max_price}])")
+
+
+class MenuIndex:
+    """
+    메뉴 검색 인덱스 (메뉴 로드 시 한 번 생성)
+    - 이름/카테고리/메모의 자모 bigram 역색인 (gram -> 항목 번호 배열) + 이름 초성 색인
+      -> STT 오타, 초성 검색 허용 / 질의 gram의 posting을 합쳐 bincount 한 번으로 점수 계산
+    - 알레르기 성분별, diet_tags별 비트셋 (정수 비트마스크)
+    - 가격 정렬 배열 + 누적 비트셋 -> 가격 상/하한을 이분 탐색 한 번으로 처리
+    "새우 없는 비건 1만원 이하" 같은 질의는 비트셋 교집합으로 해결
+    """
+
+    def __init__(self, menu_data: dict, min_score: float = 0.6):
+        self.min_score = min_score
+        self.items: list = list(menu_data.get('items', [])) if menu_data else []
+        self.allergen_vocab: list = list(menu_data.get('allergen_vocab', [])) if menu_data else []
+        self.all_mask = (1 << len(self.items)) - 1
+
+        name_postings = defaultdict(list)  # gram -> 항목 번호 목록
+        text_postings = defaultdict(list)
+        self._choseong: list = []
+        self.names: list = []  # 정규화된 메뉴 이름 (문장 속 메뉴 언급 찾기용)
+        self.allergen_masks = defaultdict(int)
+        self.diet_masks = defaultdict(int)
+
+        for i, item in enumerate(self.items):
+            bit = 1 << i
+            name = normalize(item.get('name', ''))
+            text = normalize(item.get('category', '') + " " + item.get('notes', ''))
+            name_grams = ngrams(decompose_jamo(name))
+            text_grams = ngrams(decompose_jamo(text))
+            for g in name_grams:
+                name_postings[g].append(i)
+            for g in text_grams:
+                text_postings[g].append(i)
+            self._choseong.append(choseong(name))
+            self.names.append(name)
+
+            for allergen in item.get('allergens', []):
+                self.allergen_masks[allergen] |= bit
+            for tag, value in (item.get('diet_tags') or {}).items():
+                if value:
+                    self.diet_masks[tag] |= bit
+
+        self._name_index = {g: np.array(p, dtype=np.int32) for g, p in name_postings.items()}
+        self._text_index = {g: np.array(p, dtype=np.int32) for g, p in text_postings.items()}
+
+        # 가격 정렬 배열과 누적 비트셋 (price_prefix[k] = 가장 싼 k개 항목)
+        order = sorted(range(len(self.items)), key=lambda i: self.items[i].get('price', 0))
+        self.prices = [self.items[i].get('price', 0) for i in order]
+        self.price_order = order
+        self._price_prefix = [0]
+        for i in order:
+            self._price_prefix.append(self._price_prefix[-1] | (1 << i))
+
+        # 알레르기 표현 사전 (정규화된 표현 -> vocab 목록)
+        self._allergen_terms = {}
+        for allergen in set(self.allergen_vocab) | set(self.allergen_masks):
+            base = normalize(allergen.split("(")[0])
+            self._allergen_terms.setdefault(base, set()).add(allergen)
+            self._allergen_terms.setdefault(normalize(allergen), set()).add(allergen)
+        for alias, allergen in ALLERGEN_ALIASES.items():
+            if allergen in self.allergen_masks or allergen in self.allergen_vocab:
+                self._allergen_terms.setdefault(alias, set()).add(allergen)
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def find_mentions(self, text: str, min_score: float = 0.7) -> list:
+        """
+        문장에서 언급된 메뉴 -> [(정규화된 문장 속 위치, 항목 번호)] 위치 순
+        이름이 그대로 나온 메뉴를 긴 이름부터 찾고('두부 포케볼' 안의 '포케볼'은 한 번만),
+        남은 두 글자 이상 검색어는 한 메뉴와만 min_score 이상 맞을 때 언급으로 봄 (STT 오타)
+        """
+        normalized = normalize(text)
+        taken = [False] * len(normalized)
+        found = []
+        for i in sorted(range(len(self.names)), key=lambda i: -len(self.names[i])):
+            name = self.names[i]
+            start = normalized.find(name) if name else -1
+            while start >= 0:
+                if not any(taken[start:start + len(name)]):
+                    taken[start:start + len(name)] = [True] * len(name)
+                    found.append((start, i))
+                    break
+                start = normalized.find(name, start + 1)
+
+        for keyword in self.parse_query(text).keywords:
+            start = normalized.find(keyword)
+            # 한 글자('개', '더')는 초성만으로도 우연히 맞을 수 있어 제외
+            if len(keyword) < 2 or start < 0 or any(taken[start:start + len(keyword)]):
+                continue
+            scores = self.match_keyword(keyword)
+            best = int(np.argmax(scores)) if len(scores) else 0
+            if len(scores) and scores[best] >= min_score and np.count_nonzero(scores >= scores[best]) == 1:
+                taken[start:start + len(keyword)] = [True] * len(keyword)
+                found.append((start, best))
+        return sorted(found)
+
+    # ---- 조건 비트셋 ----
+    def price_mask(self, max_price: Optional[int] = None, min_price: Optional[int] = None) -> int:
+        """가격 범위에 해당하는 항목 비트셋"""
+        upper = self._price_prefix[bisect_right(self.prices, max_price)] if max_price is not None else self.all_mask
+        lower = self._price_prefix[bisect_left(self.prices, min_price)] if min_price is not None else 0
+        return upper & ~lower
+
+    def allergen_mask(self, allergens: Iterable[str]) -> int:
+        """하나라도 포함하는 항목 비트셋"""
+        mask = 0
+        for allergen in allergens:
+            mask |= self.allergen_masks.get(allergen, 0)
+        return mask
+
+    def filter_mask(self, query: MenuQuery) -> int:
+        """질의의 알레르기/식단/가격 조건을 모두 만족하는 항목 비트셋"""
+        mask = self.all_mask & ~self.allergen_mask(query.exclude_allergens)
+        for allergen in query.require_allergens:
+            mask &= self.allergen_masks.get(allergen, 0)
+        for tag in query.diet:
+            mask &= self.diet_masks.get(tag, 0)
+        if query.max_price is not None or query.min_price is not None:
+            mask &= self.price_mask(query.max_price, query.min_price)
+        return mask
+
+    def indices(self, mask: int) -> np.ndarray:
+        """비트셋에서 켜진 항목 번호 배열"""
+        return np.flatnonzero(mask_to_bool(mask, len(self.items)))
+
+    # ---- 텍스트 매칭 ----
+    def _gram_counts(self, index: dict, grams: set) -> np.ndarray:
+        postings = [index[g] for g in grams if g in index]
+        if not postings:
+            return np.zeros(len(self.items), dtype=np.float32)
+        return np.bincount(np.concatenate(postings), minlength=len(self.items)).astype(np.float32)
+
+    def match_keyword(self, keyword: str) -> np.ndarray:
+        """
+        검색어 하나와 모든 항목의 유사도 배열 (0~1, min_score 미만은 0)
+        질의 자모 bigram 중 항목에 포함된 비율 또는 이름 초성 일치
+        """
+        scores = np.zeros(len(self.items), dtype=np.float32)
+        norm = normalize(keyword)
+        if not norm:
+            return scores
+
+        # 초성만으로 된 검색어 ('ㅊㅋㅂㄱ')
+        if all('ㄱ' <= ch <= 'ㅎ' for ch in norm):
+            for i, initials in enumerate(self._choseong):
+                if norm in initials:
+                    scores[i] = 1.0
+            return scores
+
+        grams = ngrams(decompose_jamo(norm))
+        name_score = self._gram_counts(self._name_index, grams)
+        text_score = self._gram_counts(self._text_index, grams)
+        scores = np.maximum(name_score, 0.8 * text_score) / len(grams)
+        scores[scores < self.min_score] = 0.0
+        return scores
+
+    # ---- 질의 해석 ----
+    def parse_query(self, text: str) -> MenuQuery:
+        """자연어 질의에서 알레르기/식단/가격 조건과 검색어 추출"""
+        query = MenuQuery()
+        lowered = text.lower()
+        consumed = []  # 조건으로 해석된 구간 (검색어에서 제외)
+
+        # 가격 조건
+        m = _PRICE_RE.search(lowered)
+        if m:
+            price = parse_price(m.group(0))
+            tail = lowered[m.end():m.end() + 6]
+            if any(w in tail for w in _PRICE_MIN_WORDS):
+                query.min_price = price
+            else:
+                query.max_price = price
+            consumed.append(m.group(0))
+            consumed.extend(w for w in _PRICE_MAX_WORDS + _PRICE_MIN_WORDS if w in tail)
+
+        tokens = _TOKEN_RE.findall(lowered)
+        for pos, token in enumerate(tokens):
+            # 식단 조건
+            for word, tags in DIET_KEYWORDS.items():
+                if token.startswith(word):
+                    query.diet.update(tags)
+                    consumed.append(token)
+
+            # 알레르기 성분: 뒤에 부정 표현이 오면 제외, 아니면 포함 조건
+            for term, allergens in self._allergen_terms.items():
+                if not _mentions(token, term):
+                    continue
+                rest = token[len(term):] + " ".join(tokens[pos + 1:pos + 3])
+                if any(neg.replace(" ", "") in rest.replace(" ", "") for neg in _NEGATIONS):
+                    query.exclude_allergens.update(allergens)
+                    if "돼지고기" in allergens:
+                        query.diet.add("no_pork")
+                else:
+                    query.require_allergens.update(allergens)
+                consumed.append(token)
+                break
+
+        consumed_set = set(consumed)
+        for token in tokens:
+            if token in consumed_set or token in _STOPWORDS:
+                continue
+            if any(token in c for c in consumed):
+                continue
+            keyword = strip_particle(token)
+            if keyword not in _STOPWORDS:
+                query.keywords.append(keyword)
+        return query
+
+    # ---- 검색 ----
+    def rank(self, query: MenuQuery, mask: Optional[int] = None) -> list:
+        """
+        조건을 만족하는 항목을 검색어 유사도 순으로 (index, score) 반환
+        검색어가 없으면 조건을 만족하는 모든 항목 (score 0)
+        """
+        if mask is None:
+            mask = self.filter_mask(query)
+        if not query.keywords:
+            return [(int(i), 0.0) for i in self.indices(mask)]
+        totals = np.zeros(len(self.items), dtype=np.float32)
+        for keyword in query.keywords:
+            totals += self.match_keyword(keyword)
+        totals *= mask_to_bool(mask, len(self.items))
+        hits = np.flatnonzero(totals > 0)
+        # 점수 내림차순, 같은 점수는 메뉴 순서
+        order = hits[np.lexsort((hits, -totals[hits]))]
+        return [(int(i), float(totals[i])) for i in order]
+
+    def search(self, text: str, limit: Optional[int] = None) -> list:
+        """자연어 질의로 메뉴 항목 검색"""
+        query = self.parse_query(text)
+        ranked = self.rank(query)
+        if not query.keywords and not query.has_constraints:
+            return []
+        if limit is not None:
+            ranked = ranked[:limit]
+        return [self.items[i] for i, _ in ranked]
+
+    def retrieve(self, text: str, k: int = 8) -> list:
+        """
+        LLM 프롬프트에 넣을 관련 메뉴 상위 k개
+        검색어와 맞는 항목을 유사도 순으로 고르고, 맞는 항목이 없으면
+        알레르기/식단/가격 조건을 만족하는 항목을 카테고리별로 번갈아 채움
+        """
+        query = self.parse_query(text)
+        mask = self.filter_mask(query)
+        picked = [i for i, _ in self.rank(query, mask)[:k]] if query.keywords else []
+        if not picked:
+            by_category = {}
+            for i in self.indices(mask):
+                by_category.setdefault(self.items[i].get('category', '기타'), []).append(int(i))
+            queues = list(by_category.values())
+            while len(picked) < k and queues:
+                for q in queues:
+                    if q and len(picked) < k:
+                        picked.append(q.pop(0))
+                queues = [q for q in queues if q]
+        return [self.items[i] for i in picked]
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+# 시스템 프롬프트 템플릿 (메뉴 컨텍스트만 바뀜)
+SYSTEM_PROMPT_TEMPLATE = """당신은 친절하고 자연스러운 AI 키오스크입니다. 자연스럽고 명확하고 이해하기 쉽게 답변하세요.
+너무 형식적이지 말고 친근한 톤으로 대화하세요.
+주문을 도와주거나 메뉴를 추천해주세요.
+
+다음은 현재 매장의 메뉴 정보입니다. 이 정보를 바탕으로 정확한 메뉴 추천, 가격 안내, 알레르기 정보 등을 제공해주세요:
+
+{menu_context}
+
+메뉴 관련 질문에 답할 때는 위의 메뉴 정보를 정확히 참고하여 답변해주세요.
+- 가격, 알레르기 정보, 영양 정보 등을 포함하여 친절하게 안내해주세요
+- 특정 메뉴에 대해 질문받으면 해당 메뉴의 상세 정보를 제공해주세요
+- 메뉴 추천 요청 시 사용자의 선호도나 제약사항(알레르기, 식단 등)을 고려해주세요
+- 비건, 채식주의자, 돼지고기 금기 등의 식단 제약사항이 있으면 해당 조건에 맞는 메뉴를 추천해주세요
+- 칼로리나 영양 정보에 대한 질문에도 정확히 답변해주세요"""
+
+
+def format_menu_item(item: dict) -> str:
+    """메뉴 항목 한 줄 요약 (이름, 가격, 알레르기, 칼로리)"""
+    menu_info = f"- {item.get('name', '')} ({item.get('price', 0):,}원)"
+
+    # 알레르기 정보 추가
+    allergens = item.get('allergens', [])
+    if allergens:
+        menu_info += f" [알레르기: {', '.join(allergens)}]"
+
+    # 영양 정보 추가
+    nutrition = item.get('nutrition', {})
+    if nutrition.get('calorie_kcal'):
+        menu_info += f" [칼로리: {nutrition['calorie_kcal']}kcal]"
+
+    return menu_info
+
+
+def _category_sections(items: list) -> list:
+    """메뉴 항목을 카테고리별로 묶은 줄 목록"""
+    categories = {}
+    for item in items:
+        category = item.get('category', '기타')
+        categories.setdefault(category, []).append(format_menu_item(item))
+
+    lines = []
+    for category, menu_list in categories.items():
+        lines.append(f"\n{category}:")
+        lines.extend(menu_list)
+    return lines
+
+
+def build_menu_context(menu_data: dict) -> str:
+    """메뉴 데이터를 LLM 컨텍스트로 변환"""
+    if not menu_data:
+        return ""
+
+    context_parts = []
+
+    # 매장 정보
+    store_name = menu_data.get('store', '키오스크')
+    context_parts.append(f"매장명: {store_name}")
+
+    # 카테고리별 메뉴 정보 추가
+    context_parts.extend(_category_sections(menu_data.get('items', [])))
+
+    # 알레르기 정보
+    allergen_vocab = menu_data.get('allergen_vocab', [])
+    if allergen_vocab:
+        context_parts.append(f"\n알레르기 정보: {', '.join(allergen_vocab)}")
+
+    return "\n".join(context_parts)
+
+
+def build_system_prompt(menu_data: dict) -> str:
+    """메뉴 컨텍스트를 포함한 시스템 프롬프트 생성"""
+    return SYSTEM_PROMPT_TEMPLATE.format(menu_context=build_menu_context(menu_data))
+
+
+def build_scoped_system_prompt(menu_data: dict) -> str:
+    """
+    검색 기반 프롬프트용 고정 시스템 프롬프트 (메뉴 항목 제외)
+    매 턴 같은 바이트열이라 프롬프트 캐싱이 적용되고, 관련 메뉴는 별도 메시지로 전달
+    """
+    if not menu_data:
+        return SYSTEM_PROMPT_TEMPLATE.format(menu_context="")
+
+    context_parts = [f"매장명: {menu_data.get('store', '키오스크')}"]
+    categories = list(dict.fromkeys(item.get('category', '기타') for item in menu_data.get('items', [])))
+    if categories:
+        context_parts.append(f"카테고리: {', '.join(categories)}")
+    allergen_vocab = menu_data.get('allergen_vocab', [])
+    if allergen_vocab:
+        context_parts.append(f"알레르기 정보: {', '.join(allergen_vocab)}")
+    context_parts.append(
+        "\n메뉴 목록은 고객의 질문과 관련된 항목만 다음 메시지로 제공됩니다. "
+        "목록에 없는 메뉴는 추측하지 말고 다른 메뉴를 물어봐 달라고 안내해주세요."
+    )
+    return SYSTEM_PROMPT_TEMPLATE.format(menu_context="\n".join(context_parts))
+
+
+def build_retrieved_menu_message(items: list, total: int) -> str:
+    """질문과 관련된 메뉴 항목만 담은 컨텍스트 메시지"""
+    lines = [f"질문과 관련된 메뉴 (전체 {total}개 중 {len(items)}개):"]
+    lines.extend(_category_sections(items))
+    return "\n".join(lines)
+
+
+def count_tokens(text: str, model: str = "gpt-4o-mini") -> int:
+    """
+    프롬프트 토큰 수 계산
+    tiktoken이 설치되어 있으면 정확히 계산하고, 없으면 UTF-8 바이트 기준으로 근사
+    (한국어는 대략 1토큰 ≈ 3바이트)
+    """
+    try:
+        import tiktoken
+        try:
+            encoding = tiktoken.encoding_for_model(model)
+        except KeyError:
+            encoding = tiktoken.get_encoding("o200k_base")
+        return len(encoding.encode(text))
+    except ImportError:
+        return len(text.encode("utf-8")) // 3
@@ -0,0 +1,201 @@
+from __future__ import annotations
+
+import hashlib
+import mmap
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+from utils.tracing import get_tracer
+
+from .menu_index import normalize
+
+
+def normalize_utterance(text: str) -> str:
+    """캐시 키용 발화 정규화 (소문자, 공백/문장부호 제거)"""
+    return normalize(text)
+
+
+class AnswerCache:
+    """
+    LLM 답변 캐시 (메모리 LRU)
+    키: (메뉴 버전, 정규화된 사용자 발화) -> 메뉴가 바뀌면 자동으로 다른 키가 됨
+    값: 스트리밍 청크 튜플 (그대로 재생하면 문장 분할과 TTS 캐시 키가 처음 응답과 같아짐)
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, menu_version: str, user_text: str) -> Optional[tuple]:
+        key = (menu_version, normalize_utterance(user_text))
+        with self._lock:
+            answer = self._entries.get(key)
+            if answer is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return answer
+
+    def put(self, menu_version: str, user_text: str, chunks) -> None:
+        key = (menu_version, normalize_utterance(user_text))
+        chunks = tuple(chunks)
+        if not key[1] or not "".join(chunks).strip():
+            return
+        with self._lock:
+            self._entries[key] = chunks
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0}
+
+
+class AudioCache:
+    """
+    TTS PCM 캐시 (메모리 LRU + 크기 제한 디스크 저장소)
+    키: (문장, 음성, 속도, 모델)의 sha256
+    - 메모리: 최근 재생한 오디오를 max_memory_bytes까지 보관
+    - 디스크: cache_dir/<앞 2글자>/<해시>.pcm, max_disk_bytes를 넘으면 오래 안 쓴 파일부터 삭제
+    디스크 항목은 mmap으로 열어 memoryview로 반환하므로 재생 시 복사 없이 np.frombuffer로 사용 가능
+    열린 mmap은 키별로 기록해 두고, 디스크에서 지우기 전에 닫음
+    (아직 재생 중인 버퍼가 있어 닫을 수 없으면 그 파일은 건너뛰고 다음 정리 때 다시 시도)
+    """
+
+    def __init__(self, cache_dir: Path, max_memory_bytes: int = 32 * 1024 * 1024,
+                 max_disk_bytes: int = 256 * 1024 * 1024):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self._memory: OrderedDict = OrderedDict()
+        self._memory_bytes = 0
+        self._maps: dict = {}  # 키 -> 열려 있는 mmap 목록
+        self._lock = threading.Lock()
+        self._disk_bytes = sum(p.stat().st_size for p in self.cache_dir.glob("*/*.pcm"))
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(text: str, voice: str, speed: float, model: str) -> str:
+        return hashlib.sha256(f"{model}|{voice}|{speed:.2f}|{text.strip()}".encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.pcm"
+
+    def get(self, key: str):
+        """캐시된 PCM (bytes 또는 mmap 기반 memoryview), 없으면 None"""
+        with self._lock:
+            audio = self._memory.get(key)
+            if audio is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return audio
+
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            os.utime(path)  # LRU 정리용 사용 시각 갱신
+        except (OSError, ValueError):
+            with self._lock:
+                self.misses += 1
+            return None
+
+        audio = memoryview(mapped)
+        with self._lock:
+            self._maps.setdefault(key, []).append(mapped)
+            self.hits += 1
+            self._remember(key, audio)
+        return audio
+
+    def put(self, key: str, audio: bytes) -> None:
+        if not audio:
+            return
+        path = self._path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            replaced = path.stat().st_size if path.exists() else 0
+            tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+            with open(tmp_path, "wb") as f:
+                f.write(audio)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            get_tracer().event("tts_cache.save_failed", f"[TTS 캐시 저장 실패] {e}", level="error", error=str(e))
+        else:
+            with self._lock:
+                self._disk_bytes += len(audio) - replaced
+            self._evict_disk()
+        with self._lock:
+            self._remember(key, audio)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {"memory_bytes": self._memory_bytes, "disk_bytes": self._disk_bytes, "hits": self.hits,
+                "misses": self.misses, "hit_rate": self.hits / total if total else 0.0}
+
+    def _remember(self, key: str, audio) -> None:
+        if key in self._memory:
+            self._memory_bytes -= len(self._memory.pop(key))
+        self._memory[key] = audio
+        self._memory_bytes += len(audio)
+        while self._memory_bytes > self.max_memory_bytes and len(self._memory) > 1:
+            old_key, old = self._memory.popitem(last=False)
+            self._memory_bytes -= len(old)
+            del old
+            self._close_maps(old_key)
+
+    def _close_maps(self, key: str) -> bool:
+        """키의 mmap을 모두 닫음 (잠금 안에서 호출), 아직 쓰는 버퍼가 있어 닫지 못한 것이 남으면 False"""
+        in_use = []
+        for mapped in self._maps.pop(key, ()):
+            try:
+                mapped.close()
+            except BufferError:
+                in_use.append(mapped)  # 호출자가 아직 memoryview를 들고 있음 (재생 중)
+        if in_use:
+            self._maps[key] = in_use
+            return False
+        return True
+
+    def _release(self, key: str) -> bool:
+        """디스크에서 지우기 전: 메모리 캐시의 mmap 항목을 내리고 mmap을 닫음 (사용 중이면 False)"""
+        with self._lock:
+            if key not in self._maps:
+                return True
+            audio = self._memory.pop(key, None)
+            if audio is not None:
+                self._memory_bytes -= len(audio)
+                del audio
+            return self._close_maps(key)
+
+    def _evict_disk(self) -> None:
+        """디스크 용량 제한을 넘으면 오래 사용하지 않은 파일부터 삭제"""
+        if self._disk_bytes <= self.max_disk_bytes:
+            return
+        files = sorted(self.cache_dir.glob("*/*.pcm"), key=lambda p: p.stat().st_mtime)
+        for path in files:
+            if self._disk_bytes <= self.max_disk_bytes:
+                break
+            if not self._release(path.stem):
+                continue  # 재생 중인 버퍼가 매핑하고 있음 -> 다음 정리 때
+            try:
+                size = path.stat().st_size
+                path.unlink()
+            except OSError:
+                continue
+            with self._lock:
+                self._disk_bytes -= size
@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import re
+from typing import Iterable, Iterator, List, Optional
+
+# 문장 끝 문장부호 / 뒤따라 붙는 닫는 기호
+_TERMINATORS = ".!?…。\n"
+_CLOSERS = "\"'”’)]}」』"
+# 이 어미 뒤의 마침표는 숫자/약어와 상관없이 문장 끝 (입니다. 있어요. 할까요?)
+KOREAN_ENDINGS = "다요까죠네군"
+# 마침표가 문장 끝이 아닌 약어
+ABBREVIATIONS = {"mr", "mrs", "ms", "dr", "prof", "st", "vs", "etc", "no", "e.g", "i.e", "approx", "min", "max"}
+# 길이 제한으로 자를 때 우선하는 절 끝 (쉼표 다음 공백이 없으면 이 어미 뒤 공백)
+_CLAUSE_ENDINGS = "고며서데면니만"
+_WORD_BEFORE_RE = re.compile(r"([A-Za-z]+(?:\.[A-Za-z]+)*)$")
+
+
+class SentenceSegmenter:
+    """
+    LLM 토큰 스트림용 증분 문장 분할기 (TTS 입력 단위)
+    - feed()마다 새로 들어온 글자만 검사 (이미 본 글자는 다시 스캔하지 않음)
+    - 문장 끝: ! ? … 줄바꿈, 그리고 마침표 중 소수점(12.9), 목록 번호(1.), 약어(Dr.), 단어 중간(gpt-4o.mini)이 아닌 것
+      한국어 종결 어미(다/요/까...) 뒤 마침표는 항상 문장 끝
+    - 최소 길이 미만 문장은 다음 문장과 합쳐서 짧은 조각을 TTS로 보내지 않음
+    - 최대 길이를 넘으면 쉼표/절 끝 공백에서 자름 (첫 조각은 first_max_chars로 더 짧게 잘라 첫 오디오를 앞당김)
+    """
+
+    def __init__(self, min_chars: int = 10, max_chars: int = 120, first_max_chars: int = 50):
+        self.min_chars = min_chars
+        self.max_chars = max_chars
+        self.first_max_chars = first_max_chars
+        self._buffer = ""
+        self._pos = 0  # 다음에 검사할 위치
+        self._soft_comma = 0  # 쉼표 뒤 자를 수 있는 위치
+        self._soft_space = 0  # 절 끝 공백 뒤 자를 수 있는 위치
+        self.emitted = 0
+
+    def reset(self) -> None:
+        self._buffer = ""
+        self._pos = self._soft_comma = self._soft_space = 0
+        self.emitted = 0
+
+    def feed(self, text: str) -> List[str]:
+        """토큰 추가 -> 완성된 문장 목록"""
+        self._buffer += text
+        return self._drain(final=False)
+
+    def flush(self) -> List[str]:
+        """스트림 끝 -> 남은 텍스트까지 모두 반환"""
+        sentences = self._drain(final=True)
+        rest = self._buffer.strip()
+        if rest:
+            sentences.append(rest)
+            self.emitted += 1
+        self._buffer = ""
+        self._pos = self._soft_comma = self._soft_space = 0
+        return sentences
+
+    # ---- 내부 ----
+    def _drain(self, final: bool) -> List[str]:
+        sentences = []
+        while True:
+            cut = self._find_cut(final)
+            if cut is None:
+                return sentences
+            sentence = self._buffer[:cut].strip()
+            self._buffer = self._buffer[cut:]
+            self._pos = self._soft_comma = self._soft_space = 0
+            if sentence:
+                sentences.append(sentence)
+                self.emitted += 1
+
+    def _find_cut(self, final: bool) -> Optional[int]:
+        buf = self._buffer
+        size = len(buf)
+        max_chars = self.first_max_chars if self.emitted == 0 else self.max_chars
+        i = self._pos
+        while i < size:
+            c = buf[i]
+            if c in _TERMINATORS:
+                end = i + 1
+                while end < size and (buf[end] in _CLOSERS or buf[end] in _TERMINATORS):
+                    end += 1
+                if end == size and not final and c != "\n":
+                    # 다음 글자를 봐야 판단 가능 (12. -> 12.9 / 요. -> 닫는 따옴표)
+                    self._pos = i
+                    return None
+                if self._is_boundary(buf, i, end) and len(buf[:end].strip()) >= self.min_chars:
+                    return end
+                i = end
+                continue
+
+            if c == " " and i > 0:
+                prev = buf[i - 1]
+                if prev == ",":
+                    self._soft_comma = i + 1
+                elif prev in _CLAUSE_ENDINGS:
+                    self._soft_space = i + 1
+
+            i += 1
+            if i >= max_chars:
+                for soft in (self._soft_comma, self._soft_space):
+                    if soft >= self.min_chars:
+                        return soft
+                if c == " " or i >= max_chars * 2:
+                    return i
+        self._pos = size
+        return None
+
+    @staticmethod
+    def _is_boundary(buf: str, i: int, end: int) -> bool:
+        """buf[i]의 문장부호가 문장 끝인지"""
+        if buf[i] != ".":
+            return True
+        prev = buf[i - 1] if i > 0 else ""
+        if prev in KOREAN_ENDINGS:
+            return True
+        nxt = buf[end] if end < len(buf) else ""
+        # 소수점 (12.9), 줄 첫머리 목록 번호 (1. 치킨버거)
+        if prev.isdigit() and end == i + 1 and nxt.isdigit():
+            return False
+        if prev.isdigit():
+            marker = buf[buf.rfind("\n", 0, i) + 1:i].strip()
+            if marker.isdigit() and len(marker) <= 2:
+                return False
+        # 약어 (Dr. / e.g. / 한 글자 대문자 이니셜)
+        match = _WORD_BEFORE_RE.search(buf, max(0, i - 16), i)
+        if match:
+            word = match.group(1)
+            if word.lower() in ABBREVIATIONS or (len(word) == 1 and word.isupper()):
+                return False
+        # 단어 중간의 마침표 (gpt-4o.mini, www.example.com)
+        return not nxt or nxt.isspace()
+
+
+def iter_sentences(stream: Iterable[str], **options) -> Iterator[str]:
+    """토큰 스트림 -> 문장 스트림"""
+    segmenter = SentenceSegmenter(**options)
+    for chunk in stream:
+        yield from segmenter.feed(chunk)
+    yield from segmenter.flush()
@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from typing import Callable, Iterator, Optional
+
+from utils.tracing import get_tracer
+
+from .response_cache import normalize_utterance
+
+_END = object()
+
+
+class SpeculativeResponse:
+    """
+    백그라운드 스레드에서 미리 받아 두는 LLM 응답 스트림
+    cancel()하거나 stream() 소비자가 중간에 닫으면 다음 청크에서 LLM 스트림을 닫음
+    """
+
+    def __init__(self, text: str, stream_fn: Callable[[str], Iterator[str]]):
+        self.text = text
+        self.started_at = time.perf_counter()
+        self.first_chunk_at: Optional[float] = None
+        self._stream_fn = stream_fn
+        self._chunks: queue.Queue = queue.Queue()
+        self._cancel = threading.Event()
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def _run(self) -> None:
+        stream = None
+        try:
+            stream = self._stream_fn(self.text)
+            for chunk in stream:
+                if self._cancel.is_set():
+                    break
+                if self.first_chunk_at is None:
+                    self.first_chunk_at = time.perf_counter()
+                self._chunks.put(chunk)
+        except Exception as e:
+            get_tracer().event("speculation.failed", f"[추측 응답 실패] {e}", level="error", error=str(e))
+        finally:
+            close = getattr(stream, "close", None)
+            if close is not None:
+                close()
+            self._chunks.put(_END)
+
+    def cancel(self) -> None:
+        self._cancel.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    def stream(self) -> Iterator[str]:
+        """미리 받은 청크부터 이어서 내보냄"""
+        try:
+            while True:
+                chunk = self._chunks.get()
+                if chunk is _END:
+                    return
+                yield chunk
+        finally:
+            self._cancel.set()  # 끼어들기 등으로 소비자가 중간에 닫으면 LLM도 중단
+
+
+class SpeculationController:
+    """
+    스트리밍 STT 중간 결과로 LLM 요청을 미리 시작
+    - 중간 결과가 stable_ms 동안 바뀌지 않으면(말이 멈춤) 그 문장으로 LLM 요청 시작
+    - 이후 다른 중간 결과가 다시 안정되면 기존 요청을 취소하고 새로 시작 (발화당 최대 max_restarts회)
+    - 최종 결과가 나오면 resolve(): 정규화한 문장이 같을 때만 미리 받은 응답을 재사용하고, 다르면 취소
+      (주문 수량처럼 한 글자 차이도 답이 달라지므로 유사도가 아니라 정규화 후 일치로 판단)
+    on_partial()은 STT 수신 스레드, resolve()는 메인 루프에서 호출
+    """
+
+    def __init__(self, stream_fn: Callable[[str], Iterator[str]],
+                 should_speculate: Optional[Callable[[str], bool]] = None,
+                 stable_ms: float = 250.0, min_chars: int = 4, max_restarts: int = 2):
+        self.stream_fn = stream_fn
+        self.should_speculate = should_speculate
+        self.stable_s = stable_ms / 1000
+        self.min_chars = min_chars
+        self.max_restarts = max_restarts
+        self._lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+        self._candidate = ""
+        self._current: Optional[SpeculativeResponse] = None
+        self._restarts = 0
+        self.started = 0
+        self.hits = 0
+        self.misses = 0
+        self.restarts = 0
+        self.head_start_s = 0.0
+
+    def on_partial(self, text: str) -> None:
+        key = normalize_utterance(text)
+        with self._lock:
+            if key == self._candidate:
+                return
+            self._candidate = key
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(self.stable_s, self._promote, args=(key, text))
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _promote(self, key: str, text: str) -> None:
+        """중간 결과가 stable_ms 동안 그대로면 추측 요청 시작"""
+        if len(key) < self.min_chars:
+            return
+        if self.should_speculate is not None and not self.should_speculate(text):
+            return
+        with self._lock:
+            if key != self._candidate:
+                return
+            current = self._current
+            if current is not None:
+                if normalize_utterance(current.text) == key:
+                    return
+                if self._restarts >= self.max_restarts:
+                    return
+                current.cancel()
+                self._restarts += 1
+                self.restarts += 1
+            self._current = SpeculativeResponse(text, self.stream_fn)
+            self.started += 1
+
+    def _take(self) -> Optional[SpeculativeResponse]:
+        """발화 하나가 끝남: 진행 중인 추측 요청을 꺼내고 상태 초기화"""
+        with self._lock:
+            current, self._current = self._current, None
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            self._candidate = ""
+            self._restarts = 0
+        return current
+
+    def resolve(self, final_text: str) -> Optional[SpeculativeResponse]:
+        """최종 인식 결과와 같은 문장으로 시작한 추측 응답 (없거나 다르면 None, 다른 요청은 취소)"""
+        current = self._take()
+        if current is None:
+            return None
+        if normalize_utterance(current.text) == normalize_utterance(final_text) and not current.cancelled:
+            self.hits += 1
+            self.head_start_s += time.perf_counter() - current.started_at
+            return current
+        current.cancel()
+        self.misses += 1
+        return None
+
+    def cancel(self) -> None:
+        """최종 결과를 쓰지 않는 턴 (키보드 입력, STT 실패 등)"""
+        current = self._take()
+        if current is not None:
+            current.cancel()
+
+    def stats(self) -> dict:
+        return {
+            "started": self.started,
+            "hits": self.hits,
+            "misses": self.misses,
+            "restarts": self.restarts,
+            "avg_head_start_ms": self.head_start_s / self.hits * 1000 if self.hits else 0.0,
+        }
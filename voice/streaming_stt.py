@@ -0,0 +1,465 @@
+"""
+스트리밍 STT (말하는 동안 오디오를 조각으로 보내고 중간/최종 인식 결과를 받음)
+
+프로토콜: TCP 위 JSON 한 줄(JSON lines) 메시지
+  클라이언트 -> 서버: {"type": "start", "sample_rate": 16000}
+                      {"type": "audio", "pcm": <base64 int16 PCM>}
+                      {"type": "end"}    (발화 끝 -> 최종 결과 요청)
+                      {"type": "abort"}  (짧은 잡음 등으로 버린 발화)
+  서버 -> 클라이언트: {"type": "partial", "text": "..."}
+                      {"type": "final", "text": "..."}
+한 연결이 발화 하나를 담당 (발화마다 새 연결)
+
+로컬 대체 서버 (테스트/벤치마크용):
+    python -m voice.streaming_stt --port 8765 --script transcripts.txt   # 대본 기반 (한 줄에 발화 하나)
+    python -m voice.streaming_stt --port 8765 --openai                   # 누적 오디오를 주기적으로 OpenAI STT로 인식
+"""
+from __future__ import annotations
+
+import argparse
+import base64
+import json
+import queue
+import socket
+import socketserver
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Iterable, List, Optional, Tuple, Union
+
+from utils.tracing import get_tracer
+
+from .stt_upload import build_upload
+
+
+# ---- 인식기 (로컬 대체 서버 백엔드) ----
+class ScriptedRecognizer:
+    """
+    대본 기반 인식기: 발화마다 대본의 다음 문장을 받은 오디오 길이에 비례해 어절 단위로 공개
+    대본 항목이 (중간 결과용 문장, 최종 문장) 튜플이면 중간 결과와 최종 결과가 다른 경우(오인식 수정)를 재현
+    final_delay_ms: 발화 끝 이후 최종 결과까지 서버 처리 시간
+    """
+
+    def __init__(self, script: Iterable[Union[str, Tuple[str, str]]], chars_per_second: float = 7.0,
+                 final_delay_ms: float = 150.0):
+        self._script = list(script)
+        self._lock = threading.Lock()
+        self.chars_per_second = chars_per_second
+        self.final_delay_ms = final_delay_ms
+
+    def session(self) -> "_ScriptedSession":
+        with self._lock:
+            entry = self._script.pop(0) if self._script else ""
+        return _ScriptedSession(self, entry)
+
+    def release(self, entry) -> None:
+        """취소된 발화(짧은 잡음)의 대본은 다음 발화에 다시 사용"""
+        with self._lock:
+            self._script.insert(0, entry)
+
+
+class _ScriptedSession:
+    def __init__(self, recognizer: ScriptedRecognizer, entry):
+        partial, final = entry if isinstance(entry, tuple) else (entry, entry)
+        self._recognizer = recognizer
+        self._entry = entry
+        self._words = partial.split()
+        self._final = final
+        self._speech_s = 0.0
+        self.sample_rate = 16000
+
+    def feed(self, pcm: bytes) -> Optional[str]:
+        self._speech_s += len(pcm) / 2 / self.sample_rate
+        budget = self._speech_s * self._recognizer.chars_per_second
+        words, used = [], 0
+        for word in self._words:
+            used += len(word) + 1
+            if used > budget:
+                break
+            words.append(word)
+        return " ".join(words) or None
+
+    def finish(self) -> str:
+        time.sleep(self._recognizer.final_delay_ms / 1000)
+        return self._final
+
+    def abort(self) -> None:
+        if self._entry:
+            self._recognizer.release(self._entry)
+
+
+class OpenAIChunkRecognizer:
+    """
+    OpenAI 일괄 STT로 흉내 내는 스트리밍 인식기
+    새 오디오가 interval_s 이상 쌓일 때마다 지금까지의 오디오 전체를 다시 인식해 중간 결과로 보냄
+    """
+
+    def __init__(self, client, model: str = "gpt-4o-transcribe", interval_s: float = 1.0, codec: str = "wav"):
+        self.client = client
+        self.model = model
+        self.interval_s = interval_s
+        self.codec = codec
+
+    def session(self) -> "_OpenAIChunkSession":
+        return _OpenAIChunkSession(self)
+
+
+class _OpenAIChunkSession:
+    def __init__(self, recognizer: OpenAIChunkRecognizer):
+        self._recognizer = recognizer
+        self._chunks: List[bytes] = []
+        self._since_partial = 0
+        self.sample_rate = 16000
+
+    def _transcribe(self) -> str:
+        filename, payload, mime = build_upload(b"".join(self._chunks), self.sample_rate, self._recognizer.codec)
+        transcript = self._recognizer.client.audio.transcriptions.create(
+            model=self._recognizer.model, file=(filename, payload, mime))
+        return transcript.text.strip()
+
+    def feed(self, pcm: bytes) -> Optional[str]:
+        self._chunks.append(pcm)
+        self._since_partial += len(pcm)
+        if self._since_partial < self._recognizer.interval_s * self.sample_rate * 2:
+            return None
+        self._since_partial = 0
+        return self._transcribe()
+
+    def finish(self) -> str:
+        return self._transcribe() if self._chunks else ""
+
+
+# ---- 로컬 대체 서버 ----
+class _STTHandler(socketserver.StreamRequestHandler):
+    def _send(self, message: dict) -> None:
+        self.wfile.write((json.dumps(message, ensure_ascii=False) + "\n").encode("utf-8"))
+        self.wfile.flush()
+
+    def handle(self) -> None:
+        session = None
+        last_partial = None
+        for line in self.rfile:
+            message = json.loads(line)
+            kind = message.get("type")
+            if kind == "start":
+                session = self.server.recognizer.session()
+                session.sample_rate = message.get("sample_rate", 16000)
+            elif kind == "audio" and session is not None:
+                partial = session.feed(base64.b64decode(message["pcm"]))
+                if partial is not None and partial != last_partial:
+                    last_partial = partial
+                    self._send({"type": "partial", "text": partial})
+            elif kind == "end" and session is not None:
+                self._send({"type": "final", "text": session.finish()})
+                return
+            elif kind == "abort":
+                break
+        # 최종 결과 없이 끝난 세션 (취소 또는 연결 끊김)
+        abort = getattr(session, "abort", None)
+        if abort is not None:
+            abort()
+
+
+class LocalSTTServer(socketserver.ThreadingTCPServer):
+    """스트리밍 STT 로컬 대체 서버 (연결마다 스레드, recognizer.session()으로 발화별 인식 세션 생성)"""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, recognizer, host: str = "127.0.0.1", port: int = 0):
+        super().__init__((host, port), _STTHandler)
+        self.recognizer = recognizer
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        return self.server_address[:2]
+
+    def start(self) -> "LocalSTTServer":
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+
+# ---- 클라이언트 ----
+class StreamingSTTSession:
+    """
+    발화 하나에 대한 스트리밍 인식 연결
+    send()로 오디오를 보내는 동안 수신 스레드가 중간 결과를 on_partial(text)로 전달
+    """
+
+    def __init__(self, address: Tuple[str, int], sample_rate: int = 16000,
+                 on_partial: Optional[Callable[[str], None]] = None, connect_timeout: float = 1.0):
+        self.on_partial = on_partial
+        self.partial: Optional[str] = None
+        self.final: Optional[str] = None
+        self.started_at = time.perf_counter()
+        self.ended_at: Optional[float] = None
+        self.final_at: Optional[float] = None
+        self.sent_bytes = 0
+        self._done = threading.Event()
+        self._lock = threading.Lock()
+        self._sock = socket.create_connection(address, timeout=connect_timeout)
+        self._sock.settimeout(None)
+        self._writer = self._sock.makefile("wb")
+        self._send({"type": "start", "sample_rate": sample_rate})
+        self._reader = threading.Thread(target=self._read, daemon=True)
+        self._reader.start()
+
+    def _send(self, message: dict) -> None:
+        with self._lock:
+            self._writer.write((json.dumps(message) + "\n").encode("utf-8"))
+            self._writer.flush()
+
+    def _read(self) -> None:
+        try:
+            with self._sock.makefile("rb") as reader:
+                for line in reader:
+                    message = json.loads(line)
+                    if message.get("type") == "partial":
+                        self.partial = message["text"]
+                        if self.on_partial is not None:
+                            self.on_partial(self.partial)
+                    elif message.get("type") == "final":
+                        self.final = message["text"]
+                        self.final_at = time.perf_counter()
+                        return
+        except (OSError, ValueError) as e:
+            get_tracer().event("stt.stream_recv_failed", f"[스트리밍 STT 수신 실패] {e}", level="error", error=str(e))
+        finally:
+            self._done.set()
+
+    def send(self, pcm: bytes) -> None:
+        self._send({"type": "audio", "pcm": base64.b64encode(pcm).decode("ascii")})
+        self.sent_bytes += len(pcm)
+
+    def end(self) -> None:
+        """발화 끝 (최종 결과 요청)"""
+        self.ended_at = time.perf_counter()
+        self._send({"type": "end"})
+
+    def abort(self) -> None:
+        try:
+            self._send({"type": "abort"})
+        except OSError:
+            pass
+        self.close()
+
+    def result(self, timeout: Optional[float] = None) -> Optional[str]:
+        """최종 결과 (timeout 안에 오지 않거나 연결이 끊기면 None)"""
+        self._done.wait(timeout)
+        return self.final
+
+    def close(self) -> None:
+        try:
+            self._writer.close()
+            self._sock.close()
+        except OSError:
+            pass
+
+
+class _Utterance:
+    """발화 하나의 전송 상태 (리스너 스레드에서 만들고 전송 스레드가 연결/전송)"""
+
+    __slots__ = ("session", "ok", "ready")
+
+    def __init__(self):
+        self.session: Optional[StreamingSTTSession] = None
+        self.ok = True  # 전송 실패/큐 초과로 오디오가 빠지면 False -> 일괄 업로드로 처리
+        self.ready = threading.Event()  # 최종 결과 요청을 보냈거나 포기함
+
+
+class StreamingTranscriber:
+    """
+    UtteranceListener의 발화 이벤트 -> 스트리밍 STT 세션
+    - speech_started(): 말이 시작되면 연결을 열고 프리롤 오디오부터 전송
+    - speech_frame(): 말하는 동안 프레임을 chunk_ms 단위로 묶어 전송
+    - speech_ended(): 발화 끝이면 최종 결과 요청, 버린 발화(짧은 잡음)면 세션 취소
+    연결과 전송은 전송 스레드가 맡고 리스너 스레드는 크기 제한(max_queue) 큐에 넣기만 함
+    -> STT 서버가 멈춰도 VAD(말 끝 감지/끼어들기)는 멈추지 않음
+    큐가 가득 차면 그 발화는 오디오가 빠지므로 스트리밍 결과를 쓰지 않음 (dropped 증가, 일괄 업로드로 처리)
+    끝난 발화는 말 끝 감지 시각(speech_end_at)으로 찾음 (리스너 큐의 발화와 짝을 맞춤)
+    """
+
+    def __init__(self, address: Tuple[str, int], sample_rate: int = 16000, chunk_ms: int = 120,
+                 on_partial: Optional[Callable[[str], None]] = None, max_finished: int = 8,
+                 max_queue: int = 64, connect_timeout: float = 1.0):
+        self.address = address
+        self.sample_rate = sample_rate
+        self.chunk_bytes = sample_rate * chunk_ms // 1000 * 2
+        self.on_partial = on_partial
+        self.max_finished = max_finished
+        self.connect_timeout = connect_timeout
+        self._current: Optional[_Utterance] = None
+        self._pending: List[bytes] = []
+        self._pending_bytes = 0
+        self._finished: "OrderedDict[float, _Utterance]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._ops: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._open: Optional[_Utterance] = None  # 전송 스레드가 마지막으로 연결한 발화
+        self.failures = 0
+        self.dropped = 0
+        threading.Thread(target=self._send_loop, daemon=True).start()
+
+    # ---- 리스너 스레드 ----
+    def _submit(self, utterance: _Utterance, kind: str, payload: Optional[bytes] = None) -> bool:
+        try:
+            self._ops.put_nowait((utterance, kind, payload))
+            return True
+        except queue.Full:
+            self.dropped += 1
+            utterance.ok = False
+            return False
+
+    def _flush(self, utterance: _Utterance) -> None:
+        if self._pending:
+            self._submit(utterance, "audio", b"".join(self._pending))
+        self._pending, self._pending_bytes = [], 0
+
+    def speech_started(self, audio: bytes) -> None:
+        if self._current is not None:
+            self._submit(self._current, "abort")
+        self._current = utterance = _Utterance()
+        self._pending, self._pending_bytes = [], 0
+        self._submit(utterance, "start", audio)
+
+    def speech_frame(self, frame: bytes) -> None:
+        if self._current is None:
+            return
+        self._pending.append(frame)
+        self._pending_bytes += len(frame)
+        if self._pending_bytes >= self.chunk_bytes:
+            self._flush(self._current)
+
+    def speech_ended(self, utterance: Optional[bytes], speech_end_at: Optional[float]) -> None:
+        current, self._current = self._current, None
+        if current is None:
+            return
+        if not utterance:
+            self._pending, self._pending_bytes = [], 0
+            self._submit(current, "abort")
+            return
+        self._flush(current)
+        with self._lock:
+            self._finished[speech_end_at] = current
+            while len(self._finished) > self.max_finished:
+                self._close(self._finished.popitem(last=False)[1])
+        if not self._submit(current, "end"):
+            current.ready.set()
+
+    # ---- 전송 스레드 ----
+    def _send_loop(self) -> None:
+        while True:
+            utterance, kind, payload = self._ops.get()
+            try:
+                self._handle(utterance, kind, payload)
+            except OSError as e:
+                self.failures += 1
+                get_tracer().event("stt.stream_send_failed", f"[스트리밍 STT 전송 실패] {e}", level="error",
+                                   error=str(e))
+                utterance.ok = False
+                self._close(utterance)
+            finally:
+                if kind == "end":
+                    utterance.ready.set()
+
+    def _handle(self, utterance: _Utterance, kind: str, payload: Optional[bytes]) -> None:
+        if kind == "start":
+            if self._open is not None and not self._open.ready.is_set():
+                self._abort(self._open)  # 끝 요청이 큐에서 빠진 이전 발화
+            if not utterance.ok:
+                return
+            try:
+                utterance.session = StreamingSTTSession(self.address, self.sample_rate, self.on_partial,
+                                                        self.connect_timeout)
+            except OSError as e:
+                self.failures += 1
+                utterance.ok = False
+                get_tracer().event("stt.stream_connect_failed", f"[스트리밍 STT 연결 실패] {e}", level="error",
+                                   error=str(e))
+                return
+            self._open = utterance
+            utterance.session.send(payload)
+        elif kind == "abort":
+            self._abort(utterance)
+        elif utterance.session is None:
+            return
+        elif not utterance.ok:
+            self._abort(utterance)
+        elif kind == "audio":
+            utterance.session.send(payload)
+        elif kind == "end":
+            utterance.session.end()
+
+    def _abort(self, utterance: _Utterance) -> None:
+        session, utterance.session = utterance.session, None
+        if session is not None:
+            session.abort()
+
+    def _close(self, utterance: _Utterance) -> None:
+        session, utterance.session = utterance.session, None
+        if session is not None:
+            session.close()
+
+    def session_for(self, speech_end_at: float, timeout: float = 1.0) -> Optional[StreamingSTTSession]:
+        """
+        해당 발화의 세션 (스트리밍 STT를 쓰지 못한 발화면 None)
+        전송 스레드가 최종 결과 요청을 보낼 때까지 최대 timeout초 대기 (STT 서버가 멈춰 있으면 None)
+        """
+        with self._lock:
+            utterance = self._finished.pop(speech_end_at, None)
+        if utterance is None or not utterance.ready.wait(timeout) or not utterance.ok:
+            if utterance is not None:
+                utterance.ok = False  # 늦게 처리되는 전송은 세션을 닫음
+                self._close(utterance)
+            return None
+        return utterance.session
+
+
+def _load_script(path: str) -> list:
+    """대본 파일: 한 줄에 발화 하나, '중간 결과 => 최종 결과' 형식이면 오인식 수정 재현"""
+    script = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            if "=>" in line:
+                partial, final = (part.strip() for part in line.split("=>", 1))
+                script.append((partial, final))
+            else:
+                script.append(line)
+    return script
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="스트리밍 STT 로컬 대체 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--script", help="대본 파일 (한 줄에 발화 하나)")
+    parser.add_argument("--openai", action="store_true", help="OpenAI STT로 누적 오디오를 주기적으로 인식")
+    args = parser.parse_args()
+
+    if args.openai:
+        from openai import OpenAI
+        recognizer = OpenAIChunkRecognizer(OpenAI())
+    elif args.script:
+        recognizer = ScriptedRecognizer(_load_script(args.script))
+    else:
+        parser.error("--script 또는 --openai 중 하나를 지정하세요.")
+    server = LocalSTTServer(recognizer, args.host, args.port)
+    print(f"[스트리밍 STT] {args.host}:{server.address[1]} 에서 대기 중")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import io
+import struct
+import threading
+from typing import Optional, Tuple
+
+import numpy as np
+
+# 업로드 형식 -> (파일명, MIME, soundfile format/subtype)
+CODECS = {
+    "wav": ("speech.wav", "audio/wav", None),
+    "flac": ("speech.flac", "audio/flac", ("FLAC", "PCM_16")),
+    "opus": ("speech.ogg", "audio/ogg", ("OGG", "OPUS")),
+}
+
+
+def wav_header(num_bytes: int, sample_rate: int = 16000, channels: int = 1, sample_width: int = 2) -> bytes:
+    """PCM WAV(RIFF) 44바이트 헤더"""
+    byte_rate = sample_rate * channels * sample_width
+    return struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF", 36 + num_bytes, b"WAVE",
+        b"fmt ", 16, 1, channels, sample_rate, byte_rate, channels * sample_width, sample_width * 8,
+        b"data", num_bytes,
+    )
+
+
+class ConcatReader(io.RawIOBase):
+    """
+    여러 버퍼(헤더, PCM)를 이어 붙이지 않고 하나의 파일처럼 읽는 읽기 전용 파일 객체
+    각 버퍼는 memoryview로 참조만 하고, read()는 요청한 조각(업로드 청크)만 bytes로 만듦
+    httpx 멀티파트 업로드가 쓰는 read/seek/tell을 지원
+    """
+
+    def __init__(self, *buffers):
+        self._views = [memoryview(b).cast("B") for b in buffers]
+        self._size = sum(len(v) for v in self._views)
+        self._pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._pos
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self._pos, io.SEEK_END: self._size}[whence]
+        self._pos = min(max(0, base + offset), self._size)
+        return self._pos
+
+    def __len__(self) -> int:
+        return self._size
+
+    def read(self, size: int = -1) -> bytes:
+        end = self._size if size is None or size < 0 else min(self._size, self._pos + size)
+        parts, start = [], 0
+        for view in self._views:
+            lo, hi = max(self._pos, start), min(end, start + len(view))
+            if lo < hi:
+                parts.append(view[lo - start:hi - start])
+            start += len(view)
+        self._pos = end
+        return parts[0].tobytes() if len(parts) == 1 else b"".join(parts)
+
+    def readinto(self, buffer) -> int:
+        data = self.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+
+def encode_wav(pcm, sample_rate: int = 16000) -> ConcatReader:
+    """
+    PCM -> 메모리 WAV (임시 파일 없음, PCM 복사 없음)
+    44바이트 헤더와 PCM 버퍼를 이어 읽는 파일 객체 -> 업로드 청크 단위로만 bytes가 만들어짐
+    """
+    return ConcatReader(wav_header(len(pcm), sample_rate), pcm)
+
+
+def payload_size(payload) -> int:
+    """업로드 파일 객체 크기 (바이트, 읽기 위치는 처음으로)"""
+    size = payload.seek(0, io.SEEK_END)
+    payload.seek(0)
+    return size
+
+
+def encode_compressed(pcm, sample_rate: int, codec: str) -> Optional[io.BytesIO]:
+    """soundfile(libsndfile)로 FLAC/Opus 인코딩, 사용할 수 없으면 None"""
+    try:
+        import soundfile as sf
+    except ImportError:
+        return None
+    fmt, subtype = CODECS[codec][2]
+    buffer = io.BytesIO()
+    try:
+        sf.write(buffer, np.frombuffer(pcm, dtype=np.int16), sample_rate, format=fmt, subtype=subtype)
+    except (RuntimeError, TypeError, ValueError):
+        return None  # libsndfile 버전에 따라 Opus 미지원
+    buffer.seek(0)
+    return buffer
+
+
+def codec_available(codec: str) -> bool:
+    """해당 형식으로 인코딩할 수 있는지 (압축 형식은 soundfile 필요)"""
+    if codec == "wav":
+        return True
+    if codec not in CODECS:
+        return False
+    return encode_compressed(b"\0\0" * 160, 16000, codec) is not None
+
+
+def build_upload(pcm, sample_rate: int = 16000, codec: str = "wav") -> Tuple[str, io.IOBase, str]:
+    """
+    STT 업로드용 (파일명, 파일 객체, MIME) 튜플
+    압축 인코딩을 사용할 수 없으면 WAV로 대체
+    """
+    if codec not in CODECS:
+        raise ValueError(f"지원하지 않는 오디오 형식: {codec} (가능: {', '.join(CODECS)})")
+    if codec != "wav":
+        buffer = encode_compressed(pcm, sample_rate, codec)
+        if buffer is not None:
+            filename, mime, _ = CODECS[codec]
+            return filename, buffer, mime
+    filename, mime, _ = CODECS["wav"]
+    return filename, encode_wav(pcm, sample_rate), mime
+
+
+class STTMetrics:
+    """STT 호출별 지연시간/업로드 크기 기록"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies_s: list = []
+        self.payload_bytes = 0
+        self.pcm_bytes = 0
+        self.failures = 0
+
+    def record(self, latency_s: float, payload_bytes: int, pcm_bytes: int) -> None:
+        with self._lock:
+            self.latencies_s.append(latency_s)
+            self.payload_bytes += payload_bytes
+            self.pcm_bytes += pcm_bytes
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            calls = len(self.latencies_s)
+            latencies = np.array(self.latencies_s) * 1000 if calls else np.zeros(1)
+            return {
+                "calls": calls,
+                "failures": self.failures,
+                "p50_ms": float(np.percentile(latencies, 50)),
+                "p95_ms": float(np.percentile(latencies, 95)),
+                "avg_payload_kb": self.payload_bytes / calls / 1024 if calls else 0.0,
+                "compression": self.payload_bytes / self.pcm_bytes if self.pcm_bytes else 1.0,
+            }
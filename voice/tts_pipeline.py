@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, Optional
+
+import numpy as np
+
+from utils.tracing import get_tracer
+
+_END = object()
+
+
+class TTSPipeline:
+    """
+    문장 단위 TTS 파이프라인 (생산자/소비자)
+    - 생산자: speak()를 호출한 스레드가 문장을 받는 대로 합성 작업을 풀에 제출
+      (재생 중인 문장 뒤로 최대 prefetch개까지 미리 합성, 슬롯이 없으면 대기)
+    - 합성 작업: synthesize_fn(text)의 PCM 청크를 문장별 큐에 스트리밍
+    - 소비자: 재생 스레드가 문장 순서대로 청크를 꺼내 출력 스트림에 쓰고, 문장 사이에 gap_ms 무음 삽입
+    출력은 답변 전체를 한 발화(begin ~ end)로 재생하므로 문장 사이에 지터 버퍼가 다시 비지 않음
+    cancel(): 다른 스레드(끼어들기 감지)에서 호출하면 출력을 바로 멈추고, 남은 문장 합성과 문장 스트림(LLM)을 닫음
+    """
+
+    def __init__(self, synthesize_fn: Callable[[str], Iterable[bytes]], output, prefetch: int = 2,
+                 gap_ms: float = 120.0):
+        self.synthesize_fn = synthesize_fn
+        self.output = output
+        self.prefetch = prefetch
+        self.gap_ms = gap_ms
+        self._pool = ThreadPoolExecutor(max_workers=prefetch + 1, thread_name_prefix="tts")
+        self._cancel: Optional[threading.Event] = None  # 진행 중인 speak()의 취소 플래그
+
+    def _synthesize(self, text: str, chunks: queue.Queue, cancel: threading.Event) -> None:
+        stream = None
+        try:
+            if cancel.is_set():
+                return
+            stream = iter(self.synthesize_fn(text))
+            for chunk in stream:
+                if cancel.is_set():
+                    break
+                chunks.put(chunk)
+        except Exception as e:
+            if not cancel.is_set():
+                get_tracer().event("tts.synth_failed", f"[TTS 합성 실패] {text}: {e}", level="error", error=str(e))
+        finally:
+            # 취소 시 스트리밍 응답을 닫아 남은 오디오를 받지 않음 (부분 오디오는 캐시되지 않음)
+            close = getattr(stream, "close", None)
+            if close is not None:
+                close()
+            chunks.put(_END)
+
+    def _play(self, playback: queue.Queue, slots: threading.Semaphore, stats: dict,
+              cancel: threading.Event) -> None:
+        gap = np.zeros(int(self.output.sample_rate * self.gap_ms / 1000), dtype=np.int16).tobytes()
+        first = True
+        while True:
+            entry = playback.get()
+            if entry is _END:
+                break
+            text, chunks = entry
+            try:
+                if cancel.is_set():
+                    continue
+                if not first and gap:
+                    self.output.write(gap)
+                first = False
+                while not cancel.is_set():
+                    try:
+                        # 합성 응답을 기다리는 중에도 취소를 바로 확인
+                        chunk = chunks.get(timeout=0.05)
+                    except queue.Empty:
+                        continue
+                    if chunk is _END:
+                        stats["sentences"] += 1
+                        break
+                    self.output.write(chunk)
+                    stats["audio_bytes"] += len(chunk)
+            finally:
+                slots.release()
+
+    def speak(self, sentences: Iterable[str]) -> dict:
+        """
+        문장 스트림을 순서대로 재생하고 완료까지 대기
+        반환: 문장 수, 첫 오디오까지 시간(ttfa_s), 전체 소요 시간(wall_s), 오디오 길이(audio_s), 취소 여부(cancelled)
+        """
+        stats = {"sentences": 0, "audio_bytes": 0}
+        start = time.perf_counter()
+        playback: queue.Queue = queue.Queue()
+        slots = threading.Semaphore(self.prefetch + 1)
+        cancel = threading.Event()
+
+        self.output.begin()
+        self._cancel = cancel
+        player = threading.Thread(target=self._play, args=(playback, slots, stats, cancel), daemon=True)
+        player.start()
+        try:
+            for text in sentences:
+                slots.acquire()
+                if cancel.is_set():
+                    break
+                chunks: queue.Queue = queue.Queue()
+                self._pool.submit(self._synthesize, text, chunks, cancel)
+                playback.put((text, chunks))
+        finally:
+            if cancel.is_set():
+                # 아직 받지 않은 문장(LLM 스트림) 닫기
+                close = getattr(sentences, "close", None)
+                if close is not None:
+                    close()
+            playback.put(_END)
+            player.join()
+            self.output.end()
+
+        audio_s = stats["audio_bytes"] / 2 / self.output.sample_rate
+        gaps_s = max(0, stats["sentences"] - 1) * self.gap_ms / 1000
+        with get_tracer().span("playback.drain", timeout_s=audio_s + gaps_s + 2.0) as span:
+            span.set(drained=self.output.wait(timeout=audio_s + gaps_s + 2.0))
+        self._cancel = None
+        first_audio_at: Optional[float] = self.output.first_audio_at
+        return {
+            "sentences": stats["sentences"],
+            "ttfa_s": first_audio_at - start if first_audio_at is not None else None,
+            "wall_s": time.perf_counter() - start,
+            "audio_s": audio_s,
+            "cancelled": cancel.is_set(),
+        }
+
+    def cancel(self) -> bool:
+        """진행 중인 speak() 중단 (재생 중이 아니었으면 False)"""
+        cancel = self._cancel
+        if cancel is None or cancel.is_set():
+            return False
+        cancel.set()
+        self.output.stop()
+        return True
+
+    @property
+    def cancelled(self) -> bool:
+        """진행 중인 speak()가 취소되었는지 (문장 생성 쪽에서 확인용)"""
+        cancel = self._cancel
+        return cancel is not None and cancel.is_set()
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=False)
@@ -0,0 +1,436 @@
+from __future__ import annotations
+
+import queue
+import threading
+import time
+import wave
+from collections import deque
+from pathlib import Path
+from typing import Callable, Iterator, Optional, Tuple
+
+import numpy as np
+
+from .audio_ring import AudioRingBuffer
+
+
+class EnergyVAD:
+    """
+    webrtcvad가 없을 때 쓰는 에너지 기반 VAD (webrtcvad.Vad와 같은 is_speech 인터페이스)
+    프레임 RMS가 threshold_db(dBFS) 또는 배경 소음 + margin_db 보다 크면 음성으로 판단
+    """
+
+    def __init__(self, threshold_db: float = -45.0, margin_db: float = 12.0):
+        self.threshold_db = threshold_db
+        self.margin_db = margin_db
+        self.noise_db = -90.0
+
+    def is_speech(self, frame: bytes, sample_rate: int) -> bool:
+        samples = np.frombuffer(frame, dtype=np.int16).astype(np.float32)
+        rms = float(np.sqrt(np.mean(samples * samples))) if len(samples) else 0.0
+        level_db = 20 * np.log10(max(rms, 1.0) / 32768)
+        speech = level_db > max(self.threshold_db, self.noise_db + self.margin_db)
+        if not speech:
+            # 배경 소음 수준을 천천히 추적
+            self.noise_db = 0.95 * self.noise_db + 0.05 * level_db if self.noise_db > -90 else level_db
+        return speech
+
+
+def create_vad(aggressiveness: int = 2):
+    """webrtcvad가 설치되어 있으면 사용하고, 없으면 에너지 기반 VAD"""
+    try:
+        import webrtcvad
+        return webrtcvad.Vad(aggressiveness)
+    except ImportError:
+        print("webrtcvad가 설치되지 않아 에너지 기반 음성 감지를 사용합니다.")
+        return EnergyVAD()
+
+
+class Endpointer:
+    """
+    VAD 기반 발화 구간 검출
+    - 프리롤: 말 시작 직전 pre_roll_ms 오디오를 함께 포함 (첫 음절 잘림 방지)
+    - 시작: 최근 start_window_ms 중 start_ratio 이상이 음성이면 발화 시작
+    - 종료: 음성이 hangover_ms 동안 없으면 발화 끝 (말 사이 짧은 쉼은 유지)
+    - 최대 길이: max_utterance_s를 넘으면 강제로 끝냄
+    feed()에 프레임을 넣다가 발화가 끝나면 PCM 바이트를 반환
+    """
+
+    def __init__(self, sample_rate: int = 16000, frame_ms: int = 30, vad=None, pre_roll_ms: int = 300,
+                 start_window_ms: int = 150, start_ratio: float = 0.8, hangover_ms: int = 600,
+                 max_utterance_s: float = 15.0, min_speech_ms: int = 200):
+        self.sample_rate = sample_rate
+        self.frame_ms = frame_ms
+        self.frame_bytes = sample_rate * frame_ms // 1000 * 2
+        self.vad = vad if vad is not None else create_vad()
+        self.start_ratio = start_ratio
+        self.hangover_frames = max(1, hangover_ms // frame_ms)
+        self.max_frames = int(max_utterance_s * 1000 / frame_ms)
+        self.min_speech_frames = max(1, min_speech_ms // frame_ms)
+        self._pre_roll: deque = deque(maxlen=max(1, pre_roll_ms // frame_ms))
+        self._window: deque = deque(maxlen=max(1, start_window_ms // frame_ms))
+        self.reset()
+
+    def reset(self) -> None:
+        self._pre_roll.clear()
+        self._window.clear()
+        self._frames: list = []
+        self._speech_frames = 0
+        self._silent_run = 0
+        self.triggered = False
+        self.speech_start_at: Optional[float] = None
+        self.speech_end_at: Optional[float] = None
+        self.truncated = False
+        # reset() 이후 프레임 번호 기준 발화 구간 (시작은 프리롤 포함, 끝은 마지막 음성 프레임 다음)
+        self.frame_index = 0
+        self.start_frame = 0
+        self.end_frame = 0
+
+    def feed(self, frame: bytes) -> Optional[bytes]:
+        """30ms 프레임 하나 처리 -> 발화가 끝나면 발화 PCM, 아니면 None"""
+        is_speech = self.vad.is_speech(frame, self.sample_rate)
+        self.frame_index += 1
+
+        if not self.triggered:
+            self._pre_roll.append(frame)
+            self._window.append(is_speech)
+            if len(self._window) == self._window.maxlen and sum(self._window) >= self.start_ratio * len(self._window):
+                self.triggered = True
+                self.speech_start_at = time.perf_counter()
+                self.start_frame = self.frame_index - len(self._pre_roll)
+                self._frames = list(self._pre_roll)
+                self._speech_frames = sum(self._window)
+                self._silent_run = 0
+            return None
+
+        self._frames.append(frame)
+        if is_speech:
+            self._speech_frames += 1
+            self._silent_run = 0
+        else:
+            self._silent_run += 1
+
+        if self._silent_run >= self.hangover_frames or len(self._frames) >= self.max_frames:
+            self.truncated = len(self._frames) >= self.max_frames
+            return self._finish()
+        return None
+
+    def _finish(self) -> Optional[bytes]:
+        frames, speech_frames = self._frames, self._speech_frames
+        self.triggered = False
+        self.speech_end_at = time.perf_counter()
+        self.end_frame = self.frame_index - self._silent_run
+        self._frames = []
+        self._pre_roll.clear()
+        self._window.clear()
+        if speech_frames < self.min_speech_frames:
+            return None  # 짧은 잡음은 무시
+        # 끝의 hangover 무음은 STT에 보낼 필요 없음 (약간의 꼬리만 남김)
+        keep = len(frames) - max(0, self._silent_run - 3)
+        self._silent_run = 0
+        return b"".join(frames[:keep])
+
+    def buffered_audio(self) -> bytes:
+        """진행 중인 발화에서 지금까지 모은 오디오 (프리롤 포함, 말 시작 직후 스트리밍 STT 전송용)"""
+        return b"".join(self._frames)
+
+    def flush(self) -> Optional[bytes]:
+        """입력이 끝났을 때 진행 중인 발화 반환"""
+        if not self.triggered:
+            return None
+        return self._finish()
+
+    def utterances(self, frames) -> Iterator[bytes]:
+        """프레임 스트림 -> 발화 스트림"""
+        for frame in frames:
+            utterance = self.feed(frame)
+            if utterance:
+                yield utterance
+        utterance = self.flush()
+        if utterance:
+            yield utterance
+
+
+class MicrophoneFrameSource:
+    """
+    sounddevice 마이크 입력을 고정 길이 프레임으로 전달
+    콜백은 indata를 미리 할당한 링 버퍼에 복사만 하고, 프레임 분할/VAD는 읽는 쪽 스레드에서 처리
+    echo_canceller를 주면 읽는 프레임마다 재생 중인 TTS 에코를 제거 (전이중 모드)
+    """
+
+    realtime = True
+    exhausted = False
+
+    def __init__(self, sample_rate: int = 16000, frame_ms: int = 30, buffer_s: float = 10.0,
+                 echo_canceller=None):
+        self.sample_rate = sample_rate
+        self.frame_ms = frame_ms
+        self.frame_samples = sample_rate * frame_ms // 1000
+        self.ring = AudioRingBuffer(buffer_s, sample_rate)
+        self.echo_canceller = echo_canceller
+        self.input_overflows = 0
+        self._stream = None
+
+    def _callback(self, indata, frames, time_info, status) -> None:
+        if status.input_overflow:
+            self.input_overflows += 1
+        self.ring.write(indata[:, 0])
+
+    def __enter__(self):
+        import sounddevice as sd
+        self._stream = sd.InputStream(callback=self._callback, channels=1, samplerate=self.sample_rate,
+                                      dtype='int16', blocksize=self.frame_samples)
+        self._stream.start()
+        return self
+
+    def __exit__(self, *exc):
+        if self._stream is not None:
+            self._stream.stop()
+            self._stream.close()
+            self._stream = None
+
+    def read(self, timeout: Optional[float] = None) -> Optional[bytes]:
+        samples = self.ring.read(self.frame_samples, timeout)
+        if samples is None:
+            return None
+        if self.echo_canceller is not None:
+            return self.echo_canceller.process(samples.tobytes())
+        return samples.tobytes()
+
+    def clear(self) -> None:
+        self.ring.clear()
+        if self.echo_canceller is not None:
+            self.echo_canceller.clear()
+
+    def stats(self) -> dict:
+        stats = {
+            "input_overflows": self.input_overflows,
+            "overruns": self.ring.overruns,
+            "dropped_samples": self.ring.dropped_samples,
+        }
+        if self.echo_canceller is not None:
+            stats["echo"] = self.echo_canceller.stats()
+        return stats
+
+
+class WavFileFrameSource:
+    """
+    WAV 파일을 마이크처럼 프레임 단위로 전달 (테스트/벤치마크용)
+    16-bit PCM만 지원하며 다채널이면 첫 채널 사용, realtime=True면 실제 시간 속도로 전달
+    """
+
+    def __init__(self, path, sample_rate: int = 16000, frame_ms: int = 30, realtime: bool = False):
+        self.path = Path(path)
+        self.sample_rate = sample_rate
+        self.frame_ms = frame_ms
+        self.realtime = realtime
+        with wave.open(str(self.path), 'rb') as wav_file:
+            if wav_file.getsampwidth() != 2:
+                raise ValueError(f"16-bit WAV만 지원합니다: {self.path}")
+            if wav_file.getframerate() != sample_rate:
+                raise ValueError(f"샘플레이트가 {sample_rate}Hz가 아닙니다: {self.path} ({wav_file.getframerate()}Hz)")
+            channels = wav_file.getnchannels()
+            samples = np.frombuffer(wav_file.readframes(wav_file.getnframes()), dtype=np.int16)
+        self.samples = samples[::channels] if channels > 1 else samples
+        self._frame_samples = sample_rate * frame_ms // 1000
+        self._offset = 0
+        self._started_at: Optional[float] = None
+
+    def __enter__(self):
+        # 여러 턴에 걸쳐 같은 파일을 이어서 읽음 (처음부터 다시 읽지 않음)
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    @property
+    def exhausted(self) -> bool:
+        return self._offset + self._frame_samples > len(self.samples)
+
+    @property
+    def position_s(self) -> float:
+        """지금까지 전달한 오디오 길이 (초)"""
+        return self._offset / self.sample_rate
+
+    def read(self, timeout: Optional[float] = None) -> Optional[bytes]:
+        end = self._offset + self._frame_samples
+        if end > len(self.samples):
+            return None
+        if self.realtime:
+            if self._started_at is None:
+                self._started_at = time.perf_counter() - self._offset / self.sample_rate
+            due = self._started_at + end / self.sample_rate
+            time.sleep(max(0.0, due - time.perf_counter()))
+        frame = self.samples[self._offset:end].tobytes()
+        self._offset = end
+        return frame
+
+    def clear(self) -> None:
+        pass
+
+    def stats(self) -> dict:
+        return {"position_s": self.position_s}
+
+    def frames(self) -> Iterator[bytes]:
+        while True:
+            frame = self.read()
+            if frame is None:
+                return
+            yield frame
+
+
+def capture_utterance(source, endpointer: Endpointer, timeout: Optional[float] = None,
+                      should_stop: Optional[Callable[[], bool]] = None) -> Optional[bytes]:
+    """
+    소스에서 발화 하나를 캡처 (발화가 끝나는 즉시 반환)
+    timeout 동안 말이 시작되지 않거나 should_stop()이 참이면 None, 소스가 끝나면 진행 중이던 발화
+    """
+    endpointer.reset()
+    deadline = time.perf_counter() + timeout if timeout else None
+    while True:
+        if should_stop is not None and not endpointer.triggered and should_stop():
+            return None
+        frame = source.read(timeout=0.5)
+        if frame is None:
+            if source.exhausted:
+                return endpointer.flush()
+        else:
+            utterance = endpointer.feed(frame)
+            if utterance:
+                return utterance
+        if deadline is not None and not endpointer.triggered and time.perf_counter() > deadline:
+            return None
+
+
+class UtteranceListener:
+    """
+    프레임 소스 -> Endpointer -> 발화 큐 (백그라운드 스레드에서 상시 분할)
+    - pause(): TTS 재생/비프음 중에는 입력을 버림 (파일 소스는 읽기를 멈춤)
+    - resume(): 쌓인 오디오와 진행 중이던 발화를 버리고 새로 듣기 시작 (파일 소스는 이어서 읽음)
+    - 발화 큐가 가득 차면(소비가 늦으면) 가장 새 발화를 버리고 dropped_utterances 증가
+    - on_speech_start: 말이 시작되는 순간(발화 끝이 아니라) 리스너 스레드에서 observer보다 먼저 호출 (끼어들기 감지)
+    - observer: 말하는 동안의 오디오를 받는 객체 (스트리밍 STT)
+      speech_started(프리롤 포함 오디오) -> speech_frame(frame)... -> speech_ended(발화 PCM 또는 None, 말 끝 시각)
+      speech_ended()는 발화가 큐에 들어가기 전에 호출 (버린 발화/리셋이면 None)
+    """
+
+    def __init__(self, source, endpointer: Endpointer, max_pending: int = 4,
+                 on_speech_start: Optional[Callable[[], None]] = None, observer=None):
+        self.source = source
+        self.endpointer = endpointer
+        self.on_speech_start = on_speech_start
+        self.observer = observer
+        self._utterances: queue.Queue = queue.Queue(maxsize=max_pending)
+        self._paused = threading.Event()
+        self._resumed = threading.Event()
+        self._stop = threading.Event()
+        self._reset_pending = False
+        self._thread: Optional[threading.Thread] = None
+        self.finished = False
+        self.utterance_count = 0
+        self.dropped_utterances = 0
+        self.discarded_frames = 0
+
+    def start(self) -> "UtteranceListener":
+        if self._thread is None:
+            self.source.__enter__()
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._resumed.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+        self.source.__exit__(None, None, None)
+
+    def pause(self) -> None:
+        self._resumed.clear()
+        self._paused.set()
+
+    def resume(self) -> None:
+        if self.source.realtime:
+            self.source.clear()
+            while not self._utterances.empty():
+                self._utterances.get_nowait()
+            self._reset_pending = True
+        self._paused.clear()
+        self._resumed.set()
+
+    def get(self, timeout: Optional[float] = None) -> Optional[Tuple[bytes, float]]:
+        """다음 발화 (PCM, 말 끝 감지 시각), timeout 동안 없으면 None"""
+        try:
+            return self._utterances.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    @property
+    def pending(self) -> bool:
+        """말하는 중이거나 아직 가져가지 않은 발화가 있음"""
+        return self.endpointer.triggered or not self._utterances.empty()
+
+    @property
+    def exhausted(self) -> bool:
+        """파일 소스를 끝까지 읽었고 남은 발화도 없음"""
+        return self.finished and self._utterances.empty()
+
+    def stats(self) -> dict:
+        return {
+            "utterances": self.utterance_count,
+            "dropped_utterances": self.dropped_utterances,
+            "discarded_frames": self.discarded_frames,
+            **self.source.stats(),
+        }
+
+    def _emit(self, utterance: Optional[bytes]) -> None:
+        if not utterance:
+            return
+        self.utterance_count += 1
+        item = (utterance, self.endpointer.speech_end_at)
+        if not self.source.realtime:
+            self._utterances.put(item)
+            return
+        try:
+            self._utterances.put_nowait(item)
+        except queue.Full:
+            self.dropped_utterances += 1
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            if self._paused.is_set():
+                if self.source.realtime:
+                    if self.source.read(timeout=0.1) is not None:
+                        self.discarded_frames += 1
+                else:
+                    self._resumed.wait(0.1)
+                continue
+            if self._reset_pending:
+                self._reset_pending = False
+                if self.endpointer.triggered and self.observer is not None:
+                    self.observer.speech_ended(None, None)
+                self.endpointer.reset()
+
+            frame = self.source.read(timeout=0.1)
+            triggered = self.endpointer.triggered
+            if frame is None:
+                if self.source.exhausted:
+                    utterance = self.endpointer.flush()
+                    if triggered and self.observer is not None:
+                        self.observer.speech_ended(utterance, self.endpointer.speech_end_at)
+                    self._emit(utterance)
+                    self.finished = True
+                    return
+                continue
+            utterance = self.endpointer.feed(frame)
+            if not triggered and self.endpointer.triggered:
+                # 끼어들기가 먼저 (observer 처리 시간만큼 TTS 정지가 늦어지지 않도록)
+                if self.on_speech_start is not None:
+                    self.on_speech_start()
+                if self.observer is not None:
+                    self.observer.speech_started(self.endpointer.buffered_audio())
+            elif triggered and self.observer is not None:
+                self.observer.speech_frame(frame)
+                if not self.endpointer.triggered:
+                    self.observer.speech_ended(utterance, self.endpointer.speech_end_at)
+            self._emit(utterance)
@@ -6,18 +6,45 @@ import time
 import threading
 import queue
 import json
+import hashlib
 # import io
-import wave
 # import asyncio
 import select
 from typing import Optional, Generator, AsyncGenerator
-from collections import deque
 
 from dotenv import load_dotenv
 from pathlib import Path
 
+from utils.tracing import get_tracer, start_metrics_server
+
+from .audio_output import AudioOutput
+from .dialogue_state import DialogueState
+from .echo_canceller import EchoCanceller
+from .fast_path import FastPathResponder
+from .menu_index import MenuIndex
+from .menu_prompt import (
+    build_menu_context,
+    build_retrieved_menu_message,
+    build_scoped_system_prompt,
+    build_system_prompt,
+    count_tokens,
+)
+from .response_cache import AnswerCache, AudioCache
+from .sentence_segmenter import SentenceSegmenter
+from .speculation import SpeculationController
+from .streaming_stt import StreamingTranscriber
+from .stt_upload import STTMetrics, build_upload, codec_available, payload_size
+from .tts_pipeline import TTSPipeline
+from .vad_capture import Endpointer, MicrophoneFrameSource, UtteranceListener, WavFileFrameSource
+
 load_dotenv("../.env")
 
+# LLM 토큰 속도 히스토그램 구간 (tokens/s)
+LLM_RATE_BUCKETS = (5, 10, 20, 40, 60, 80, 120, 160, 240)
+
+# 부팅 시 미리 합성해 두는 고정 문구 (인사말은 메뉴에 따라 달라져 run()에서 생성)
+FIXED_PHRASES = ("대화를 종료합니다.",)
+
 # openai 설치 확인 
 def _has_openai() -> bool:
     try:
@@ -27,13 +54,56 @@ def _has_openai() -> bool:
         return False
 
 class VoiceChat:
-    def __init__(self):
+    def __init__(self, retrieval_top_k: int = 8, tts_prefetch: int = 2, sentence_gap_ms: float = 120.0,
+                 input_wav: Optional[str] = None, stt_codec: Optional[str] = None,
+                 full_duplex: Optional[bool] = None, stt_stream: Optional[str] = None,
+                 history_budget: int = 300, headless: bool = False):
         self.base = Path(__file__).resolve().parent.parent # faceapi 디렉터리
-        self.tmp_dir = self.base / "/_tmp" # 오디오 파일 저장 경로
+        self.tmp_dir = self.base / "_tmp" # 오디오 파일 저장 경로
         self.tmp_dir.mkdir(parents=True, exist_ok=True)
         
-        # 메뉴 데이터 로드
+        # 구간 추적 (녹음/STT/LLM/TTS/재생 span + 구조화 이벤트, TRACE_JSONL로 JSONL 내보내기)
+        # 키오스크(headless가 아님)는 TRACE_METRICS_PORT가 있으면 GET /metrics 로 Prometheus 지표 제공
+        self.tracer = get_tracer()
+        self.metrics_server = None
+        metrics_port = os.getenv("TRACE_METRICS_PORT")
+        if metrics_port and not headless:
+            self.metrics_server = start_metrics_server(int(metrics_port), tracer=self.tracer)
+            self.tracer.event("metrics.start", f"[지표] http://0.0.0.0:{metrics_port}/metrics", port=int(metrics_port))
+        
+        # 메뉴 데이터 로드 및 파생 캐시 (시스템 프롬프트, 검색 인덱스)
+        # retrieval_top_k > 0 이면 질문과 관련된 메뉴 k개만 프롬프트에 포함 (0이면 전체 메뉴)
+        # 서버에서는 여러 /chat 요청 스레드가 같은 인스턴스를 쓰므로 핫 리로드는 잠금 안에서 한 번만 수행
+        self.retrieval_top_k = retrieval_top_k
+        self._menu_lock = threading.Lock()
+        self.menu_path = self.base / "menu.json"
         self.menu_data = self._load_menu_data()
+        self._rebuild_menu_caches()
+        
+        # 응답 캐시: (메뉴 버전, 정규화된 발화) -> LLM 답변, (문장, 음성, 속도) -> TTS PCM
+        self.tts_model = "gpt-4o-mini-tts"
+        self.tts_voice = "nova"
+        self.tts_speed = 1.0
+        self.answer_cache = AnswerCache()
+        self.audio_cache = AudioCache(self.base / "_cache" / "tts")
+        
+        # 전이중 모드(full_duplex 또는 VOICE_FULL_DUPLEX=1): TTS 재생 중에도 마이크를 열어 두고,
+        # 재생 참조 신호로 스피커 에코를 제거한 뒤 사용자 말이 감지되면 재생/합성/LLM을 즉시 중단 (끼어들기)
+        # WAV 파일 입력은 에코가 없고 실시간이 아니므로 항상 반이중
+        input_wav = input_wav or os.getenv("VOICE_INPUT_WAV")
+        if full_duplex is None:
+            full_duplex = os.getenv("VOICE_FULL_DUPLEX", "0") == "1"
+        self.full_duplex = full_duplex and not input_wav
+        self.echo_canceller = EchoCanceller(sample_rate=16000, reference_rate=24000) if self.full_duplex else None
+        self.barge_ins = 0
+        
+        # TTS 재생: 상시 열린 출력 스트림 + 지터 버퍼 + 스트리밍 리미터
+        # 문장 N 재생 중 다음 문장을 미리 합성 (최대 tts_prefetch개, 문장 사이 sentence_gap_ms 무음)
+        self.audio_output = AudioOutput(sample_rate=24000, reference_sink=(
+            self.echo_canceller.push_reference if self.echo_canceller else None))
+        self.tts_pipeline = TTSPipeline(self._iter_tts_chunks, self.audio_output,
+                                        prefetch=tts_prefetch, gap_ms=sentence_gap_ms)
+        self.tts_stats = {"utterances": 0, "ttfa_s": 0.0}
         
         # 실시간 오디오 스트림 관련
         self.audio_queue = queue.Queue() # thread -> STT
@@ -42,12 +112,43 @@ class VoiceChat:
         self.is_playing = False
         self.is_processing = False
         
-        # 버퍼링을 위한 큐 -> 최신 n개의 데이터 유지해서 맥락 구성에 활용 
-        self.text_buffer = deque(maxlen=10)
-        self.audio_buffer = deque(maxlen=5)
+        # 대화 상태: 장바구니/최근 언급 메뉴/손님 제약 + 토큰 예산(history_budget) 안의 최근 턴
+        # 예산을 넘은 턴은 요지만 요약에 남겨 턴이 늘어도 프롬프트 크기가 일정
+        self.dialogue = DialogueState(self.menu_index, history_budget=history_budget)
+        self._last_response_text = ""
+        
+        # 음성 입력: 마이크 -> 링 버퍼(10초) -> VAD 발화 분할 (프리롤 300ms, 말 끝 600ms 무음, 최대 15초)
+        # input_wav(또는 VOICE_INPUT_WAV)를 주면 마이크 대신 WAV 파일을 턴마다 이어서 읽음
+        self.endpointer = Endpointer(sample_rate=16000, frame_ms=30)
+        self.input_wav_source = WavFileFrameSource(input_wav) if input_wav else None
+        self.listener: Optional[UtteranceListener] = None # 첫 음성 입력 때 시작
+        
+        # STT 업로드 형식 (wav/flac/opus, 압축은 soundfile 설치 시) 및 호출별 지연/크기 기록
+        self.stt_codec = stt_codec or os.getenv("STT_AUDIO_CODEC", "flac")
+        if not codec_available(self.stt_codec):
+            self.tracer.event("stt.codec_unavailable", f"[STT] {self.stt_codec} 인코딩을 사용할 수 없어 WAV로 업로드합니다. "
+                              "(pip install soundfile)", level="warning", codec=self.stt_codec)
+            self.stt_codec = "wav"
+        self.stt_metrics = STTMetrics()
+        
+        # 스트리밍 STT (stt_stream 또는 STT_STREAM_ADDR="host:port"): 말하는 동안 오디오를 120ms 단위로 전송하고
+        # 중간 결과가 250ms 동안 그대로면 LLM 요청을 미리 시작 (최종 결과가 다르면 취소 후 다시 요청)
+        # 연결할 수 없는 발화는 기존 일괄 업로드로 처리
+        stt_stream = stt_stream or os.getenv("STT_STREAM_ADDR")
+        self.speculation = SpeculationController(lambda text: self._stream_llm_response(text, self.dialogue),
+                                                 should_speculate=self._can_speculate)
+        self.transcriber: Optional[StreamingTranscriber] = None
+        if stt_stream:
+            host, _, port = stt_stream.rpartition(":")
+            self.transcriber = StreamingTranscriber((host or "127.0.0.1", int(port)),
+                                                    on_partial=self.speculation.on_partial)
+        self._speech_end_at: Optional[float] = None # 이번 턴 말 끝 감지 시각 (키보드 입력이면 None)
+        self.turn_latencies: list = [] # 말 끝 -> 첫 오디오 (초)
         
-        # 오디오 시스템 초기화
-        self._init_audio_system()
+        # 오디오 시스템 초기화 (headless: 추론 서버처럼 스피커/마이크가 없는 프로세스는 건너뜀)
+        self.headless = headless
+        if not headless:
+            self._init_audio_system()
         
         # OpenAI 클라이언트
         if _has_openai() and os.getenv("OPENAI_API_KEY"):
@@ -55,101 +156,166 @@ class VoiceChat:
             self.client = OpenAI()
         else:
             self.client = None
-            print("OpenAI API 키가 설정되지 않았습니다.")
+            self.tracer.event("openai.unavailable", "OpenAI API 키가 설정되지 않았습니다.", level="warning")
+        
+        # 인사말/종료 문구는 부팅 시 미리 합성 (디스크 캐시에 있으면 건너뜀, headless는 재생하지 않으므로 생략)
+        if not headless:
+            self._prerender_phrases((self._greeting_text(),) + FIXED_PHRASES)
+    
+    def _greeting_text(self) -> str:
+        """초기 인사말 (메뉴 정보 기반)"""
+        menu_count = len(self.menu_data.get('items', [])) if self.menu_data else 0
+        return f"안녕하세요! 저는 {self.menu_data.get('store', '키오스크')}의 AI 어시스턴트입니다. {menu_count}개의 메뉴를 준비했어요. 메뉴 추천이나 주문을 도와드릴까요?"
+    
+    def _prerender_phrases(self, phrases) -> None:
+        """고정 문구 TTS를 미리 합성해 캐시에 저장"""
+        if not self.client:
+            return
+        t0 = time.perf_counter()
+        rendered = 0
+        for phrase in phrases:
+            key = AudioCache.key(phrase, self.tts_voice, self.tts_speed, self.tts_model)
+            if self.audio_cache.get(key) is None and self._create_tts_stream(phrase):
+                rendered += 1
+        elapsed = time.perf_counter() - t0
+        self.tracer.event("tts.prerender", f"[TTS 캐시] 고정 문구 {len(phrases)}개 준비 완료 "
+                          f"(새로 합성 {rendered}개, {elapsed:.2f}초)",
+                          phrases=len(phrases), rendered=rendered, elapsed_s=elapsed)
     
     def _load_menu_data(self) -> dict:
         """메뉴 데이터 로드"""
         try:
-            menu_path = self.base / "menu.json"
+            menu_path = self.menu_path
             if menu_path.exists():
                 with open(menu_path, 'r', encoding='utf-8') as f:
                     menu_data = json.load(f)
-                print(f"[메뉴 데이터] {len(menu_data.get('items', []))}개 메뉴 항목 로드 완료")
+                items = len(menu_data.get('items', []))
+                self.tracer.event("menu.loaded", f"[메뉴 데이터] {items}개 메뉴 항목 로드 완료", items=items)
                 return menu_data
             else:
-                print(f"[메뉴 데이터] menu.json 파일을 찾을 수 없습니다: {menu_path}")
+                self.tracer.event("menu.missing", f"[메뉴 데이터] menu.json 파일을 찾을 수 없습니다: {menu_path}",
+                                  level="warning", path=str(menu_path))
                 return {}
         except Exception as e:
-            print(f"[메뉴 데이터 로드 실패] {e}")
+            self.tracer.event("menu.load_failed", f"[메뉴 데이터 로드 실패] {e}", level="error", error=str(e))
             return {}
     
+    def _menu_signature(self) -> Optional[tuple]:
+        """menu.json 변경 감지용 (mtime, size)"""
+        try:
+            stat = self.menu_path.stat()
+            return (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            return None
+    
+    def _refresh_menu_if_changed(self) -> None:
+        """menu.json이 바뀐 경우에만 메뉴와 파생 캐시를 다시 생성 (핫 리로드)"""
+        signature = self._menu_signature()
+        if signature == self._menu_stat:
+            return
+        with self._menu_lock:
+            # 잠금을 기다리는 동안 다른 요청이 이미 다시 만들었으면 건너뜀
+            if signature == self._menu_stat:
+                return
+            try:
+                digest = hashlib.sha256(self.menu_path.read_bytes()).hexdigest()
+            except OSError:
+                digest = ""
+            if digest == self.menu_version:
+                self._menu_stat = signature
+                return
+            self.menu_data = self._load_menu_data()
+            self._rebuild_menu_caches()
+    
+    def _rebuild_menu_caches(self) -> None:
+        """
+        메뉴에서 파생되는 캐시를 한 번 생성
+        - 시스템 프롬프트 (턴마다 같은 바이트열 -> 프롬프트 캐싱 적용)
+        - 메뉴 검색 인덱스 (빠른 응답기도 같은 인덱스 사용)
+        모두 지역 변수로 만든 뒤 한꺼번에 교체 (진행 중인 요청이 반쯤 바뀐 상태를 보는 구간을 최소화)
+        """
+        try:
+            menu_version = hashlib.sha256(self.menu_path.read_bytes()).hexdigest()
+        except OSError:
+            menu_version = ""
+        menu_stat = self._menu_signature()
+        system_prompt = build_system_prompt(self.menu_data)
+        scoped_system_prompt = build_scoped_system_prompt(self.menu_data)
+        menu_index = MenuIndex(self.menu_data)
+        
+        self.menu_index = menu_index
+        self._system_prompt = system_prompt
+        self._scoped_system_prompt = scoped_system_prompt
+        self.menu_version = menu_version
+        self._menu_stat = menu_stat
+        if getattr(self, "fast_path", None) is None:
+            self.fast_path = FastPathResponder(self.menu_index)
+        else:
+            self.fast_path.menu_index = self.menu_index
+        if getattr(self, "dialogue", None) is not None:
+            self.dialogue.menu_index = self.menu_index
+    
+    def _get_system_prompt(self) -> str:
+        """캐시된 시스템 프롬프트 반환"""
+        self._refresh_menu_if_changed()
+        return self._system_prompt
+    
+    def _build_messages(self, user_text: str, dialogue: Optional[DialogueState] = None) -> list:
+        """
+        LLM 요청 메시지 구성
+        검색 모드: 고정 시스템 프롬프트 + 질문 관련 메뉴 top-k 메시지 + 사용자 발화
+        전체 모드: 전체 메뉴 시스템 프롬프트 + 사용자 발화
+        dialogue가 있으면 대화 상태 요약과 최근 턴을 사용자 발화 앞에 넣고,
+        "그거"처럼 이전 대화를 가리키면 최근 언급된 메뉴도 메뉴 목록에 포함
+        시스템 프롬프트는 항상 첫 메시지 (프롬프트 캐싱 접두사 유지)
+        """
+        self._refresh_menu_if_changed()
+        context = dialogue.context_messages() if dialogue is not None else []
+        user = [{"role": "user", "content": user_text}]
+        if self.retrieval_top_k <= 0 or not self.menu_data:
+            return [{"role": "system", "content": self._system_prompt}] + context + user
+        items = self.menu_index.retrieve(user_text, self.retrieval_top_k)
+        if dialogue is not None and dialogue.references_context(user_text):
+            names = {item.get('name') for item in items}
+            items = items + [item for item in dialogue.focus_items() if item.get('name') not in names]
+        return [
+            {"role": "system", "content": self._scoped_system_prompt},
+            {"role": "system", "content": build_retrieved_menu_message(items, len(self.menu_index))},
+        ] + context + user
+    
     def _get_menu_context(self) -> str:
         """메뉴 데이터를 LLM 컨텍스트로 변환"""
-        if not self.menu_data:
-            return ""
-        
         try:
-            context_parts = []
-            
-            # 매장 정보
-            store_name = self.menu_data.get('store', '키오스크')
-            context_parts.append(f"매장명: {store_name}")
-            
-            # 메뉴 카테고리별 정리
-            items = self.menu_data.get('items', [])
-            categories = {}
-            
-            for item in items:
-                category = item.get('category', '기타')
-                if category not in categories:
-                    categories[category] = []
-                
-                # 메뉴 정보 요약
-                menu_info = f"- {item.get('name', '')} ({item.get('price', 0):,}원)"
-                
-                # 알레르기 정보 추가
-                allergens = item.get('allergens', [])
-                if allergens:
-                    menu_info += f" [알레르기: {', '.join(allergens)}]"
-                
-                # 영양 정보 추가
-                nutrition = item.get('nutrition', {})
-                if nutrition.get('calorie_kcal'):
-                    menu_info += f" [칼로리: {nutrition['calorie_kcal']}kcal]"
-                
-                categories[category].append(menu_info)
-            
-            # 카테고리별 메뉴 정보 추가
-            for category, menu_list in categories.items():
-                context_parts.append(f"\n{category}:")
-                context_parts.extend(menu_list)
-            
-            # 알레르기 정보
-            allergen_vocab = self.menu_data.get('allergen_vocab', [])
-            if allergen_vocab:
-                context_parts.append(f"\n알레르기 정보: {', '.join(allergen_vocab)}")
-            
-            return "\n".join(context_parts)
-            
+            return build_menu_context(self.menu_data)
         except Exception as e:
-            print(f"[메뉴 컨텍스트 생성 실패] {e}")
+            self.tracer.event("menu.context_failed", f"[메뉴 컨텍스트 생성 실패] {e}", level="error", error=str(e))
             return ""
     
+    def prompt_stats(self) -> dict:
+        """시스템 프롬프트 크기 리포트 (메뉴 수, 문자 수, 바이트 수, 토큰 수)"""
+        prompt = self._get_system_prompt()
+        return {
+            "menu_items": len(self.menu_data.get('items', [])) if self.menu_data else 0,
+            "chars": len(prompt),
+            "bytes": len(prompt.encode("utf-8")),
+            "tokens": count_tokens(prompt),
+            "menu_version": self.menu_version[:12],
+        }
+    
     def _search_menu_items(self, query: str) -> list:
-        """메뉴 검색 기능"""
+        """
+        메뉴 검색 기능 (인덱스 기반)
+        이름/카테고리/메모 자모 n-gram 매칭 + 알레르기/식단/가격 조건 (예: "새우 없는 비건 1만원 이하")
+        """
         if not self.menu_data:
             return []
         
         try:
-            items = self.menu_data.get('items', [])
-            results = []
-            query_lower = query.lower()
-            
-            for item in items:
-                name = item.get('name', '').lower()
-                category = item.get('category', '').lower()
-                notes = item.get('notes', '').lower()
-                
-                # 이름, 카테고리, 메모에서 검색
-                if (query_lower in name or 
-                    query_lower in category or 
-                    query_lower in notes):
-                    results.append(item)
-            
-            return results
+            self._refresh_menu_if_changed()
+            return self.menu_index.search(query)
             
         except Exception as e:
-            print(f"[메뉴 검색 실패] {e}")
+            self.tracer.event("menu.search_failed", f"[메뉴 검색 실패] {e}", level="error", error=str(e))
             return []
     
     def _init_audio_system(self):
@@ -160,97 +326,103 @@ class VoiceChat:
             
             # 현재 PC에서의 모든 오디오 장치 정보 확인
             devices = sd.query_devices()
-            print(f"[오디오 시스템] 사용 가능한 장치: {len(devices)}개")
+            self.tracer.event("audio.devices", f"[오디오 시스템] 사용 가능한 장치: {len(devices)}개", count=len(devices))
             
             # 기본 출력/재생 장치 설정
             default_output = sd.query_devices(kind='output')
-            print(f"[오디오 시스템] 기본 출력: {default_output['name']}")
+            self.tracer.event("audio.output", f"[오디오 시스템] 기본 출력: {default_output['name']}",
+                              device=default_output['name'])
             
             # 오디오 시스템 테스트 (무음 재생)
             # test_audio = np.zeros(1000, dtype=np.int16)
             # sd.play(test_audio, samplerate=24000)
             # sd.wait()
             
-            print("[오디오 시스템] 초기화 완료")
+            self.tracer.event("audio.ready", "[오디오 시스템] 초기화 완료")
             
         except Exception as e:
-            print(f"[오디오 시스템 초기화 실패] {e}")
+            self.tracer.event("audio.init_failed", f"[오디오 시스템 초기화 실패] {e}", level="error", error=str(e))
     
-    def _create_tts_stream(self, text: str) -> bytes:
+    def _iter_tts_chunks(self, text: str, chunk_size: int = 4800) -> Generator[bytes, None, None]:
         """
-        TTS 스트림 생성 (PCM 형식)
+        TTS 스트리밍 (PCM 24kHz, 16-bit, mono)
         PCM(Pulse-code Modulation): 디지털 오디오 데이터 형식 
+        전체 응답을 기다리지 않고 도착한 청크(기본 100ms 분량)를 바로 내보냄
+        캐시에 있으면 캐시된 오디오를 한 번에 내보냄
         """
         if not self.client:
-            return b""
+            return
+        
+        # 문장별 합성 구간 (TTS 작업 스레드에서 실행 -> 현재 턴에 연결, 첫 청크까지 시간 기록)
+        span = self.tracer.span("tts.synth", chars=len(text))
+        
+        # 같은 문장/음성/속도로 합성한 적이 있으면 캐시에서 바로 반환 (디스크는 mmap)
+        cache_key = AudioCache.key(text, self.tts_voice, self.tts_speed, self.tts_model)
+        cached = self.audio_cache.get(cache_key)
+        if cached is not None:
+            self.tracer.event("tts.cache_hit", f"[TTS 캐시] {text} ({len(cached)} bytes)", level="debug",
+                              bytes=len(cached))
+            span.end(cache=True, bytes=len(cached))
+            yield cached
+            return
             
         try:
-            print(f"[TTS 요청] 텍스트: {text}")
+            self.tracer.event("tts.request", f"[TTS 요청] 텍스트: {text}", level="debug")
             
-            response = self.client.audio.speech.create(
-                model="gpt-4o-mini-tts", # tts 모델 설정 
-                voice="nova", # 음성 -> 나긋하고 친절한 목소리 
+            chunks = []
+            with self.client.audio.speech.with_streaming_response.create(
+                model=self.tts_model, # tts 모델 설정 
+                voice=self.tts_voice, # 음성 -> 나긋하고 친절한 목소리 
                 input=text,
                 response_format="pcm",  # PCM 형식으로 스트리밍
-                speed=1.0
-            )
+                speed=self.tts_speed
+            ) as response:
+                for chunk in response.iter_bytes(chunk_size=chunk_size):
+                    if chunk:
+                        if not chunks:
+                            span.set(first_chunk_ms=span.elapsed() * 1000)
+                        chunks.append(chunk)
+                        yield chunk
             
             # 응답 데이터 검증
-            if response.content and len(response.content) > 0:
-                print(f"[TTS 응답] 데이터 크기: {len(response.content)} bytes")
-                return response.content
+            audio = b"".join(chunks)
+            if audio:
+                self.tracer.event("tts.response", f"[TTS 응답] 데이터 크기: {len(audio)} bytes", level="debug",
+                                  bytes=len(audio))
+                self.audio_cache.put(cache_key, audio)
             else:
-                print(f"[TTS 스트림 생성 실패] 빈 응답")
-                return b""
+                self.tracer.event("tts.empty", "[TTS 스트림 생성 실패] 빈 응답", level="warning")
+            span.set(bytes=len(audio))
                 
         except Exception as e:
-            print(f"[TTS 스트림 생성 실패] {e}")
-            return b""
+            self.tracer.event("tts.failed", f"[TTS 스트림 생성 실패] {e}", level="error", error=str(e))
+        finally:
+            # 끼어들기로 중간에 닫혀도 구간은 닫음 (bytes가 없으면 중단/실패)
+            span.end(cache=False)
+    
+    def _create_tts_stream(self, text: str) -> bytes:
+        """TTS 전체 오디오 (미리 합성/서버 응답용)"""
+        return b"".join(bytes(chunk) for chunk in self._iter_tts_chunks(text))
     
     def _play_audio_stream(self, audio_data: bytes, sample_rate: int = 24000) -> None:
-        """오디오 스트림 재생"""
+        """오디오 재생 (상시 열린 출력 스트림 사용, 리미터로 클리핑 방지)"""
         try:
-            import sounddevice as sd
-            import numpy as np
-            
-            # PCM 데이터를 numpy 배열로 변환
-            # 신호를 숫자 데이터로 변환 
-            audio_array = np.frombuffer(audio_data, dtype=np.int16)
-            
-            # 오디오 데이터 검증 및 전처리
-            if len(audio_array) == 0:
-                print("[오디오 재생 실패] 빈 오디오 데이터")
+            if len(audio_data) == 0:
+                self.tracer.event("playback.empty", "[오디오 재생 실패] 빈 오디오 데이터", level="warning")
                 return
-            
-            # 오디오 정규화
-            # 오디오 pcm 값이 너무 크면 스피커에서 찢어지는 현상(클리핑) 방지지
-            max_val = np.max(np.abs(audio_array))
-            if max_val > 0:
-                audio_array = audio_array.astype(np.float32) / max_val * 0.8
-                audio_array = (audio_array * 32767).astype(np.int16)
-            
-            # 재생 전 안정화 지연 (0.2초)
-            time.sleep(0.2)
-            
-            # 실시간 재생 (지연시간 제거)
-            # 따로 파일 저장 없이 memory에 저장된 데이터를 재생 
-            sd.play(audio_array, samplerate=sample_rate)
-            sd.wait()
-            
-            # 재생 후 완전 종료 보장 (0.2초)
-            time.sleep(0.2)
+            with self.tracer.span("playback", bytes=len(audio_data)):
+                self.audio_output.play(audio_data)
             
         except Exception as e:
-            print(f"[오디오 스트림 재생 실패] {e}")
+            self.tracer.event("playback.failed", f"[오디오 스트림 재생 실패] {e}", level="error", error=str(e))
     
     def _play_beep(self, frequency: int = 800, duration: float = 0.3) -> None:
-        """비프음 재생 (녹음 시작 알림)"""
+        """비프음 재생 (녹음 시작 알림, TTS와 같은 출력 스트림 -> 전이중 모드에서는 에코 제거 대상)"""
         try:
-            import sounddevice as sd
             import numpy as np
             
             # 비프음 생성
-            sample_rate = 44100
+            sample_rate = self.audio_output.sample_rate
             t = np.linspace(0, duration, int(sample_rate * duration), False)
             beep = np.sin(2 * np.pi * frequency * t) * 0.3  # 볼륨 조절
             
@@ -258,68 +430,57 @@ class VoiceChat:
             beep_int16 = (beep * 32767).astype(np.int16)
             
             # 재생
-            sd.play(beep_int16, sample_rate)
-            sd.wait()
+            with self.tracer.span("beep", duration_s=duration):
+                self.audio_output.play(beep_int16.tobytes())
             
         except Exception as e:
-            print(f"[비프음 재생 실패] {e}")
+            self.tracer.event("beep.failed", f"[비프음 재생 실패] {e}", level="error", error=str(e))
     
     def _stream_tts_realtime(self, text: str) -> None:
-        """실시간 TTS 스트리밍"""
+        """실시간 TTS 스트리밍 (첫 청크가 도착하면 바로 재생 시작)"""
         if not self.client:
-            print(f"[TTS 대체] {text}")
+            self.tracer.event("tts.fallback", f"[TTS 대체] {text}")
             return
             
         try:
-            print(f"[TTS 스트리밍 시작] {text}")
+            self.tracer.event("tts.start", f"[TTS 스트리밍 시작] {text}")
             self.is_playing = True # 재생 중 표시 
             
-            # TTS 재생 전 안정화를 위한 지연 (0.4초)
-            time.sleep(0.4)
-            
-            # TTS 스트림 생성 및 재생
-            audio_data = self._create_tts_stream(text)
-            if audio_data:
-                self._play_audio_stream(audio_data)
-                print(f"[TTS 스트리밍 완료] {text}")
+            with self.tracer.span("playback", sentences=1):
+                report = self.tts_pipeline.speak([text])
+            if report["cancelled"]:
+                self.tracer.event("barge_in.stopped", f"[끼어들기] 재생을 중단했습니다: {text}")
+            elif report["audio_s"] > 0:
+                self.tracer.event("tts.done", f"[TTS 스트리밍 완료] {text}", level="debug")
+                self._record_tts_report(report)
             else:
-                print(f"[TTS 스트림 생성 실패] {text}")
+                self.tracer.event("tts.failed", f"[TTS 스트림 생성 실패] {text}", level="error")
             
         except Exception as e:
-            print(f"[TTS 스트리밍 실패] {e}")
+            self.tracer.event("tts.failed", f"[TTS 스트리밍 실패] {e}", level="error", error=str(e))
         finally:
             self.is_playing = False
     
-    def _record_audio_stream(self, duration: float = 5.0) -> Optional[bytes]:
-        """실시간 오디오 녹음 스트림"""
-        try:
-            import sounddevice as sd
-            import numpy as np
-            
-            print("말씀해주세요 (비프음 후 녹음 시작)...")
-            
-            sample_rate = 16000
-            
-            # 1. 먼저 비프음 재생 (녹음 시작 전)
-            self._play_beep()
-            
-            # 2. 비프음 완료 후 짧은 지연
-            time.sleep(0.2)
-            
-            # 3. 녹음 시작
-            recording = sd.rec(int(duration * sample_rate), 
-                             samplerate=sample_rate, 
-                             channels=1, 
-                             dtype=np.int16)
-            
-            # 4. 녹음 완료 대기
-            sd.wait()
-            
-            return recording.tobytes()
-            
-        except Exception as e:
-            print(f"[오디오 녹음 실패] {e}")
-            return None
+    def _record_tts_report(self, report: dict) -> None:
+        """발화 단위 TTS 지표 누적 (첫 오디오까지 시간, 전체 소요 시간)"""
+        if report["ttfa_s"] is None:
+            return
+        self.tts_stats["utterances"] += 1
+        self.tts_stats["ttfa_s"] += report["ttfa_s"]
+        self.tracer.observe("tts_first_audio_seconds", report["ttfa_s"])
+        self.tracer.event("tts.report", f"[TTS] 문장 {report['sentences']}개, 첫 오디오 {report['ttfa_s'] * 1000:.0f}ms, "
+                          f"오디오 {report['audio_s']:.1f}초, 전체 {report['wall_s']:.1f}초",
+                          sentences=report['sentences'], ttfa_s=report['ttfa_s'],
+                          audio_s=report['audio_s'], wall_s=report['wall_s'])
+    
+    def tts_report(self) -> dict:
+        """TTS 첫 오디오까지 평균 시간과 지터 버퍼 언더런 횟수"""
+        utterances = self.tts_stats["utterances"]
+        return {
+            "utterances": utterances,
+            "avg_ttfa_ms": self.tts_stats["ttfa_s"] / utterances * 1000 if utterances else 0.0,
+            "underruns": self.audio_output.underruns,
+        }
     
     # speach-to-text
     def _transcribe_audio_stream(self, audio_data: bytes) -> Optional[str]:
@@ -328,267 +489,393 @@ class VoiceChat:
             return input("사용자 입력 > ").strip()
             
         try:
-            # 임시 WAV 파일 생성
-            wav_path = self.tmp_dir / "temp_stream.wav"
-            
-            # OpenAI 모델은 wav,mp3 파일을 지원하므로 pcm을 wave 라이브러리로 래핑 
-            with wave.open(str(wav_path), 'wb') as wav_file:
-                wav_file.setnchannels(1)
-                wav_file.setsampwidth(2)  # 16-bit
-                wav_file.setframerate(16000)
-                wav_file.writeframes(audio_data)
+            # OpenAI 모델은 wav,flac,ogg 등 파일 형식을 받으므로 PCM을 메모리에서 컨테이너로 감쌈
+            # (임시 파일 없음 -> 동시 세션끼리 파일이 겹치지 않음)
+            filename, payload, mime = build_upload(audio_data, 16000, self.stt_codec)
+            payload_bytes = payload_size(payload)
             
-            # STT 처리
-            with open(wav_path, "rb") as f:
+            # STT 처리 (업로드 + 인식 + 응답이 한 번의 요청)
+            with self.tracer.span("stt.upload", bytes=payload_bytes, codec=self.stt_codec) as span:
                 transcript = self.client.audio.transcriptions.create(
                     model="gpt-4o-transcribe", # stt 최신 모델 
-                    file=f,
+                    file=(filename, payload, mime),
                 )
-            
-            # 임시 파일 삭제
-            wav_path.unlink(missing_ok=True)
+            latency = span.duration
+            self.stt_metrics.record(latency, payload_bytes, len(audio_data))
+            self.tracer.event("stt.done", f"[STT] {latency * 1000:.0f}ms, 업로드 {payload_bytes / 1024:.0f}KB ({filename})",
+                              latency_s=latency, bytes=payload_bytes)
             
             return transcript.text.strip() if hasattr(transcript, 'text') else None
             
         except Exception as e:
-            print(f"[STT 스트림 처리 실패] {e}")
+            self.stt_metrics.record_failure()
+            self.tracer.event("stt.failed", f"[STT 스트림 처리 실패] {e}", level="error", error=str(e))
             return None
     
-    def _stream_llm_response(self, user_text: str) -> Generator[str, None, None]:
-        """실시간 LLM 응답 스트리밍"""
+    def _stream_llm_response(self, user_text: str,
+                             dialogue: Optional[DialogueState] = None) -> Generator[str, None, None]:
+        """
+        실시간 LLM 응답 스트리밍
+        dialogue가 없으면 대화 맥락 없이 한 번의 질문으로 처리 (/chat API)
+        """
         if not self.client:
             yield f"요청하신 내용에 대한 안내입니다: {user_text}"
             return
             
-        try:
-            # 메뉴 컨텍스트 가져오기
-            menu_context = self._get_menu_context()
+        # 같은 메뉴 버전 + 같은 대화 상태(장바구니/언급 메뉴/제약)에서 같은 질문을 받은 적이 있으면
+        # 저장된 답변을 그대로 재생 ("그거", "아까"처럼 이전 대화를 가리키는 질문은 캐시하지 않음,
+        # 메뉴 이름이 없는 발화("네", "두 개요")는 직전 답변까지 같아야 재사용)
+        self._refresh_menu_if_changed()
+        cache_version = self.menu_version
+        use_cache = True
+        if dialogue is not None:
+            cache_version = f"{self.menu_version}:{dialogue.context_key(user_text)}"
+            use_cache = not dialogue.references_context(user_text)
+        cached = self.answer_cache.get(cache_version, user_text) if use_cache else None
+        if cached is not None:
+            self.tracer.span("llm", cache=True).end()
+            yield from cached
+            return
             
-            # 시스템 프롬프트 구성
-            system_prompt = """당신은 친절하고 자연스러운 AI 키오스크입니다. 자연스럽고 명확하고 이해하기 쉽게 답변하세요. 
-너무 형식적이지 말고 친근한 톤으로 대화하세요. 
-주문을 도와주거나 메뉴를 추천해주세요.
-
-다음은 현재 매장의 메뉴 정보입니다. 이 정보를 바탕으로 정확한 메뉴 추천, 가격 안내, 알레르기 정보 등을 제공해주세요:
-
-{menu_context}
-
-메뉴 관련 질문에 답할 때는 위의 메뉴 정보를 정확히 참고하여 답변해주세요. 
-- 가격, 알레르기 정보, 영양 정보 등을 포함하여 친절하게 안내해주세요
-- 특정 메뉴에 대해 질문받으면 해당 메뉴의 상세 정보를 제공해주세요
-- 메뉴 추천 요청 시 사용자의 선호도나 제약사항(알레르기, 식단 등)을 고려해주세요
-- 비건, 채식주의자, 돼지고기 금기 등의 식단 제약사항이 있으면 해당 조건에 맞는 메뉴를 추천해주세요
-- 칼로리나 영양 정보에 대한 질문에도 정확히 답변해주세요""".format(menu_context=menu_context)
+        # 요청 -> 첫 토큰(TTFT), 이후 토큰 속도 (스트림 청크 하나 ≈ 토큰 하나)
+        span = self.tracer.span("llm", cache=False)
+        chunks = []
+        first_token_at = None
+        try:
+            # 캐시된 시스템 프롬프트 + 질문과 관련된 메뉴만 포함 (+ 대화 상태 요약과 최근 턴)
+            messages = self._build_messages(user_text, dialogue)
+            span.set(prompt_messages=len(messages))
             
             # 스트리밍 응답 생성
             stream = self.client.chat.completions.create(
                 model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_text},
-                ],
+                messages=messages,
                 temperature=0,
                 stream=True
             )
             
-            for chunk in stream:
-                if chunk.choices[0].delta.content:
-                    content = chunk.choices[0].delta.content
-                    yield content
+            try:
+                for chunk in stream:
+                    if chunk.choices[0].delta.content:
+                        content = chunk.choices[0].delta.content
+                        if first_token_at is None:
+                            first_token_at = time.perf_counter()
+                            ttft = span.elapsed()
+                            # 빠른 응답으로 절약한 시간 추정용 (LLM 첫 토큰까지 걸린 시간)
+                            self.fast_path.record_llm_turn(ttft)
+                            self.tracer.observe("llm_ttft_seconds", ttft)
+                            span.set(ttft_ms=ttft * 1000)
+                        chunks.append(content)
+                        yield content
+            finally:
+                # 끼어들기로 중간에 닫히면 스트리밍 연결도 바로 닫음 (남은 토큰을 받지 않음)
+                stream.close()
+            
+            # 끝까지 받은 답변만 캐시 (실패 시 대체 문구는 저장하지 않음)
+            if use_cache:
+                self.answer_cache.put(cache_version, user_text, chunks)
+            span.set(completed=True)
             
         except Exception as e:
-            print(f"[LLM 스트리밍 실패] {e}")
+            self.tracer.event("llm.failed", f"[LLM 스트리밍 실패] {e}", level="error", error=str(e))
             yield f"요청하신 내용에 대한 안내입니다: {user_text}"
+        finally:
+            if first_token_at is not None and len(chunks) > 1:
+                tokens_per_s = (len(chunks) - 1) / max(time.perf_counter() - first_token_at, 1e-6)
+                self.tracer.observe("llm_tokens_per_second", tokens_per_s, buckets=LLM_RATE_BUCKETS)
+                span.set(tokens_per_s=tokens_per_s)
+            span.end(tokens=len(chunks))
     
-    def _process_streaming_response(self, response_stream: Generator[str, None, None]) -> None:
-        """스트리밍 응답을 실시간으로 처리하고 TTS로 변환"""
-        if not self.client:
-            return
-            
+    def _iter_response_sentences(self, response_stream: Generator[str, None, None]) -> Generator[str, None, None]:
+        """
+        LLM 스트림을 화면에 출력하면서 문장 단위로 묶기
+        새로 들어온 글자만 검사하고, 숫자(12.9)/약어에서는 자르지 않으며 짧은 조각은 다음 문장과 합침
+        """
+        segmenter = SentenceSegmenter()
+        received = []  # 대화 상태에 남길 답변 (끼어들기로 끊기면 거기까지)
         try:
-            buffer = ""
-            sentence_end_chars = ['.', '!', '?', '\n'] # 문장 끝 기준 
-            current_tts_thread = None  # 현재 TTS 스레드만 추적
-            
             for chunk in response_stream:
-                buffer += chunk
+                if self.tts_pipeline.cancelled:
+                    return  # 끼어들기: 남은 LLM 응답은 받지 않음
                 print(chunk, end="", flush=True)
-                
-                # 문장이 완성되면 즉시 TTS 재생
-                if any(char in buffer for char in sentence_end_chars):
-                    if buffer.strip():
-                        # 이전 TTS가 완료될 때까지 대기
-                        if current_tts_thread and current_tts_thread.is_alive():
-                            current_tts_thread.join()
-                        
-                        # 문장 간 자연스러운 지연 추가 (0.8초)
-                        time.sleep(0.8)
-                        
-                        # 별도 스레드에서 TTS 재생 (비동기)
-                        current_tts_thread = threading.Thread(
-                            target=self._stream_tts_realtime,
-                            args=(buffer.strip(),),
-                            daemon=True
-                        )
-                        current_tts_thread.start()
-                    buffer = ""
+                received.append(chunk)
+                # 문장이 완성되면 바로 합성 파이프라인으로 전달
+                yield from segmenter.feed(chunk)
             
             # 남은 텍스트 처리
-            if buffer.strip():
-                # 이전 TTS가 완료될 때까지 대기
-                if current_tts_thread and current_tts_thread.is_alive():
-                    current_tts_thread.join()
-                
-                # 마지막 문장도 지연 추가
-                time.sleep(0.8)
-                
-                current_tts_thread = threading.Thread(
-                    target=self._stream_tts_realtime,
-                    args=(buffer.strip(),),
-                    daemon=True
-                )
-                current_tts_thread.start()
+            yield from segmenter.flush()
+        finally:
+            response_stream.close()
+            self._last_response_text = "".join(received)
+    
+    def _process_streaming_response(self, response_stream: Generator[str, None, None]) -> None:
+        """
+        스트리밍 응답을 실시간으로 처리하고 TTS로 변환
+        문장 N을 재생하는 동안 N+1, N+2 문장을 미리 합성 (TTSPipeline)
+        """
+        if not self.client:
+            return
             
-            # 마지막 TTS 스레드가 완료될 때까지 대기
-            if current_tts_thread and current_tts_thread.is_alive():
-                current_tts_thread.join()
+        try:
+            self.is_playing = True
+            with self.tracer.span("playback") as span:
+                report = self.tts_pipeline.speak(self._iter_response_sentences(response_stream))
+                span.set(sentences=report["sentences"], audio_s=report["audio_s"], cancelled=report["cancelled"])
+            print()
+            if report["cancelled"]:
+                self.tracer.event("barge_in.stopped", "[끼어들기] 답변을 중단했습니다.")
+            self._record_tts_report(report)
                 
         except Exception as e:
-            print(f"[스트리밍 응답 처리 실패] {e}")
+            self.tracer.event("playback.failed", f"[스트리밍 응답 처리 실패] {e}", level="error", error=str(e))
+        finally:
+            self.is_playing = False
     
-    def _continuous_listening(self) -> Optional[str]:
-        """연속 음성 인식 (더 자연스러운 대화)"""
+    def _get_listener(self) -> UtteranceListener:
+        """
+        상시 입력 스트림 + 발화 분할기 (한 번 열어서 계속 사용)
+        반이중: 듣지 않을 때는 일시정지 / 전이중: 계속 들으면서 말 시작 시 끼어들기 처리
+        """
+        if self.listener is None:
+            source = self.input_wav_source or MicrophoneFrameSource(self.endpointer.sample_rate,
+                                                                    self.endpointer.frame_ms,
+                                                                    echo_canceller=self.echo_canceller)
+            self.listener = UtteranceListener(source, self.endpointer,
+                                              on_speech_start=self._on_barge_in if self.full_duplex else None,
+                                              observer=self.transcriber)
+            if not self.full_duplex:
+                self.listener.pause()
+            self.listener.start()
+        return self.listener
+    
+    def _on_barge_in(self) -> None:
+        """재생 중 사용자 말 감지 (리스너 스레드) -> 출력 중단, 남은 TTS 합성/LLM 스트림 취소"""
+        t0 = time.perf_counter()
+        if self.tts_pipeline.cancel():
+            self.barge_ins += 1
+            stop_s = time.perf_counter() - t0
+            self.tracer.event("barge_in", f"\n[끼어들기] 사용자 발화 감지 -> 재생 중단 ({stop_s * 1000:.1f}ms)",
+                              stop_ms=stop_s * 1000)
+    
+    def _continuous_listening(self, timeout: float = 10.0) -> Optional[str]:
+        """
+        연속 음성 인식 (VAD 발화 구간 검출)
+        고정 길이 녹음 대신 말이 끝나는 즉시(hangover 후) STT로 넘김
+        timeout 동안 말이 시작되지 않으면 빈 문자열, 오디오 장치 오류나 입력 파일이 끝나면 None
+        """
         try:
-            import sounddevice as sd
-            import numpy as np
-            
-            # WebRTC VAD는 선택사항
+            listener = self._get_listener()
+            if listener.exhausted:
+                return None
+            if self.full_duplex:
+                # 마이크는 계속 열려 있음 (끼어든 발화는 이미 큐에 있거나 진행 중이므로 비프음 생략)
+                if not listener.pending:
+                    self._play_beep()
+            elif self.input_wav_source is None:
+                # 비프음은 듣기 전에 재생 (resume()이 그 사이 들어온 소리를 버림)
+                self._play_beep()
+            
+            print("말씀해주세요 (말이 끝나면 자동으로 인식합니다)...")
+            listen_start = time.perf_counter()
+            listen_span = self.tracer.span("listen")
+            if not self.full_duplex:
+                listener.resume()
+            item = None
             try:
-                import webrtcvad
-                vad = webrtcvad.Vad(2)  # 적당한 민감도
-                use_vad = True
-            except ImportError:
-                print("webrtcvad가 설치되지 않아 기본 음성 인식 모드를 사용합니다.")
-                use_vad = False
-            
-            print("연속 음성 인식 모드 (종료하려면 '그만'이라고 말씀하세요)...")
-            sample_rate = 16000
-            frame_duration = 30  # ms
-            
-            # 실시간 오디오 스트림
-            def audio_callback(indata, frames, time, status):
-                if status:
-                    print(f"오디오 스트림 상태: {status}")
-                
-                # VAD로 음성 감지 (선택사항)
-                audio_data = indata.tobytes()
-                if use_vad:
-                    is_speech = vad.is_speech(audio_data, sample_rate)
-                else:
-                    # 기본적으로 모든 오디오를 음성으로 간주
-                    is_speech = True
-                
-                if is_speech:
-                    # 음성 데이터 수집
-                    self.audio_buffer.append(audio_data)
-            
-            # 오디오 스트림 시작
-            with sd.InputStream(callback=audio_callback,
-                              channels=1,
-                              samplerate=sample_rate,
-                              dtype=np.int16,
-                              blocksize=int(sample_rate * frame_duration / 1000)):
-                
-                while True:
-                    time.sleep(0.1)
-                    
-                    # 충분한 음성 데이터가 수집되면 STT 처리
-                    if len(self.audio_buffer) >= 10:  # 약 3초
-                        audio_data = b''.join(self.audio_buffer)
-                        self.audio_buffer.clear()
-                        
-                        text = self._transcribe_audio_stream(audio_data)
-                        if text:
-                            return text
-                    
-                    # 종료 조건 확인 (키보드 입력)
-                    if sys.stdin in select.select([sys.stdin], [], [], 0)[0]:
-                        return input().strip()
+                while item is None and time.perf_counter() - listen_start < timeout:
+                    item = listener.get(timeout=0.1)
+                    if item is None:
+                        if listener.exhausted:
+                            return None
+                        # 종료 조건 확인 (키보드 입력)
+                        if self._keyboard_pending():
+                            self._speech_end_at = None
+                            return input().strip()
+            finally:
+                # 반이중: 응답/재생 중에는 입력을 받지 않음
+                if not self.full_duplex:
+                    listener.pause()
+                if item is not None:
+                    # 리스너 스레드가 캡처한 발화 구간 (프리롤 포함 오디오 시작 ~ 말 끝 감지)
+                    record_s = len(item[0]) / 2 / self.endpointer.sample_rate
+                    self.tracer.span_since("record", item[1] - record_s, parent=listen_span,
+                                           speech_s=record_s).end(queued_ms=(time.perf_counter() - item[1]) * 1000)
+                listen_span.end(speech=item is not None)
+            if item is None:
+                return ""
+            
+            audio_data, speech_end_at = item
+            self._speech_end_at = speech_end_at
+            speech_s = len(audio_data) / 2 / self.endpointer.sample_rate
+            with self.tracer.span("stt", speech_s=speech_s) as span:
+                text = self._streaming_result(speech_end_at, audio_data)
+                if text is None:
+                    text = self._transcribe_audio_stream(audio_data)
+            end_to_text = time.perf_counter() - speech_end_at
+            self.tracer.observe("stt_end_to_text_seconds", end_to_text)
+            span.set(end_to_text_ms=end_to_text * 1000)
+            self.tracer.event("vad.utterance", f"[VAD] 발화 {speech_s:.1f}초 (대기 포함 "
+                              f"{max(0.0, speech_end_at - listen_start):.1f}초), 말 끝 -> STT 결과 {end_to_text * 1000:.0f}ms",
+                              speech_s=speech_s, end_to_text_s=end_to_text)
+            return text or ""
                         
         except Exception as e:
-            print(f"[연속 음성 인식 실패] {e}")
+            self.tracer.event("listen.failed", f"[연속 음성 인식 실패] {e}", level="error", error=str(e))
+            return None
+    
+    def _streaming_result(self, speech_end_at: float, audio_data: bytes) -> Optional[str]:
+        """스트리밍 STT 최종 결과 (스트리밍을 쓰지 않았거나 실패하면 None -> 일괄 업로드)"""
+        session = self.transcriber.session_for(speech_end_at) if self.transcriber else None
+        if session is None:
             return None
+        with self.tracer.span("stt.stream_final", sent_bytes=session.sent_bytes):
+            text = session.result(timeout=5.0)
+            session.close()
+        if text is None:
+            self.stt_metrics.record_failure()
+            self.tracer.event("stt.stream_failed", "[스트리밍 STT] 최종 결과를 받지 못해 일괄 업로드로 다시 인식합니다.",
+                              level="warning")
+            return None
+        final_s = session.final_at - session.ended_at
+        self.stt_metrics.record(final_s, session.sent_bytes, len(audio_data))
+        self.tracer.event("stt.stream_done", f"[스트리밍 STT] 말 끝 -> 최종 결과 {final_s * 1000:.0f}ms",
+                          final_s=final_s, sent_bytes=session.sent_bytes)
+        return text.strip()
+    
+    def _can_speculate(self, text: str) -> bool:
+        """중간 결과로 LLM을 미리 호출할지 (종료 명령/빠른 응답 대상은 LLM을 쓰지 않음)"""
+        if any(kw in text for kw in ["종료", "그만", "quit", "exit"]):
+            return False
+        return self.dialogue.references_context(text) or not self.fast_path.can_answer(
+            text, self.dialogue.allergies, self.dialogue.diet)
+    
+    def _record_turn_latency(self) -> None:
+        """말 끝 감지 -> 첫 오디오 출력 지연 기록 (음성 입력 턴만)"""
+        first_audio_at = self.audio_output.first_audio_at
+        if self._speech_end_at is None or first_audio_at is None or first_audio_at < self._speech_end_at:
+            return
+        latency = first_audio_at - self._speech_end_at
+        self.turn_latencies.append(latency)
+        self.tracer.observe("turn_first_audio_seconds", latency)
+        self.tracer.event("turn.latency", f"[지연] 말 끝 -> 첫 오디오 {latency * 1000:.0f}ms", latency_s=latency)
+    
+    def turn_latency_report(self) -> dict:
+        """말 끝 -> 첫 오디오 지연 p50/p95 (ms)"""
+        import numpy as np
+        if not self.turn_latencies:
+            return {"turns": 0}
+        latencies = np.array(self.turn_latencies) * 1000
+        return {
+            "turns": len(latencies),
+            "p50_ms": float(np.percentile(latencies, 50)),
+            "p95_ms": float(np.percentile(latencies, 95)),
+        }
+    
+    def _report_stats(self, name: str, title: str, stats: dict) -> None:
+        """종료 시 누적 통계를 구조화 이벤트로 기록"""
+        self.tracer.event(f"stats.{name}", f"[{title}] {stats}", stats=stats)
+    
+    def _keyboard_pending(self) -> bool:
+        """키보드 입력이 들어왔는지 (음성 대신 텍스트 입력)"""
+        if self.input_wav_source is not None:
+            return False
+        try:
+            return sys.stdin in select.select([sys.stdin], [], [], 0)[0]
+        except (OSError, ValueError):
+            return False
     
     def run(self) -> None:
         """메인 실행 루프"""
-        # 초기 프롬프트 (한 번만 재생)
-        menu_count = len(self.menu_data.get('items', [])) if self.menu_data else 0
-        initial_prompt = f"안녕하세요! 저는 {self.menu_data.get('store', '키오스크')}의 AI 어시스턴트입니다. {menu_count}개의 메뉴를 준비했어요. 메뉴 추천이나 주문을 도와드릴까요?"
+        # 초기 프롬프트 (한 번만 재생, 부팅 시 미리 합성됨)
+        initial_prompt = self._greeting_text()
         print(f"[초기 프롬프트] {initial_prompt}")
         
-        # 초기 프롬프트 재생 전 시스템 안정화를 위한 지연
-        print("[시스템] 초기 프롬프트 재생을 준비하고 있습니다...")
-        time.sleep(1.5)  # 1.5초 대기로 오디오 시스템 완전 초기화
-        
-        # 초기 프롬프트 재생 (한 번만)
+        # 초기 프롬프트 재생 (한 번만, 재생이 끝나면 반환)
         self._stream_tts_realtime(initial_prompt)
         
-        # 초기 프롬프트 재생 완료 후 대기
-        while self.is_playing:
-            time.sleep(0.05)
-        time.sleep(0.8)  # 추가 안정화 시간
-        
         while True:
+            # 턴 하나(듣기 -> STT -> LLM -> TTS -> 재생)를 한 trace로 묶음 (작업 스레드의 span도 이 턴에 연결)
+            turn = self.tracer.begin_turn()
             try:
-                # TTS 재생 중에는 사용자 입력을 받지 않음
-                while self.is_playing:
-                    time.sleep(0.05)
-                
-                # TTS 완전 종료 후 추가 안정화 시간 (1.5초)
-                time.sleep(1.5)
-                
-                # 사용자 음성 입력 (스트리밍 방식)
-                audio_data = self._record_audio_stream(duration=5.0)
-                if audio_data:
-                    user_text = self._transcribe_audio_stream(audio_data)
-                else:
+                # 사용자 음성 입력 (VAD로 말이 끝나는 즉시 인식)
+                user_text = self._continuous_listening()
+                if user_text is None:
+                    self._speech_end_at = None
                     user_text = input("사용자 입력 > ").strip()
                 
                 # STT 결과 검증 및 필터링
                 if not user_text or len(user_text.strip()) < 2:
+                    turn.set(route="empty")
+                    self.speculation.cancel()
                     print("(아무 말도 인식하지 못했습니다. 다시 시도합니다.)")
                     continue
                 
-                # 비프음이나 시스템음이 포함된 경우 필터링
                 user_text = user_text.strip()
-                if any(keyword in user_text.lower() for keyword in ['beep', '비프', '시스템', 'system']):
-                    print("(시스템음이 감지되었습니다. 다시 시도합니다.)")
-                    continue
-                
                 print(f"USER: {user_text}")
                 
                 # 종료 조건 확인
                 if any(kw in user_text for kw in ["종료", "그만", "quit", "exit"]):
+                    turn.set(route="exit")
+                    self.speculation.cancel()
                     self._stream_tts_realtime("대화를 종료합니다.")
                     break
                 
-                # LLM 스트리밍 응답 및 실시간 TTS
-                print("ASSISTANT: ", end="", flush=True)
-                response_stream = self._stream_llm_response(user_text)
-                
-                # 실시간 처리 및 TTS 재생
-                self._process_streaming_response(response_stream)
-                
-                # TTS 재생이 완전히 끝날 때까지 대기
-                while self.is_playing:
-                    time.sleep(0.05)
-                
-                # TTS 완전 종료 후 추가 안정화 시간 (2초)
-                time.sleep(2.0)
+                # 가격/알레르기/영양 같은 단순 질문은 LLM 없이 즉시 응답
+                # ("그거 얼마예요?"처럼 이전 대화를 가리키는 질문은 대화 상태가 필요하므로 LLM으로)
+                fast_answer = None
+                if not self.dialogue.references_context(user_text):
+                    # 이전 턴의 알레르기/식단 제약은 빠른 응답 후보에서도 제외 (안전 문제)
+                    fast_answer = self.fast_path.answer(user_text, self.dialogue.allergies, self.dialogue.diet)
+                if fast_answer:
+                    turn.set(route="fast")
+                    self.speculation.cancel()
+                    print(f"ASSISTANT: {fast_answer}")
+                    stats = self.fast_path.stats()
+                    if stats["saved_ms_per_hit"] is not None:
+                        self.tracer.event("fast_path.hit", f"[빠른 응답] LLM 대비 약 {stats['saved_ms_per_hit']:.0f}ms 절약 "
+                                          f"(적중률 {stats['hit_rate']:.0%})", saved_ms=stats['saved_ms_per_hit'])
+                    self._stream_tts_realtime(fast_answer)
+                    answer = fast_answer
+                else:
+                    # 스트리밍 STT 중간 결과로 미리 시작한 응답이 최종 결과와 같으면 이어서 사용
+                    speculative = self.speculation.resolve(user_text)
+                    turn.set(route="speculative" if speculative is not None else "llm")
+                    print("ASSISTANT: ", end="", flush=True)
+                    if speculative is not None:
+                        response_stream = speculative.stream()
+                    else:
+                        response_stream = self._stream_llm_response(user_text, self.dialogue)
+                    
+                    # 실시간 처리 및 TTS 재생 (재생이 끝나거나 끼어들면 반환)
+                    self._last_response_text = ""
+                    self._process_streaming_response(response_stream)
+                    answer = self._last_response_text
+                self.dialogue.add_turn(user_text, answer)
+                self._record_turn_latency()
                 
             except KeyboardInterrupt:
                 print("\n대화를 종료합니다.")
                 break
+            finally:
+                self.tracer.end_turn()
+        
+        self._report_stats("fast_path", "빠른 응답 통계", self.fast_path.stats())
+        self._report_stats("answer_cache", "응답 캐시 통계",
+                           {"answer": self.answer_cache.stats(), "tts": self.audio_cache.stats()})
+        self._report_stats("tts", "TTS 통계", self.tts_report())
+        self._report_stats("stt", "STT 통계", self.stt_metrics.stats())
+        if self.transcriber is not None:
+            self._report_stats("speculation", "추측 LLM 통계", self.speculation.stats())
+        self._report_stats("turn_latency", "턴 지연 통계", self.turn_latency_report())
+        self._report_stats("dialogue", "대화 상태 통계", self.dialogue.stats())
+        self._report_stats("spans", "구간 통계", self.tracer.summary())
+        if self.listener is not None:
+            self._report_stats("listener", "음성 입력 통계", dict(self.listener.stats(), barge_ins=self.barge_ins))
+            self.listener.stop()
+        self.tts_pipeline.close()
+        self.audio_output.close()
+        if self.metrics_server is not None:
+            self.metrics_server.shutdown()
 
 def main() -> None:
     """메인 함수"""